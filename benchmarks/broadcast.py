@@ -0,0 +1,94 @@
+"""
+WebSocket broadcast benchmark.
+
+Measures how long ``WebSocketManager.broadcast_to_clients`` blocks the caller and
+how long it takes until every fake client has received the message, for 1, 10,
+100 and 1000 subscribers. One client in each run is deliberately slow to show
+that it no longer holds up the others.
+
+Usage:
+    python -m benchmarks.broadcast [--rounds 50] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import time
+
+from src.backend.websocket import WebSocketManager
+
+CLIENT_COUNTS = (1, 10, 100, 1000)
+
+
+class FakeClient:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+
+    async def close(self):
+        pass
+
+
+async def run_scenario(clients: int, rounds: int) -> dict:
+    manager = WebSocketManager()
+    fast = [FakeClient() for _ in range(clients)]
+    slow = FakeClient(delay=0.5)
+    for client in [*fast, slow]:
+        await manager.connect(client)
+
+    message = {"type": "audio_chunk", "chunk_index": 1, "data": "x" * 1024}
+    call_times = []
+    delivery_times = []
+    for i in range(1, rounds + 1):
+        started = time.perf_counter()
+        await manager.broadcast_to_clients(message)
+        call_times.append(time.perf_counter() - started)
+        while any(client.received < i for client in fast):
+            await asyncio.sleep(0)
+        delivery_times.append(time.perf_counter() - started)
+
+    await manager.shutdown()
+    return {
+        "clients": clients,
+        "rounds": rounds,
+        "call_us_p50": statistics.median(call_times) * 1e6,
+        "call_us_per_client": statistics.median(call_times) * 1e6 / clients,
+        "delivery_ms_p50": statistics.median(delivery_times) * 1e3,
+        "delivery_ms_max": max(delivery_times) * 1e3,
+    }
+
+
+async def main(rounds: int, as_json: bool) -> None:
+    results = [await run_scenario(clients, rounds) for clients in CLIENT_COUNTS]
+    if as_json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{'clients':>8} {'call p50 us':>12} {'us/client':>10} {'deliv p50 ms':>13} {'max ms':>8}"
+    )
+    for r in results:
+        print(
+            f"{r['clients']:>8} {r['call_us_p50']:>12.1f} {r['call_us_per_client']:>10.2f} "
+            f"{r['delivery_ms_p50']:>13.2f} {r['delivery_ms_max']:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    logging.getLogger("src.backend.websocket").setLevel(logging.WARNING)
+    asyncio.run(main(args.rounds, args.json))
@@ -0,0 +1,376 @@
+"""
+End-to-end load benchmark against a fake ElevenLabs upstream.
+
+Starts the FastAPI app under uvicorn on a local port, pointed at the fake
+upstream from the test suite, and drives it over real sockets:
+
+- ``tts``: POST /api/v1/tts
+- ``stream``: POST /api/v1/tts/stream (time to first byte and total)
+- ``sse``: the MCP ``speak_text`` tool over /sse
+- ``fanout``: WebSocket fan-out of one clip to N listeners, timed from the
+  request until each listener has the audio
+
+Every request uses a fresh text, so the audio cache never answers. The
+reports include p50/p95/p99 latency, throughput and process RSS. RSS covers the
+benchmark process, which also hosts the fake upstream and the clients. Pass
+``--output`` to save the results as JSON, and ``--baseline`` to fail when p95
+latency regresses beyond ``--tolerance``.
+
+Usage:
+    python -m benchmarks.load [--scenarios tts,stream,sse,fanout] [--requests 200]
+        [--concurrency 10] [--clients 100] [--rounds 20] [--latency 0.05]
+        [--chunk-delay 0.01] [--error-rate 0] [--json] [--output results.json]
+        [--baseline previous.json] [--tolerance 0.25]
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from tests.backend.fake_upstream import FakeElevenLabs
+
+SCENARIOS = ("tts", "stream", "sse", "fanout")
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile; 0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Latency percentiles in milliseconds."""
+    return {
+        "p50": percentile(values, 50) * 1e3,
+        "p95": percentile(values, 95) * 1e3,
+        "p99": percentile(values, 99) * 1e3,
+        "max": max(values, default=0.0) * 1e3,
+    }
+
+
+def rss_mb() -> Dict[str, float]:
+    current = 0.0
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        pass
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+    return {"rss_mb": round(current, 1), "peak_rss_mb": round(peak_mb, 1)}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run_load(
+    total: int, concurrency: int, request: Callable[[int], Awaitable[Optional[float]]]
+) -> Dict:
+    """Run ``total`` requests with ``concurrency`` workers.
+
+    ``request`` returns the time to first byte, if it measures one, and raises
+    on failure.
+    """
+    latencies: List[float] = []
+    first_bytes: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                first_byte = await request(i)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if first_byte is not None:
+                first_bytes.append(first_byte)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": summarize(latencies),
+    }
+    if first_bytes:
+        result["ttfb_ms"] = summarize(first_bytes)
+    return result
+
+
+async def scenario_tts(base_url: str, args: argparse.Namespace) -> Dict:
+    run = uuid.uuid4().hex[:8]
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+
+        async def request(i: int) -> None:
+            response = await http.post("/api/v1/tts", json={"text": f"Benchmark {run} {i}."})
+            response.raise_for_status()
+
+        return await run_load(args.requests, args.concurrency, request)
+
+
+async def scenario_stream(base_url: str, args: argparse.Namespace) -> Dict:
+    run = uuid.uuid4().hex[:8]
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+
+        async def request(i: int) -> float:
+            started = time.perf_counter()
+            first_byte = None
+            payload = {"text": f"Streaming benchmark {run} {i}."}
+            async with http.stream("POST", "/api/v1/tts/stream", json=payload) as response:
+                response.raise_for_status()
+                async for _ in response.aiter_bytes():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - started
+            return first_byte or 0.0
+
+        return await run_load(args.requests, args.concurrency, request)
+
+
+async def scenario_sse(base_url: str, args: argparse.Namespace) -> Dict:
+    from mcp import ClientSession
+    from mcp.client.sse import sse_client
+
+    run = uuid.uuid4().hex[:8]
+    async with sse_client(f"{base_url}/sse") as streams:
+        async with ClientSession(*streams) as session:
+            await session.initialize()
+
+            async def request(i: int) -> None:
+                result = await session.call_tool("speak_text", {"text": f"MCP {run} {i}."})
+                if result.isError:
+                    raise RuntimeError(result.content)
+
+            return await run_load(args.requests, args.concurrency, request)
+
+
+async def scenario_fanout(base_url: str, args: argparse.Namespace) -> Dict:
+    import websockets
+
+    ws_url = base_url.replace("http://", "ws://") + "/ws?protocol=binary"
+    arrivals: List[List[float]] = [[] for _ in range(args.clients)]
+    sockets = [await websockets.connect(ws_url, max_size=None) for _ in range(args.clients)]
+
+    async def read(index: int, websocket) -> None:
+        async for message in websocket:
+            if isinstance(message, bytes):
+                arrivals[index].append(time.perf_counter())
+
+    readers = [asyncio.create_task(read(i, ws)) for i, ws in enumerate(sockets)]
+    run = uuid.uuid4().hex[:8]
+    latencies: List[float] = []
+    errors = 0
+    started_all = time.perf_counter()
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+            for round_index in range(args.rounds):
+                # Latency runs from the request to each listener receiving the audio
+                clip = round_index - errors
+                sent_at = time.perf_counter()
+                response = await http.post(
+                    "/api/v1/tts", json={"text": f"Fan-out {run} {round_index}."}
+                )
+                if response.status_code != 200:
+                    errors += 1
+                    continue
+                deadline = time.perf_counter() + 10
+                while any(len(a) <= clip for a in arrivals) and time.perf_counter() < deadline:
+                    await asyncio.sleep(0.001)
+                latencies.extend(a[clip] - sent_at for a in arrivals if len(a) > clip)
+    finally:
+        for reader in readers:
+            reader.cancel()
+        for websocket in sockets:
+            await websocket.close()
+        await asyncio.gather(*readers, return_exceptions=True)
+    elapsed = time.perf_counter() - started_all
+
+    delivered = len(latencies)
+    return {
+        "clients": args.clients,
+        "requests": args.rounds,
+        "errors": errors,
+        "throughput_rps": round(delivered / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": summarize(latencies),
+    }
+
+
+SCENARIO_RUNNERS = {
+    "tts": scenario_tts,
+    "stream": scenario_stream,
+    "sse": scenario_sse,
+    "fanout": scenario_fanout,
+}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a description of every scenario whose p95 regressed."""
+    regressions = []
+    previous = {r["scenario"]: r for r in baseline.get("results", [])}
+    for result in results["results"]:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        old, new = before["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        if old and new > old * (1 + tolerance):
+            regressions.append(f"{result['scenario']}: p95 {old:.1f} ms -> {new:.1f} ms")
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    upstream = FakeElevenLabs(
+        latency=args.latency,
+        chunk_size=args.chunk_size,
+        chunk_delay=args.chunk_delay,
+        error_rate=args.error_rate,
+        audio_size=args.audio_size,
+    )
+    upstream_url = await upstream.start()
+
+    # The app reads its upstream settings at import time
+    os.environ["ELEVENLABS_API_URL"] = upstream_url
+    os.environ.setdefault("ELEVENLABS_API_KEY", "benchmark")
+    os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+    # Measure synthesis and delivery, not clips waiting for the previous one to be heard
+    os.environ.setdefault("PLAYBACK_SEQUENTIAL", "false")
+    import uvicorn
+
+    app = importlib.import_module("src.backend.app").app
+    port = free_port()
+    # The MCP SSE handler does not notice closed sessions, so bound the shutdown wait
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app,
+            host="127.0.0.1",
+            port=port,
+            log_level="critical",
+            lifespan="on",
+            timeout_graceful_shutdown=1,
+        )
+    )
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    base_url = f"http://127.0.0.1:{port}"
+    results = []
+    try:
+        for name in args.scenarios:
+            started = time.perf_counter()
+            result = await SCENARIO_RUNNERS[name](base_url, args)
+            results.append(
+                {
+                    "scenario": name,
+                    **result,
+                    "duration_s": round(time.perf_counter() - started, 2),
+                    **rss_mb(),
+                }
+            )
+    finally:
+        server.should_exit = True
+        await serving
+        await upstream.stop()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "params": {k: v for k, v in vars(args).items() if k not in ("baseline", "output")},
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"{'scenario':>9} {'reqs':>6} {'errors':>6} {'rps':>8} {'p50 ms':>8} "
+            f"{'p95 ms':>8} {'p99 ms':>8} {'ttfb p95':>9} {'rss MB':>7}"
+        )
+        for r in results:
+            ttfb = r.get("ttfb_ms", {}).get("p95")
+            print(
+                f"{r['scenario']:>9} {r['requests']:>6} {r['errors']:>6} "
+                f"{r['throughput_rps']:>8.1f} {r['latency_ms']['p50']:>8.1f} "
+                f"{r['latency_ms']['p95']:>8.1f} {r['latency_ms']['p99']:>8.1f} "
+                f"{(f'{ttfb:.1f}' if ttfb is not None else '-'):>9} {r['rss_mb']:>7.1f}"
+            )
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenarios",
+        type=lambda value: [s for s in value.split(",") if s],
+        default=list(SCENARIOS),
+        help=f"Comma-separated subset of {','.join(SCENARIOS)}",
+    )
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent requests")
+    parser.add_argument("--clients", type=int, default=100, help="WebSocket listeners for fanout")
+    parser.add_argument("--rounds", type=int, default=20, help="Clips broadcast in fanout")
+    parser.add_argument("--latency", type=float, default=0.05, help="Upstream latency (s)")
+    parser.add_argument("--chunk-size", type=int, default=4096, help="Upstream chunk size")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="Delay between chunks")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Upstream 503 rate")
+    parser.add_argument("--audio-size", type=int, default=32 * 1024, help="Bytes per clip")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    parser.add_argument("--output", help="Write the JSON results to this file")
+    parser.add_argument("--baseline", help="Earlier JSON results to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed p95 increase")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    logging.disable(logging.INFO)
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,78 @@
+"""
+Broadcast serialization microbenchmark.
+
+Compares the CPU time of one broadcast when the message is serialized once per
+listener (the previous behaviour) against encoding it once into a shared frame,
+across listener counts and payload sizes. The payload mimics an ``audio_data``
+message carrying a base64 clip.
+
+Usage:
+    python -m benchmarks.serialization [--rounds 20] [--json]
+"""
+
+import argparse
+import base64
+import json
+import os
+import time
+
+from src.backend.frames import Frame, orjson
+
+LISTENER_COUNTS = (1, 10, 100, 1000)
+PAYLOAD_SIZES = (1024, 64 * 1024, 1024 * 1024)
+
+
+def per_listener(message: dict, listeners: int) -> None:
+    for _ in range(listeners):
+        json.dumps(message)
+
+
+def encode_once(message: dict, listeners: int) -> None:
+    frame = Frame.encode(message)
+    for _ in range(listeners):
+        frame.data
+
+
+def cpu_ms(func, message: dict, listeners: int, rounds: int) -> float:
+    started = time.process_time()
+    for _ in range(rounds):
+        func(message, listeners)
+    return (time.process_time() - started) / rounds * 1e3
+
+
+def main(rounds: int, as_json: bool) -> None:
+    results = []
+    for size in PAYLOAD_SIZES:
+        audio = base64.b64encode(os.urandom(size)).decode("utf-8")
+        message = {"type": "audio_data", "text": "Tests passed", "voice_id": "v", "data": audio}
+        for listeners in LISTENER_COUNTS:
+            # Keep the slowest combinations affordable
+            n = max(1, rounds * 1024 // max(size * listeners // 1024, 1024))
+            results.append(
+                {
+                    "payload_bytes": size,
+                    "listeners": listeners,
+                    "per_listener_ms": cpu_ms(per_listener, message, listeners, n),
+                    "encode_once_ms": cpu_ms(encode_once, message, listeners, n),
+                }
+            )
+
+    if as_json:
+        print(json.dumps({"orjson": orjson is not None, "results": results}, indent=2))
+        return
+
+    print(f"JSON backend: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'payload':>9} {'listeners':>9} {'per-listener ms':>16} {'encode-once ms':>15}")
+    for r in results:
+        print(
+            f"{r['payload_bytes']:>9} {r['listeners']:>9} "
+            f"{r['per_listener_ms']:>16.3f} {r['encode_once_ms']:>15.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+    main(args.rounds, args.json)
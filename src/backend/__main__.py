@@ -1,15 +1,88 @@
 import uvicorn
 import os
+import logging
+import importlib.util
+from typing import Any, Dict
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-if __name__ == "__main__":
-    # Get host and port from environment variables
-    host = os.getenv("HOST", "127.0.0.1")
-    port = int(os.getenv("PORT", "9020"))
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Environment variables divided between workers so the API key's limits hold overall
+PER_WORKER_LIMITS = ("UPSTREAM_MAX_CONCURRENCY", "UPSTREAM_CHARS_PER_SECOND")
+
+
+def server_options() -> Dict[str, Any]:
+    """Build the uvicorn options from the environment."""
+    workers = max(1, int(os.getenv("WORKERS", "1")))
     reload = os.getenv("RELOAD", "true").lower() == "true"
+    if reload and workers > 1:
+        logger.warning("RELOAD is enabled, starting a single worker instead of %d", workers)
+        workers = 1
+
+    return {
+        "host": os.getenv("HOST", "127.0.0.1"),
+        "port": int(os.getenv("PORT", "9020")),
+        "reload": reload,
+        "workers": workers,
+        # Use the C implementations when they are installed
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "proxy_headers": True,
+    }
+
+
+def prepare_workers(workers: int) -> None:
+    """Set up the environment shared by the worker processes.
+
+    Workers are separate processes, so WebSocket fan-out and MCP messages have
+    to cross a pub/sub broker. Without a configured one, a broker is started in
+    this process on localhost. Upstream limits are split between the workers.
+    """
+    if workers <= 1:
+        return
+
+    if os.getenv("BROADCAST_BACKEND", "local") == "local":
+        from .broker import PubSubBroker
+
+        os.environ["BROADCAST_URL"] = PubSubBroker().serve_in_thread()
+        os.environ["BROADCAST_BACKEND"] = "redis"
+
+    from . import upstream_scheduler
+
+    defaults = {
+        "UPSTREAM_MAX_CONCURRENCY": upstream_scheduler.UPSTREAM_MAX_CONCURRENCY,
+        "UPSTREAM_CHARS_PER_SECOND": upstream_scheduler.UPSTREAM_CHARS_PER_SECOND,
+    }
+    for name in PER_WORKER_LIMITS:
+        total = float(defaults[name])
+        if total > 0:
+            share = total / workers
+            os.environ[name] = (
+                str(max(1, int(share))) if name.endswith("CONCURRENCY") else str(share)
+            )
+
+
+def main() -> None:
+    options = server_options()
+    prepare_workers(options["workers"])
+    logger.info(
+        "Starting %d worker(s) on %s:%d (loop=%s, http=%s, reload=%s)",
+        options["workers"],
+        options["host"],
+        options["port"],
+        options["loop"],
+        options["http"],
+        options["reload"],
+    )
 
     # Run the FastAPI application
-    uvicorn.run("src.backend.app:app", host=host, port=port, reload=reload)
+    uvicorn.run("src.backend.app:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,22 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import yaml
 import os
 from dotenv import load_dotenv
-from pathlib import Path
 from .routes import router
-from .websocket import websocket_endpoint
+from .websocket import manager, websocket_endpoint
 from mcp.server.fastmcp import FastMCP
 import mcp.server.sse
 import logging
 from .mcp_tools import register_mcp_tools
+from .elevenlabs_client import get_client
+from .config_store import app_config_store
 from fastapi import Request
+from fastapi.responses import PlainTextResponse
+from .audio_cache import audio_cache
+from .metrics import counter_total, gauge, registry
+from .middleware import AccessLogMiddleware, RootPathMiddleware
+from .mcp_sessions import McpMessageRouter
+from .single_flight import synthesis_flights
 
 # Load environment variables
 load_dotenv()
@@ -68,62 +74,8 @@ and production environments.
 """
 
 
-# Path rewriting middleware - MUST be first in the middleware chain
-@app.middleware("http")
-async def rewrite_path_middleware(request: Request, call_next):
-    """
-    Middleware that rewrites incoming request paths by removing the ROOT_PATH prefix.
-
-    This allows FastAPI to handle both direct requests and requests coming through
-    API Gateway or ALB with a path prefix.
-    """
-    original_path = request.url.path
-
-    # Debug output of original path
-    logger.debug(f"Original path: {original_path}")
-
-    # Check for double service paths (e.g. /jessica-service/jessica-service/)
-    double_prefix = False
-    if ROOT_PATH and original_path.startswith(ROOT_PATH):
-        remaining_path = original_path[len(ROOT_PATH) :]
-        if remaining_path.startswith(ROOT_PATH):
-            # We found a double prefix
-            double_prefix = True
-            logger.debug(f"Detected double prefix: {original_path}")
-            # Remove both instances of the prefix
-            new_path = remaining_path[len(ROOT_PATH) :]
-            # Ensure the path starts with /
-            if not new_path.startswith("/"):
-                new_path = "/" + new_path
-
-            # Update the request scope
-            request.scope["path"] = new_path
-            request.scope["root_path"] = ROOT_PATH
-
-            logger.debug(
-                f"Path rewritten (double prefix): {original_path} -> {new_path} (root_path={ROOT_PATH})"
-            )
-            return await call_next(request)
-
-    # Only rewrite if ROOT_PATH is set and path starts with it
-    if ROOT_PATH and original_path.startswith(ROOT_PATH) and not double_prefix:
-        # Remove the ROOT_PATH prefix from the path
-        new_path = original_path[len(ROOT_PATH) :]
-        # Ensure the path starts with a slash
-        if not new_path.startswith("/"):
-            new_path = "/" + new_path
-
-        # Create modified request scope with new path
-        request.scope["path"] = new_path
-
-        # Update the root_path in the scope
-        request.scope["root_path"] = ROOT_PATH
-
-        logger.debug(f"Path rewritten: {original_path} -> {new_path} (root_path={ROOT_PATH})")
-
-    # Process the request with the rewritten path
-    return await call_next(request)
-
+# Path rewriting runs innermost so routing sees the rewritten path
+app.add_middleware(RootPathMiddleware, root_path=ROOT_PATH)
 
 # CORS middleware configuration
 app.add_middleware(
@@ -134,31 +86,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-# Logging middleware (after path rewriting)
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log information about all incoming requests."""
-    logger.info(f"Request path: {request.url.path}")
-    logger.info(f"Request method: {request.method}")
-    logger.info(f"ROOT_PATH: {ROOT_PATH}")
-
-    response = await call_next(request)
-
-    logger.info(f"{request.method} {request.url.path} - {response.status_code}")
-    return response
+# Access logging runs outermost so it times the whole request
+app.add_middleware(AccessLogMiddleware)
 
 
 # Load configuration
-def load_config():
-    config_path = Path("config.yaml")
-    if config_path.exists():
-        with open(config_path, "r") as f:
-            return yaml.safe_load(f)
-    return {"voices": {}, "settings": {}}
-
-
-config = load_config()
+config = app_config_store.snapshot()
 
 # Include our API routes
 app.include_router(router)
@@ -188,10 +121,11 @@ async def handle_sse(request: Request):
         )
 
 
-@app.post("/messages/{path:path}")
-async def handle_messages(request: Request, path: str):
-    """Weiterleitung der Messages an den SSE-Transport"""
-    return await sse_transport.handle_post_message(request.scope, request.receive, request._send)
+# Weiterleitung der Messages an den SSE-Transport. Als ASGI-App gemountet, weil der
+# Transport die Antwort selbst sendet und eine Route danach eine zweite senden würde.
+# Nachrichten für Sessions eines anderen Workers gehen über den Broadcast-Bus dorthin.
+mcp_messages = McpMessageRouter(sse_transport, manager)
+app.mount("/messages", app=mcp_messages)
 
 
 # Start the FastAPI server in a background thread when the app starts
@@ -201,6 +135,59 @@ async def startup_event():
     logger.info(f"Backend server listening on {HOST}:{PORT}{ROOT_PATH}")
     logger.info(f"MCP server integrated on {ROOT_PATH}/sse")
 
+    # Open the shared upstream connection pool
+    await get_client().start()
+
+    # Join the broadcast bus shared with other instances
+    await manager.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await manager.shutdown()
+    await get_client().aclose()
+    await audio_cache.flush()
+
+
+def _collect_websocket():
+    stats = manager.stats()
+    yield gauge(stats["connections"], {"kind": "all"})
+    yield gauge(stats["mcp_connected"], {"kind": "mcp"})
+
+
+def _collect_queues():
+    yield gauge(manager.stats()["queued_messages"], {"queue": "websocket"})
+    scheduler = get_client().scheduler.stats()
+    for priority, depth in scheduler["queued"].items():
+        yield gauge(depth, {"queue": f"upstream_{priority}"})
+    yield gauge(synthesis_flights.stats()["inflight"], {"queue": "synthesis_inflight"})
+    playback = [queue.stats() for queue in manager.playback_queues.values()]
+    yield gauge(sum(stats["queued"] for stats in playback), {"queue": "playback"})
+
+
+def _collect_cache():
+    stats = audio_cache.stats()
+    yield counter_total(stats["hits"], {"result": "hit"})
+    yield counter_total(stats["misses"], {"result": "miss"})
+    yield counter_total(synthesis_flights.stats()["coalesced"], {"result": "coalesced"})
+
+
+registry.collector(
+    "jessica_websocket_connections", "Open WebSocket connections", "gauge", _collect_websocket
+)
+registry.collector(
+    "jessica_queue_depth", "Items waiting in internal queues", "gauge", _collect_queues
+)
+registry.collector(
+    "jessica_audio_cache_lookups", "Audio cache lookups by result", "counter", _collect_cache
+)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics for this instance."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 
 @app.get("/health")
 async def jessica_service_health_check():
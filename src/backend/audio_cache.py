@@ -0,0 +1,309 @@
+"""
+Audio Cache
+
+Content-addressed cache for synthesized audio. Clips are keyed by the normalized
+text, voice, model and output format, held in a byte-bounded in-memory LRU and
+optionally spilled to a size-bounded directory on disk.
+
+The disk tier keeps an index of sizes, checksums and LRU order next to the
+clips, so it survives restarts and can be baked into the container image.
+Clips are checked against the index on startup and files without an entry are
+adopted.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+AUDIO_CACHE_MEMORY_BYTES = int(os.getenv("AUDIO_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+AUDIO_CACHE_DIR = os.getenv("AUDIO_CACHE_DIR", "")
+AUDIO_CACHE_DISK_BYTES = int(os.getenv("AUDIO_CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))
+# Startup integrity check of the disk tier: "size" (cheap) or "hash" (re-read every clip)
+AUDIO_CACHE_VERIFY = os.getenv("AUDIO_CACHE_VERIFY", "size")
+# Seconds index changes are batched before the index file is rewritten
+AUDIO_CACHE_INDEX_DELAY = float(os.getenv("AUDIO_CACHE_INDEX_DELAY", "1.0"))
+
+INDEX_FILE = "index.json"
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different inputs share a cache entry."""
+    return " ".join(text.split())
+
+
+def make_cache_key(text: str, voice_id: str, model_id: str, output_format: str) -> str:
+    """Build the content address for a synthesis request."""
+    material = "\x1f".join([normalize_text(text), voice_id, model_id, output_format])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    def __init__(
+        self,
+        max_memory_bytes: int = AUDIO_CACHE_MEMORY_BYTES,
+        disk_dir: Optional[Path] = None,
+        max_disk_bytes: int = AUDIO_CACHE_DISK_BYTES,
+        verify: str = AUDIO_CACHE_VERIFY,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_memory_bytes: Upper bound for audio held in memory
+            disk_dir: Directory for the on-disk tier, or None to disable it
+            max_disk_bytes: Upper bound for audio stored on disk
+            verify: Startup check of clips on disk, "size" or "hash"
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.disk_dir = disk_dir
+        self.verify = verify
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._digests: Dict[str, str] = {}
+        self._index_task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self.disk_corrupt = 0
+
+        if self.disk_dir is not None:
+            self._load_disk_index()
+
+    def _load_disk_index(self) -> None:
+        """Restore the disk tier from its index and check it against the files."""
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        files: Dict[str, Path] = {}
+        for path in self.disk_dir.iterdir():
+            if path.suffix == ".tmp":
+                # Left over from a write that was interrupted
+                self._remove_files([path])
+            elif path.is_file() and path.suffix == ".audio":
+                files[path.stem] = path
+
+        for key, size, digest in self._read_index():
+            path = files.pop(key, None)
+            if path is None:
+                continue
+            if self._check_file(path, size, digest):
+                self._add_to_disk(key, size, digest)
+            else:
+                logger.warning(f"Removing corrupt cached clip {key}")
+                self.disk_corrupt += 1
+                self._remove_files([path])
+
+        # Clips without an index entry, e.g. copied into the image, are adopted
+        adopted = sorted(files.values(), key=lambda p: p.stat().st_mtime)
+        for path in adopted:
+            audio = path.read_bytes()
+            self._add_to_disk(path.stem, len(audio), hashlib.sha256(audio).hexdigest())
+
+        self._write_index(self.disk_dir / INDEX_FILE, self._index_entries())
+        logger.info(
+            f"Audio cache loaded {len(self._disk)} clips from {self.disk_dir} "
+            f"({len(adopted)} adopted, {self.disk_corrupt} corrupt)"
+        )
+
+    def _read_index(self) -> List[List]:
+        try:
+            with open(self.disk_dir / INDEX_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)["clips"]
+        except FileNotFoundError:
+            return []
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable audio cache index: {e}")
+            return []
+
+    def _check_file(self, path: Path, size: int, digest: str) -> bool:
+        try:
+            if path.stat().st_size != size:
+                return False
+            if self.verify == "hash":
+                return hashlib.sha256(path.read_bytes()).hexdigest() == digest
+        except OSError:
+            return False
+        return True
+
+    def _add_to_disk(self, key: str, size: int, digest: str) -> None:
+        self._disk[key] = size
+        self._disk_bytes += size
+        self._digests[key] = digest
+
+    def _drop_from_disk(self, key: str) -> None:
+        self._disk_bytes -= self._disk.pop(key, 0)
+        self._digests.pop(key, None)
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.audio"
+
+    def path(self, key: str) -> Optional[Path]:
+        """Return the file holding a clip on disk, so it can be served without reading it.
+
+        Counts as a hit when the clip is on disk. Returns None otherwise,
+        without counting a miss, so the caller can fall back to ``get``.
+        """
+        if key not in self._disk:
+            return None
+        path = self._disk_path(key)
+        if not path.exists():
+            # Evicted by another worker sharing the directory
+            self._drop_from_disk(key)
+            self._save_index_soon()
+            return None
+        self._disk.move_to_end(key)
+        self.hits += 1
+        self._save_index_soon()
+        return path
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio for a key, or None on a miss."""
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return audio
+
+        if key in self._disk:
+            try:
+                audio = await asyncio.to_thread(self._disk_path(key).read_bytes)
+            except OSError as e:
+                logger.warning(f"Dropping unreadable cached clip {key}: {e}")
+                self._drop_from_disk(key)
+                self._save_index_soon()
+            else:
+                self._disk.move_to_end(key)
+                self._save_index_soon()
+                self._store_in_memory(key, audio)
+                self.hits += 1
+                return audio
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, audio: bytes) -> None:
+        """Store audio under a key in every enabled tier."""
+        self._store_in_memory(key, audio)
+
+        if self.disk_dir is None or key in self._disk or len(audio) > self.max_disk_bytes:
+            return
+        try:
+            digest = await asyncio.to_thread(self._write_file, self._disk_path(key), audio)
+        except OSError as e:
+            logger.warning(f"Failed to write cached clip {key}: {e}")
+            return
+        if key in self._disk:
+            return
+        self._add_to_disk(key, len(audio), digest)
+        await self._evict_disk()
+        self._save_index_soon()
+
+    async def flush(self) -> None:
+        """Write pending index changes now, e.g. on shutdown."""
+        if self._index_task is not None:
+            self._index_task.cancel()
+            self._index_task = None
+        if self.disk_dir is not None:
+            await asyncio.to_thread(
+                self._write_index, self.disk_dir / INDEX_FILE, self._index_entries()
+            )
+
+    def _store_in_memory(self, key: str, audio: bytes) -> None:
+        if len(audio) > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.memory_evictions += 1
+
+    async def _evict_disk(self) -> None:
+        evicted = []
+        while self._disk_bytes > self.max_disk_bytes:
+            key = next(iter(self._disk))
+            self._drop_from_disk(key)
+            self.disk_evictions += 1
+            evicted.append(self._disk_path(key))
+        if evicted:
+            await asyncio.to_thread(self._remove_files, evicted)
+
+    def _index_entries(self) -> List[List]:
+        return [[key, size, self._digests[key]] for key, size in self._disk.items()]
+
+    def _save_index_soon(self) -> None:
+        """Rewrite the index after a short delay, batching changes made meanwhile."""
+        if self.disk_dir is None or self._index_task is not None:
+            return
+        try:
+            self._index_task = asyncio.get_running_loop().create_task(self._save_index())
+        except RuntimeError:
+            # No event loop; the next change or flush() writes the index
+            pass
+
+    async def _save_index(self) -> None:
+        await asyncio.sleep(AUDIO_CACHE_INDEX_DELAY)
+        self._index_task = None
+        try:
+            await asyncio.to_thread(
+                self._write_index, self.disk_dir / INDEX_FILE, self._index_entries()
+            )
+        except OSError as e:
+            logger.warning(f"Failed to write audio cache index: {e}")
+
+    @staticmethod
+    def _write_index(path: Path, entries: List[List]) -> None:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "clips": entries}, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _write_file(path: Path, audio: bytes) -> str:
+        # Write to a temporary name first so readers never see a partial clip; the
+        # process id keeps workers sharing the directory from clobbering each other
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(audio)
+        os.replace(tmp_path, path)
+        return hashlib.sha256(audio).hexdigest()
+
+    @staticmethod
+    def _remove_files(paths) -> None:
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current tier sizes."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+            "disk_corrupt": self.disk_corrupt,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_entries": len(self._disk),
+            "disk_bytes": self._disk_bytes,
+        }
+
+
+# Create a singleton instance
+audio_cache = AudioCache(disk_dir=Path(AUDIO_CACHE_DIR) if AUDIO_CACHE_DIR else None)
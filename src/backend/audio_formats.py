@@ -0,0 +1,88 @@
+"""
+Audio Formats
+
+Output formats accepted by the ElevenLabs API, with the content type and file
+extension each one is served with. PCM is raw signed 16-bit little-endian mono
+at the given sample rate; Opus comes in an Ogg container.
+"""
+
+from typing import AsyncGenerator, AsyncIterator, Dict, Optional, Tuple
+
+DEFAULT_OUTPUT_FORMAT = "mp3_44100_128"
+
+# Format name -> (content type, file extension)
+OUTPUT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "mp3_22050_32": ("audio/mpeg", "mp3"),
+    "mp3_44100_32": ("audio/mpeg", "mp3"),
+    "mp3_44100_64": ("audio/mpeg", "mp3"),
+    "mp3_44100_96": ("audio/mpeg", "mp3"),
+    "mp3_44100_128": ("audio/mpeg", "mp3"),
+    "mp3_44100_192": ("audio/mpeg", "mp3"),
+    "pcm_16000": ("audio/pcm;rate=16000", "pcm"),
+    "pcm_22050": ("audio/pcm;rate=22050", "pcm"),
+    "pcm_24000": ("audio/pcm;rate=24000", "pcm"),
+    "pcm_44100": ("audio/pcm;rate=44100", "pcm"),
+    "opus_48000_32": ("audio/ogg;codecs=opus", "ogg"),
+    "opus_48000_64": ("audio/ogg;codecs=opus", "ogg"),
+    "opus_48000_96": ("audio/ogg;codecs=opus", "ogg"),
+    "opus_48000_128": ("audio/ogg;codecs=opus", "ogg"),
+    "opus_48000_192": ("audio/ogg;codecs=opus", "ogg"),
+}
+
+# Bytes per PCM sample frame (16-bit mono)
+PCM_FRAME_BYTES = 2
+
+
+def validate_output_format(output_format: Optional[str]) -> str:
+    """Return the format to use, raising ValueError for unknown formats."""
+    if output_format is None:
+        return DEFAULT_OUTPUT_FORMAT
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(
+            f"Unsupported output format {output_format!r}; "
+            f"expected one of {', '.join(OUTPUT_FORMATS)}"
+        )
+    return output_format
+
+
+def content_type(output_format: str) -> str:
+    return OUTPUT_FORMATS[output_format][0]
+
+
+def file_extension(output_format: str) -> str:
+    return OUTPUT_FORMATS[output_format][1]
+
+
+def is_pcm(output_format: str) -> bool:
+    return output_format.startswith("pcm_")
+
+
+def estimate_duration(output_format: str, size: int) -> float:
+    """Seconds of audio in ``size`` bytes.
+
+    Exact for PCM; MP3 and Opus are estimated from the nominal bitrate.
+    """
+    _, sample_rate, *bitrate = output_format.split("_")
+    if is_pcm(output_format):
+        return size / PCM_FRAME_BYTES / int(sample_rate)
+    return size * 8 / (int(bitrate[0]) * 1000)
+
+
+async def align_frames(
+    stream: AsyncIterator[bytes], frame_bytes: int = PCM_FRAME_BYTES
+) -> AsyncGenerator[bytes, None]:
+    """Re-chunk a stream so every chunk holds whole PCM sample frames.
+
+    Upstream chunk boundaries fall anywhere; a listener scheduling raw PCM
+    needs each chunk to start on a sample boundary.
+    """
+    carry = b""
+    async for chunk in stream:
+        if carry:
+            chunk = carry + chunk
+        cut = len(chunk) - len(chunk) % frame_bytes
+        carry = chunk[cut:]
+        if cut:
+            yield chunk[:cut]
+    if carry:
+        yield carry
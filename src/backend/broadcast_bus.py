@@ -0,0 +1,252 @@
+"""
+Broadcast Bus
+
+Pub/sub backends that carry WebSocket broadcasts and MCP messages between
+service instances. Every instance delivers to its own sockets directly and
+publishes a copy on the bus; instances only ever deliver what they receive from
+the bus to their local sockets.
+
+Backends:
+- ``local``: in-process only, the default for a single instance
+- ``redis``: any broker speaking the Redis PUBLISH/SUBSCRIBE protocol, e.g.
+  ElastiCache, for several ECS tasks behind one load balancer
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from .frames import dumps
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BROADCAST_BACKEND = os.getenv("BROADCAST_BACKEND", "local")
+BROADCAST_URL = os.getenv("BROADCAST_URL", "redis://localhost:6379/0")
+BROADCAST_CHANNEL = os.getenv("BROADCAST_CHANNEL", "jessica:broadcast")
+BROADCAST_QUEUE_SIZE = int(os.getenv("BROADCAST_QUEUE_SIZE", "1024"))
+BROADCAST_RECONNECT_DELAY = float(os.getenv("BROADCAST_RECONNECT_DELAY", "1.0"))
+
+
+@dataclass(frozen=True)
+class BusMessage:
+    """A message received from another instance."""
+
+    origin: str
+    kind: str
+    message: Dict[str, Any]
+    audio: Optional[bytes] = None
+
+
+DeliverCallback = Callable[[BusMessage], Awaitable[None]]
+
+
+def encode_bus_message(origin: str, kind: str, message: Dict, audio: Optional[bytes]) -> bytes:
+    """Encode a bus message as a JSON header, optionally followed by raw audio."""
+    header = dumps({"origin": origin, "kind": kind, "message": message}).encode("utf-8")
+    if audio is None:
+        return header
+    # Compact JSON never contains a raw newline, so it separates header and audio
+    return header + b"\n" + audio
+
+
+def decode_bus_message(payload: bytes) -> BusMessage:
+    header, separator, audio = payload.partition(b"\n")
+    data = json.loads(header)
+    return BusMessage(
+        origin=data["origin"],
+        kind=data["kind"],
+        message=data["message"],
+        audio=audio if separator else None,
+    )
+
+
+class BusError(Exception):
+    """Error reply from the broker."""
+
+
+class BroadcastBus:
+    """In-process bus: there are no other instances to deliver to."""
+
+    # Whether messages can reach other instances
+    distributed = False
+
+    def __init__(self):
+        self.node_id = uuid.uuid4().hex
+        self._deliver: Optional[DeliverCallback] = None
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        """Start receiving messages published by other instances."""
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        pass
+
+    def publish(self, kind: str, message: Dict, audio: Optional[bytes] = None) -> None:
+        """Publish a message to other instances without waiting for delivery."""
+
+
+class RedisBroadcastBus(BroadcastBus):
+    """Bus backed by a broker speaking the Redis PUBLISH/SUBSCRIBE protocol.
+
+    Publishing only enqueues; a background task forwards the queue to the
+    broker, so request handlers never wait on remote delivery. If the broker
+    is unreachable, messages are dropped once the queue is full and both
+    connections are retried.
+    """
+
+    distributed = True
+
+    def __init__(
+        self,
+        url: str = BROADCAST_URL,
+        channel: str = BROADCAST_CHANNEL,
+        queue_size: int = BROADCAST_QUEUE_SIZE,
+        reconnect_delay: float = BROADCAST_RECONNECT_DELAY,
+    ):
+        super().__init__()
+        self.url = urlparse(url)
+        self.channel = channel.encode("utf-8")
+        self.reconnect_delay = reconnect_delay
+        self.dropped = 0
+        self._outbound: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._tasks: List[asyncio.Task] = []
+        self._subscribed = asyncio.Event()
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        await super().start(deliver)
+        self._tasks = [
+            asyncio.create_task(self._publish_loop()),
+            asyncio.create_task(self._subscribe_loop()),
+        ]
+        logger.info(f"Broadcast bus connecting to {self.url.hostname}:{self.url.port or 6379}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def wait_subscribed(self) -> None:
+        """Wait until the subscriber connection is established."""
+        await self._subscribed.wait()
+
+    def publish(self, kind: str, message: Dict, audio: Optional[bytes] = None) -> None:
+        try:
+            self._outbound.put_nowait(encode_bus_message(self.node_id, kind, message, audio))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning("Broadcast bus queue full, dropping message for remote instances")
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(
+            self.url.hostname or "localhost", self.url.port or 6379
+        )
+        if self.url.password:
+            await _command(reader, writer, b"AUTH", self.url.password.encode("utf-8"))
+        return reader, writer
+
+    async def _publish_loop(self) -> None:
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                while True:
+                    payload = await self._outbound.get()
+                    await _command(reader, writer, b"PUBLISH", self.channel, payload)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ConnectionError, BusError) as e:
+                logger.warning(f"Broadcast bus publisher disconnected: {str(e)}")
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+    async def _subscribe_loop(self) -> None:
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                await _command(reader, writer, b"SUBSCRIBE", self.channel)
+                self._subscribed.set()
+                while True:
+                    reply = await _read_reply(reader)
+                    if not isinstance(reply, list) or len(reply) != 3 or reply[0] != b"message":
+                        continue
+                    await self._receive(reply[2])
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ConnectionError, BusError) as e:
+                self._subscribed.clear()
+                logger.warning(f"Broadcast bus subscriber disconnected: {str(e)}")
+                await asyncio.sleep(self.reconnect_delay)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+    async def _receive(self, payload: bytes) -> None:
+        try:
+            bus_message = decode_bus_message(payload)
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed broadcast bus message: {str(e)}")
+            return
+        if bus_message.origin == self.node_id or self._deliver is None:
+            return
+        try:
+            await self._deliver(bus_message)
+        except Exception as e:
+            logger.error(f"Failed to deliver broadcast bus message: {str(e)}")
+
+
+def encode_command(*args: bytes) -> bytes:
+    """Encode a command in the Redis serialization protocol."""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by broker")
+    prefix, rest = line[:1], line[1:-2]
+    if prefix == b"+":
+        return rest
+    if prefix == b"-":
+        raise BusError(rest.decode("utf-8", errors="replace"))
+    if prefix == b":":
+        return int(rest)
+    if prefix == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if prefix == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise BusError(f"Unexpected reply from broker: {line!r}")
+
+
+async def _command(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, *args: bytes) -> Any:
+    writer.write(encode_command(*args))
+    await writer.drain()
+    return await _read_reply(reader)
+
+
+def create_bus(backend: str = BROADCAST_BACKEND) -> BroadcastBus:
+    """Create the bus backend selected by BROADCAST_BACKEND."""
+    if backend == "redis":
+        return RedisBroadcastBus()
+    if backend != "local":
+        logger.warning(f"Unknown broadcast backend {backend!r}, using the in-process bus")
+    return BroadcastBus()
@@ -0,0 +1,98 @@
+"""
+Pub/Sub Broker
+
+A minimal broker speaking the subset of the Redis protocol the broadcast bus
+uses (SUBSCRIBE, PUBLISH, AUTH, PING). The launcher runs it on localhost when
+several workers share one host and no external broker is configured.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Set
+
+from .broadcast_bus import encode_command
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class PubSubBroker:
+    def __init__(self):
+        self.subscribers: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self.url: Optional[str] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start listening and return the broker URL."""
+        self._server = await asyncio.start_server(self._handle, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"redis://{host}:{port}/0"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+
+    def serve_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Run the broker on its own event loop in a daemon thread."""
+        started = threading.Event()
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(self.start(host, port))
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, name="pubsub-broker", daemon=True).start()
+        started.wait()
+        logger.info(f"Pub/sub broker listening on {self.url}")
+        return self.url
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                command = await self._read_command(reader)
+                if command is None:
+                    break
+                name = command[0].upper()
+                if name == b"SUBSCRIBE":
+                    for channel in command[1:]:
+                        self.subscribers.setdefault(channel, set()).add(writer)
+                        writer.write(b"*3\r\n$9\r\nsubscribe\r\n")
+                        writer.write(b"$%d\r\n%s\r\n:1\r\n" % (len(channel), channel))
+                elif name == b"PUBLISH":
+                    channel, payload = command[1], command[2]
+                    receivers = self.subscribers.get(channel, set())
+                    for subscriber in receivers:
+                        subscriber.write(encode_command(b"message", channel, payload))
+                    writer.write(b":%d\r\n" % len(receivers))
+                elif name in (b"AUTH", b"PING"):
+                    writer.write(b"+OK\r\n")
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            for subscribers in self.subscribers.values():
+                subscribers.discard(writer)
+            self._writers.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int((await reader.readline())[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
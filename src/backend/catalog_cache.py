@@ -0,0 +1,94 @@
+"""
+Catalog Cache
+
+TTL cache for the voice and model catalogs. Concurrent misses for the same entry
+share a single upstream fetch, and expired entries keep being served while a
+background refresh runs.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+CATALOG_CACHE_STALE_TTL = float(os.getenv("CATALOG_CACHE_STALE_TTL", "3600"))
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    value: Any
+    etag: str
+    fetched_at: float
+
+
+class CatalogCache:
+    def __init__(self, ttl: float = CATALOG_CACHE_TTL, stale_ttl: float = CATALOG_CACHE_STALE_TTL):
+        """Initialize the cache.
+
+        Args:
+            ttl: Seconds an entry is served without refreshing
+            stale_ttl: Further seconds an expired entry is served while refreshing
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: Dict[str, CatalogEntry] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def get(self, name: str, fetch: Callable[[], Awaitable[Any]]) -> CatalogEntry:
+        """Return the entry for a catalog, fetching it if needed."""
+        entry = self._entries.get(name)
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+            if age < self.ttl:
+                return entry
+            if age < self.ttl + self.stale_ttl:
+                # Serve the stale value and refresh in the background
+                self._refresh(name, fetch)
+                return entry
+
+        return await asyncio.shield(self._refresh(name, fetch))
+
+    def _refresh(self, name: str, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start a fetch for a catalog unless one is already running."""
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.create_task(self._fetch(name, fetch))
+            # Failures are logged in _fetch; retrieve them so background
+            # refreshes nobody awaits do not warn on garbage collection
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[name] = task
+        return task
+
+    async def _fetch(self, name: str, fetch: Callable[[], Awaitable[Any]]) -> CatalogEntry:
+        try:
+            value = await fetch()
+            entry = CatalogEntry(value=value, etag=_etag(value), fetched_at=time.monotonic())
+            self._entries[name] = entry
+            return entry
+        except Exception as e:
+            logger.error(f"Failed to refresh {name} catalog: {str(e)}")
+            raise
+        finally:
+            self._inflight.pop(name, None)
+
+    def invalidate(self, name: str) -> None:
+        """Drop a cached catalog so the next read fetches it again."""
+        self._entries.pop(name, None)
+
+
+def _etag(value: Any) -> str:
+    digest = hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+# Create a singleton instance
+catalog_cache = CatalogCache()
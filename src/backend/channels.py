@@ -0,0 +1,26 @@
+"""
+Channels
+
+Listeners subscribe to a channel, e.g. a user, a session or an MCP client id,
+and only receive the clips sent to that channel. Connections that never pick
+one share the default channel, so a single-user setup needs no configuration.
+"""
+
+import os
+import re
+from typing import Optional
+
+DEFAULT_CHANNEL = os.getenv("WS_DEFAULT_CHANNEL", "default")
+
+_CHANNEL_PATTERN = re.compile(r"[\w.:@-]{1,128}")
+
+
+def validate_channel(channel: Optional[str]) -> str:
+    """Return the channel to use, raising ValueError for malformed names."""
+    if channel is None or channel == "":
+        return DEFAULT_CHANNEL
+    if not isinstance(channel, str) or not _CHANNEL_PATTERN.fullmatch(channel):
+        raise ValueError(
+            f"Invalid channel {channel!r}; use up to 128 letters, digits and . : @ _ -"
+        )
+    return channel
@@ -0,0 +1,165 @@
+"""
+Config Store
+
+Loads configuration files once and serves reads from memory. External edits are
+picked up by a throttled mtime check, writes are atomic and run off the event
+loop, and readers get immutable snapshots so hot paths never touch the disk.
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional
+
+import yaml
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Minimum seconds between mtime checks for external edits
+CONFIG_CHECK_INTERVAL = float(os.getenv("CONFIG_CHECK_INTERVAL", "1.0"))
+
+# Configuration paths
+CONFIG_DIR = Path.home() / ".config" / "elevenlabs-mcp"
+CONFIG_FILE = CONFIG_DIR / "config.json"
+APP_CONFIG_FILE = Path("config.yaml")
+
+# Default configuration
+DEFAULT_CONFIG = {
+    "default_voice_id": "cgSgspJ2msm6clMCkdW9",  # Jessica's voice ID
+    "default_model_id": "eleven_flash_v2_5",
+    "settings": {
+        "auto_play": True,
+        "use_streaming": True,
+    },
+}
+DEFAULT_APP_CONFIG = {"voices": {}, "settings": {}}
+
+
+def freeze(value: Any) -> Any:
+    """Return a read-only view of nested dicts and lists."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Return a mutable deep copy of a frozen snapshot."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class ConfigStore:
+    def __init__(
+        self,
+        path: Path,
+        default: Dict[str, Any],
+        fmt: str = "json",
+        create: bool = True,
+        check_interval: float = CONFIG_CHECK_INTERVAL,
+    ):
+        """Initialize the store.
+
+        Args:
+            path: File backing the configuration
+            default: Configuration used when the file is missing or unreadable
+            fmt: File format, either "json" or "yaml"
+            create: Write the default configuration if the file does not exist
+            check_interval: Minimum seconds between mtime checks
+        """
+        self.path = path
+        self.default = default
+        self.fmt = fmt
+        self.create = create
+        self.check_interval = check_interval
+
+        self._snapshot: Optional[Mapping[str, Any]] = None
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._write_lock = threading.Lock()
+        self._update_lock: Optional[asyncio.Lock] = None
+
+    def snapshot(self) -> Mapping[str, Any]:
+        """Return the current configuration as an immutable mapping."""
+        now = time.monotonic()
+        if self._snapshot is None or now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._reload_if_changed()
+        return self._snapshot
+
+    def load(self) -> Dict[str, Any]:
+        """Return a mutable copy of the current configuration."""
+        return thaw(self.snapshot())
+
+    def save(self, config: Dict[str, Any]) -> Mapping[str, Any]:
+        """Write the configuration and make it the current snapshot."""
+        with self._write_lock:
+            self._write(config)
+            self._snapshot = freeze(copy.deepcopy(config))
+        return self._snapshot
+
+    async def update(self, config: Dict[str, Any]) -> Mapping[str, Any]:
+        """Write the configuration without blocking the event loop."""
+        if self._update_lock is None:
+            self._update_lock = asyncio.Lock()
+        async with self._update_lock:
+            return await asyncio.to_thread(self.save, config)
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            if self._snapshot is None:
+                if self.create:
+                    self.save(self.default)
+                else:
+                    self._snapshot = freeze(copy.deepcopy(self.default))
+            return
+
+        if mtime == self._mtime and self._snapshot is not None:
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = yaml.safe_load(f) if self.fmt == "yaml" else json.load(f)
+            self._snapshot = freeze(data if data is not None else self.default)
+            logger.debug(f"Loaded configuration from {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to load configuration from {self.path}: {str(e)}")
+            if self._snapshot is None:
+                self._snapshot = freeze(copy.deepcopy(self.default))
+        self._mtime = mtime
+
+    def _write(self, config: Dict[str, Any]) -> None:
+        # Write to a temporary file in the same directory and rename it into
+        # place so readers never see a partially written file
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                if self.fmt == "yaml":
+                    yaml.safe_dump(config, f)
+                else:
+                    json.dump(config, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._mtime = self.path.stat().st_mtime
+
+
+# Create singleton instances
+config_store = ConfigStore(CONFIG_FILE, DEFAULT_CONFIG)
+app_config_store = ConfigStore(APP_CONFIG_FILE, DEFAULT_APP_CONFIG, fmt="yaml", create=False)
@@ -4,20 +4,56 @@ import os
 from fastapi import HTTPException
 import logging
 import elevenlabs
-from elevenlabs import stream, generate, voices
+from elevenlabs import generate, voices
 import asyncio
+import time
+from urllib.parse import urlencode
+from .audio_formats import DEFAULT_OUTPUT_FORMAT, content_type
+from .input_stream import InputStream, MockInputStream
+from .metrics import UPSTREAM_DURATION, UPSTREAM_FIRST_BYTE
+from .upstream_scheduler import (
+    RETRY_STATUS_CODES,
+    UPSTREAM_MAX_RETRIES,
+    UpstreamScheduler,
+    parse_retry_after,
+    retry_delay,
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upstream configuration
+ELEVENLABS_API_URL = os.getenv("ELEVENLABS_API_URL", "https://api.elevenlabs.io/v1")
+DEFAULT_MODEL_ID = "eleven_monolingual_v1"
+SYNTHESIS_TIMEOUT = float(os.getenv("ELEVENLABS_SYNTHESIS_TIMEOUT", "60"))
+CONNECT_TIMEOUT = float(os.getenv("ELEVENLABS_CONNECT_TIMEOUT", "5"))
+MAX_CONNECTIONS = int(os.getenv("ELEVENLABS_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("ELEVENLABS_MAX_KEEPALIVE_CONNECTIONS", "10"))
+KEEPALIVE_EXPIRY = float(os.getenv("ELEVENLABS_KEEPALIVE_EXPIRY", "30"))
+HTTP2_ENABLED = os.getenv("ELEVENLABS_HTTP2", "true").lower() == "true"
+STREAM_LATENCY = int(os.getenv("ELEVENLABS_STREAM_LATENCY", "3"))
+STREAM_QUEUE_SIZE = int(os.getenv("TTS_STREAM_QUEUE_SIZE", "16"))
+
+# HTTP/2 needs the optional h2 package
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Marks the end of an upstream audio stream in the chunk queue
+_STREAM_END = object()
+
 
 class ElevenLabsClient:
-    def __init__(self, test_mode: bool = False):
+    def __init__(self, test_mode: bool = False, base_url: Optional[str] = None):
         """Initialize the ElevenLabs client.
 
         Args:
             test_mode: If True, use mock responses for testing
+            base_url: Override for the ElevenLabs API base URL
         """
         self.test_mode = test_mode
 
@@ -31,8 +67,84 @@ class ElevenLabsClient:
             # Set the API key for the elevenlabs library as well
             elevenlabs.set_api_key(self.api_key)
 
-        self.base_url = "https://api.elevenlabs.io/v1"
+        self.base_url = base_url or ELEVENLABS_API_URL
         self.headers = {"Accept": "application/json", "xi-api-key": self.api_key}
+        self._http: Optional[httpx.AsyncClient] = None
+        self.scheduler = UpstreamScheduler()
+
+    @property
+    def http(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by every upstream call.
+
+        Created on first use if ``start()`` has not run yet. Building an
+        ``httpx.AsyncClient`` loads the TLS trust store synchronously, so it
+        must never be created per request.
+        """
+        if self._http is None or self._http.is_closed:
+            self._http = self._build_http_client()
+        return self._http
+
+    def _build_http_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(SYNTHESIS_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            http2=HTTP2_ENABLED and HTTP2_AVAILABLE,
+        )
+
+    async def start(self) -> None:
+        """Open the connection pool."""
+        if not self.test_mode and (self._http is None or self._http.is_closed):
+            self._http = self._build_http_client()
+            logger.info(
+                f"ElevenLabs connection pool opened (max_connections={MAX_CONNECTIONS}, "
+                f"http2={HTTP2_ENABLED and HTTP2_AVAILABLE})"
+            )
+
+    async def aclose(self) -> None:
+        """Close the connection pool."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        operation: str,
+        priority: str = "default",
+        chars: int = 0,
+        **kwargs,
+    ) -> httpx.Response:
+        """Send a request through the scheduler, retrying 429 and 5xx responses."""
+        for attempt in range(UPSTREAM_MAX_RETRIES + 1):
+            # Characters are charged once; a rejected request did not use them
+            async with self.scheduler.slot(priority, chars if attempt == 0 else 0):
+                started = time.perf_counter()
+                async with self.http.stream(method, url, **kwargs) as response:
+                    UPSTREAM_FIRST_BYTE.labels(operation).observe(time.perf_counter() - started)
+                    await response.aread()
+                UPSTREAM_DURATION.labels(operation).observe(time.perf_counter() - started)
+            delay = self._retry_delay(response, attempt)
+            if delay is None:
+                return response
+            await asyncio.sleep(delay)
+        return response
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        if response.status_code not in RETRY_STATUS_CODES or attempt >= UPSTREAM_MAX_RETRIES:
+            return None
+        delay = retry_delay(attempt, parse_retry_after(response.headers.get("Retry-After")))
+        if delay is not None:
+            self.scheduler.retries += 1
+            logger.warning(
+                f"ElevenLabs returned {response.status_code}, retrying in {delay:.2f}s "
+                f"(attempt {attempt + 1}/{UPSTREAM_MAX_RETRIES})"
+            )
+        return delay
 
     def _get_mock_audio(self, text: str) -> bytes:
         """Generate mock audio data for testing."""
@@ -53,78 +165,120 @@ class ElevenLabsClient:
         ]
 
     async def text_to_speech(
-        self, text: str, voice_id: str, model_id: Optional[str] = None
+        self,
+        text: str,
+        voice_id: str,
+        model_id: Optional[str] = None,
+        priority: str = "default",
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
     ) -> bytes:
-        """Convert text to speech."""
+        """Convert text to speech.
+
+        ``priority`` is one of the scheduler's priority classes: "interactive",
+        "default" or "batch". ``output_format`` is an ElevenLabs format name
+        such as "mp3_44100_128", "pcm_16000" or "opus_48000_64".
+        """
         if self.test_mode:
             return self._get_mock_audio(text)
 
+        # Call the REST API natively so synthesis never blocks the event loop
+        url = f"{self.base_url}/text-to-speech/{voice_id}"
+        payload = {"text": text, "model_id": model_id or DEFAULT_MODEL_ID}
+        headers = {**self.headers, "Accept": content_type(output_format)}
+
         try:
-            # Use the elevenlabs library directly for better compatibility
-            audio = generate(text=text, voice=voice_id, model=model_id or "eleven_monolingual_v1")
-            return audio
-        except Exception as e:
+            response = await self._request(
+                "POST",
+                url,
+                "synthesize",
+                priority,
+                len(text),
+                json=payload,
+                headers=headers,
+                params={"output_format": output_format},
+            )
+        except httpx.RequestError as e:
             logger.error(f"Text-to-speech conversion failed: {str(e)}")
             raise HTTPException(
                 status_code=500,
                 detail=f"Text-to-speech conversion failed: {str(e)}",
             )
 
+        if response.status_code != 200:
+            error_detail = response.text if response.content else "No error details"
+            logger.error(f"Text-to-speech conversion failed: {error_detail}")
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Text-to-speech conversion failed: {error_detail}",
+            )
+        return response.content
+
     async def get_voices(self) -> List[Dict]:
         """Fetch available voices."""
         if self.test_mode:
             return self._get_mock_voices()
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(f"{self.base_url}/voices", headers=self.headers)
-                if response.status_code != 200:
-                    error_detail = response.json() if response.content else "No error details"
-                    logger.error(f"Failed to fetch voices: {error_detail}")
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"Failed to fetch voices from ElevenLabs API: {error_detail}",
-                    )
-                data = response.json()
-                return data["voices"]
-            except httpx.RequestError as e:
-                logger.error(f"Connection error when fetching voices: {str(e)}")
+        try:
+            response = await self._request(
+                "GET", f"{self.base_url}/voices", "voices", "catalog", headers=self.headers
+            )
+            if response.status_code != 200:
+                error_detail = response.json() if response.content else "No error details"
+                logger.error(f"Failed to fetch voices: {error_detail}")
                 raise HTTPException(
-                    status_code=500, detail=f"Failed to connect to ElevenLabs API: {str(e)}"
+                    status_code=response.status_code,
+                    detail=f"Failed to fetch voices from ElevenLabs API: {error_detail}",
                 )
+            data = response.json()
+            return data["voices"]
+        except httpx.RequestError as e:
+            logger.error(f"Connection error when fetching voices: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to connect to ElevenLabs API: {str(e)}"
+            )
 
     async def get_models(self) -> List[Dict]:
         """Fetch available models."""
         if self.test_mode:
             return self._get_mock_models()
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(f"{self.base_url}/models", headers=self.headers)
-                if response.status_code != 200:
-                    error_detail = response.json() if response.content else "No error details"
-                    logger.error(f"Failed to fetch models: {error_detail}")
-                    raise HTTPException(
-                        status_code=response.status_code,
-                        detail=f"Failed to fetch models from ElevenLabs API: {error_detail}",
-                    )
-                data = response.json()
-                models = []
-                for model in data:
-                    models.append(
-                        {"model_id": model.get("model_id", ""), "name": model.get("name", "")}
-                    )
-                return models
-            except httpx.RequestError as e:
-                logger.error(f"Connection error when fetching models: {str(e)}")
+        try:
+            response = await self._request(
+                "GET", f"{self.base_url}/models", "models", "catalog", headers=self.headers
+            )
+            if response.status_code != 200:
+                error_detail = response.json() if response.content else "No error details"
+                logger.error(f"Failed to fetch models: {error_detail}")
                 raise HTTPException(
-                    status_code=500, detail=f"Failed to connect to ElevenLabs API: {str(e)}"
+                    status_code=response.status_code,
+                    detail=f"Failed to fetch models from ElevenLabs API: {error_detail}",
                 )
+            data = response.json()
+            models = []
+            for model in data:
+                models.append(
+                    {"model_id": model.get("model_id", ""), "name": model.get("name", "")}
+                )
+            return models
+        except httpx.RequestError as e:
+            logger.error(f"Connection error when fetching models: {str(e)}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to connect to ElevenLabs API: {str(e)}"
+            )
 
     async def text_to_speech_stream(
-        self, text: str, voice_id: str, model_id: Optional[str] = None
+        self,
+        text: str,
+        voice_id: str,
+        model_id: Optional[str] = None,
+        priority: str = "default",
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
     ) -> AsyncGenerator[bytes, None]:
-        """Stream text to speech conversion."""
+        """Stream text to speech conversion.
+
+        The scheduler slot is held until the stream ends, since the upstream
+        counts an open stream against the key's concurrency.
+        """
         if self.test_mode:
             # In test mode, yield mock audio in chunks
             mock_audio = self._get_mock_audio(text)
@@ -134,30 +288,135 @@ class ElevenLabsClient:
                 await asyncio.sleep(0.1)  # Simulate streaming delay
             return
 
-        # Use the elevenlabs library for streaming in production
         if not self.api_key:
             raise ValueError("API key is required for streaming")
 
-        elevenlabs.set_api_key(self.api_key)
+        url = f"{self.base_url}/text-to-speech/{voice_id}/stream"
+        payload = {"text": text, "model_id": model_id or DEFAULT_MODEL_ID}
+        headers = {**self.headers, "Accept": content_type(output_format)}
+        params = {"optimize_streaming_latency": STREAM_LATENCY, "output_format": output_format}
+
+        # The producer reads upstream while the consumer yields; the bounded
+        # queue stalls upstream reads whenever the downstream client falls behind.
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        producer = asyncio.create_task(
+            self._pump_stream(url, payload, headers, params, queue, priority, len(text))
+        )
         try:
-            audio_stream = stream(
-                text=text,
-                voice=voice_id,
-                model=model_id or "eleven_monolingual_v1",
-                stream=True,
-                latency=3,
-            )
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            producer.cancel()
 
-            for chunk in audio_stream:
-                if isinstance(chunk, bytes):
-                    yield chunk
-                    await asyncio.sleep(0.01)
+    async def _pump_stream(
+        self,
+        url: str,
+        payload: Dict,
+        headers: Dict,
+        params: Dict,
+        queue: asyncio.Queue,
+        priority: str = "default",
+        chars: int = 0,
+    ) -> None:
+        """Copy upstream audio chunks into the queue, ending with a sentinel."""
+        try:
+            for attempt in range(UPSTREAM_MAX_RETRIES + 1):
+                async with self.scheduler.slot(priority, chars if attempt == 0 else 0):
+                    started = time.perf_counter()
+                    async with self.http.stream(
+                        "POST",
+                        url,
+                        json=payload,
+                        headers=headers,
+                        params=params,
+                    ) as response:
+                        if response.status_code != 200:
+                            body = await response.aread()
+                            delay = self._retry_delay(response, attempt)
+                            if delay is None:
+                                error_detail = (
+                                    body.decode(errors="replace") if body else "No error details"
+                                )
+                                logger.error(
+                                    f"Error during text-to-speech streaming: {error_detail}"
+                                )
+                                raise HTTPException(
+                                    status_code=response.status_code,
+                                    detail=f"Failed to stream text to speech: {error_detail}",
+                                )
+                        else:
+                            first_byte = True
+                            async for chunk in response.aiter_bytes():
+                                if chunk:
+                                    if first_byte:
+                                        first_byte = False
+                                        UPSTREAM_FIRST_BYTE.labels("stream").observe(
+                                            time.perf_counter() - started
+                                        )
+                                    await queue.put(chunk)
+                            UPSTREAM_DURATION.labels("stream").observe(
+                                time.perf_counter() - started
+                            )
+                            await queue.put(_STREAM_END)
+                            return
+                # Back off outside the slot so other requests can use it
+                await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            raise
+        except HTTPException as e:
+            await queue.put(e)
         except Exception as e:
             logger.error(f"Error during text-to-speech streaming: {str(e)}")
-            raise HTTPException(
-                status_code=500, detail=f"Failed to stream text to speech: {str(e)}"
+            await queue.put(
+                HTTPException(status_code=500, detail=f"Failed to stream text to speech: {str(e)}")
             )
 
+    async def text_to_speech_input_stream(
+        self,
+        voice_id: str,
+        model_id: Optional[str] = None,
+        priority: str = "interactive",
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
+    ) -> InputStream:
+        """Open an input-streaming session that takes text incrementally.
+
+        The session holds a scheduler slot until it ends, since the upstream
+        counts the open socket against the key's concurrency.
+        """
+        if self.test_mode:
+            return MockInputStream(self._get_mock_audio)
+
+        if not self.api_key:
+            raise ValueError("API key is required for streaming")
+
+        ws_base = (
+            "ws" + self.base_url[len("http") :]
+            if self.base_url.startswith("http")
+            else self.base_url
+        )
+        query = urlencode(
+            {"model_id": model_id or DEFAULT_MODEL_ID, "output_format": output_format}
+        )
+        stream = InputStream(
+            f"{ws_base}/text-to-speech/{voice_id}/stream-input?{query}",
+            {"xi-api-key": self.api_key},
+            queue_size=STREAM_QUEUE_SIZE,
+            open_timeout=CONNECT_TIMEOUT,
+            on_close=self.scheduler.release,
+        )
+        await self.scheduler.acquire(priority)
+        try:
+            await stream.open()
+        except Exception as e:
+            logger.error(f"Failed to open input stream: {str(e)}")
+            raise HTTPException(status_code=502, detail=f"Failed to open input stream: {str(e)}")
+        return stream
+
     def generate_speech(self, text: str, voice_id: str = None) -> bytes:
         """Generate speech from text using ElevenLabs API."""
         return generate(text=text, voice=voice_id)
@@ -165,3 +424,15 @@ class ElevenLabsClient:
     def list_voices(self):
         """List available voices from ElevenLabs API."""
         return voices()
+
+
+# Process-wide client shared by the REST routes and the MCP tools
+_client: Optional[ElevenLabsClient] = None
+
+
+def get_client() -> ElevenLabsClient:
+    """Return the shared ElevenLabs client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = ElevenLabsClient()
+    return _client
@@ -0,0 +1,53 @@
+"""
+WebSocket Frames
+
+Messages are encoded once into an immutable frame that is shared by every
+recipient, instead of being serialized again per connection. orjson is used for
+encoding when it is installed.
+
+Clients that negotiate the binary protocol receive audio as a JSON control
+header (type, clip id, sequence, size) followed by the raw audio bytes in a
+binary frame; other clients receive the audio base64-encoded inside the JSON.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def dumps(message: Any) -> str:
+    """Serialize a message to a JSON string."""
+    if orjson is not None:
+        return orjson.dumps(message).decode("utf-8")
+    return json.dumps(message)
+
+
+@dataclass(frozen=True)
+class Frame:
+    """An encoded WebSocket message ready to be sent to any number of clients."""
+
+    data: Union[str, bytes]
+
+    @property
+    def binary(self) -> bool:
+        return isinstance(self.data, bytes)
+
+    @classmethod
+    def encode(cls, message: Dict[str, Any]) -> "Frame":
+        return cls(dumps(message))
+
+
+def encode_audio_json(header: Dict[str, Any], audio: bytes) -> Tuple[Frame]:
+    """Encode audio for JSON-protocol clients as a single base64 message."""
+    return (Frame.encode({**header, "data": base64.b64encode(audio).decode("utf-8")}),)
+
+
+def encode_audio_binary(header: Dict[str, Any], audio: bytes) -> Tuple[Frame, Frame]:
+    """Encode audio for binary-protocol clients as a header plus raw bytes."""
+    return Frame.encode({**header, "size": len(audio)}), Frame(bytes(audio))
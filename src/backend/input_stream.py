@@ -0,0 +1,175 @@
+"""
+Input Streaming
+
+Client side of the ElevenLabs WebSocket input-streaming endpoint. Text is sent
+as it is produced and audio comes back as soon as the upstream has enough text
+to generate it, so speech can start before the whole text is known.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+from typing import AsyncGenerator, Callable, Dict, Optional
+
+import websockets
+
+from .metrics import UPSTREAM_DURATION, UPSTREAM_FIRST_BYTE
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marks the end of the audio in the chunk queue
+_STREAM_END = object()
+
+
+class InputStream:
+    """One upstream input-streaming connection.
+
+    ``send`` forwards text, ``close`` asks the upstream to speak whatever is
+    left and finish, and ``audio`` yields the decoded audio chunks. A reader
+    task moves audio from the socket into a bounded queue, so a slow consumer
+    stalls upstream reads instead of buffering without limit.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        queue_size: int = 16,
+        open_timeout: float = 5.0,
+        on_close: Optional[Callable[[], None]] = None,
+    ):
+        self.url = url
+        self.headers = headers
+        self.open_timeout = open_timeout
+        self.chars = 0
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._socket = None
+        self._reader: Optional[asyncio.Task] = None
+        self._on_close = on_close
+        self._started = 0.0
+
+    async def open(self) -> None:
+        """Connect and send the initial message the endpoint expects."""
+        self._started = time.perf_counter()
+        try:
+            self._socket = await websockets.connect(
+                self.url, extra_headers=self.headers, open_timeout=self.open_timeout
+            )
+            # The first message must contain a single space
+            await self._socket.send(json.dumps({"text": " "}))
+        except BaseException:
+            self._release()
+            raise
+        self._reader = asyncio.create_task(self._read())
+
+    async def send(self, text: str, flush: bool = False) -> None:
+        """Send more text; ``flush`` makes the upstream generate what it has now."""
+        if self.closed:
+            raise RuntimeError("Input stream is closed")
+        if not text and not flush:
+            return
+        message = {"text": text, "try_trigger_generation": True}
+        if flush:
+            message["flush"] = True
+        self.chars += len(text)
+        await self._socket.send(json.dumps(message))
+
+    async def close(self) -> None:
+        """Signal the end of the text; the remaining audio still arrives."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self._socket.send(json.dumps({"text": ""}))
+        except websockets.ConnectionClosed:
+            pass
+
+    async def abort(self) -> None:
+        """Drop the connection without waiting for the remaining audio."""
+        self.closed = True
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+        elif self._socket is not None:
+            await self._socket.close()
+            self._release()
+        # Wake a consumer still waiting for audio
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(RuntimeError("Input stream was aborted"))
+
+    async def audio(self) -> AsyncGenerator[bytes, None]:
+        """Yield audio chunks until the upstream sends its final message."""
+        while True:
+            item = await self._queue.get()
+            if item is _STREAM_END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    async def _read(self) -> None:
+        first_byte = True
+        try:
+            async for raw in self._socket:
+                message = json.loads(raw)
+                if message.get("error"):
+                    raise RuntimeError(
+                        f"Input streaming failed: {message.get('message') or message['error']}"
+                    )
+                if message.get("audio"):
+                    if first_byte:
+                        first_byte = False
+                        UPSTREAM_FIRST_BYTE.labels("input_stream").observe(
+                            time.perf_counter() - self._started
+                        )
+                    await self._queue.put(base64.b64decode(message["audio"]))
+                if message.get("isFinal"):
+                    break
+            UPSTREAM_DURATION.labels("input_stream").observe(time.perf_counter() - self._started)
+            await self._queue.put(_STREAM_END)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error during input streaming: {str(e)}")
+            await self._queue.put(e)
+        finally:
+            self.closed = True
+            await self._socket.close()
+            self._release()
+
+    def _release(self) -> None:
+        if self._on_close is not None:
+            on_close, self._on_close = self._on_close, None
+            on_close()
+
+
+class MockInputStream(InputStream):
+    """Input stream used in test mode; every text comes back as mock audio."""
+
+    def __init__(self, audio_for: Callable[[str], bytes]):
+        super().__init__("", {})
+        self._audio_for = audio_for
+
+    async def open(self) -> None:
+        pass
+
+    async def send(self, text: str, flush: bool = False) -> None:
+        if self.closed:
+            raise RuntimeError("Input stream is closed")
+        self.chars += len(text)
+        if text:
+            await self._queue.put(self._audio_for(text))
+
+    async def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            await self._queue.put(_STREAM_END)
+
+    async def abort(self) -> None:
+        await self.close()
@@ -0,0 +1,108 @@
+"""
+MCP Session Routing
+
+An MCP client keeps its SSE stream open on one worker but posts its messages
+to ``/messages``, which the load balancer or the kernel may hand to any
+worker. Posts for a session this worker does not hold are forwarded over the
+broadcast bus, and the worker that holds the session replays them into its
+SSE transport.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs
+from uuid import UUID
+
+from mcp.server.sse import SseServerTransport
+from starlette.responses import Response
+from starlette.types import Message, Receive, Scope, Send
+
+from .broadcast_bus import BusMessage
+from .websocket import WebSocketManager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bus message kind for forwarded posts
+MCP_POST_KIND = "mcp_post"
+
+
+class McpMessageRouter:
+    """ASGI app for ``/messages`` that follows sessions across workers."""
+
+    def __init__(self, transport: SseServerTransport, manager: WebSocketManager):
+        self.transport = transport
+        self.manager = manager
+        self.forwarded = 0
+        self.received = 0
+        manager.add_bus_handler(MCP_POST_KIND, self._deliver_remote)
+
+    def has_session(self, session_id: str) -> bool:
+        try:
+            key = UUID(hex=session_id)
+        except ValueError:
+            return False
+        # The transport keeps no public registry of its sessions
+        return key in self.transport._read_stream_writers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        session_id = _session_id(scope)
+        if session_id is None or not self.manager.bus.distributed or self.has_session(session_id):
+            await self.transport.handle_post_message(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        self.manager.bus.publish(
+            MCP_POST_KIND, {"session_id": session_id, "body": body.decode("utf-8", "replace")}
+        )
+        self.forwarded += 1
+        response = Response("Accepted", status_code=202)
+        await response(scope, receive, send)
+
+    async def _deliver_remote(self, bus_message: BusMessage) -> None:
+        session_id = bus_message.message.get("session_id", "")
+        if not self.has_session(session_id):
+            return
+        self.received += 1
+        await self.transport.handle_post_message(
+            _post_scope(session_id), _replay(bus_message.message["body"].encode()), _discard
+        )
+
+
+def _session_id(scope: Scope) -> Optional[str]:
+    values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get("session_id")
+    return values[0] if values else None
+
+
+def _post_scope(session_id: str) -> Scope:
+    headers: List[Tuple[bytes, bytes]] = [(b"content-type", b"application/json")]
+    return {
+        "type": "http",
+        "method": "POST",
+        "path": "/messages/",
+        "root_path": "",
+        "query_string": f"session_id={session_id}".encode(),
+        "headers": headers,
+    }
+
+
+async def _read_body(receive: Receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return body
+
+
+def _replay(body: bytes) -> Receive:
+    async def receive() -> Message:
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return receive
+
+
+async def _discard(message: Message) -> None:
+    # The original request was already answered by the forwarding worker
+    pass
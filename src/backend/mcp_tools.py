@@ -5,12 +5,14 @@ This module defines the MCP tools that will be exposed to Cursor.
 """
 
 import logging
-import base64
-from typing import Dict, Any
-from .elevenlabs_client import ElevenLabsClient
+from typing import Dict, Any, Optional
+from .audio_formats import DEFAULT_OUTPUT_FORMAT, validate_output_format
+from .channels import DEFAULT_CHANNEL, validate_channel
+from .elevenlabs_client import ElevenLabsClient, get_client
 from mcp.server.fastmcp import FastMCP
 from .websocket import manager
-from .routes import load_config
+from .config_store import config_store
+from . import tts_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,52 +22,212 @@ logger = logging.getLogger(__name__)
 client = None  # We'll initialize this when registering tools
 
 
+async def _start_streaming(
+    text: str,
+    voice_id: str,
+    model_id: str,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    interrupt: bool = False,
+    channel: str = DEFAULT_CHANNEL,
+) -> str:
+    """Queue a streamed clip for a channel and wait until its first chunk is sent.
+
+    Listeners that subscribed to another format get their own stream of the clip.
+    Skipping the clip aborts its synthesis.
+    """
+
+    def open_streams():
+        return {
+            fmt: tts_service.synthesize_stream(
+                client,
+                text,
+                voice_id,
+                model_id,
+                priority="interactive",
+                output_format=fmt,
+                cancellable=True,
+            )
+            for fmt in manager.audio_formats(output_format, channel)
+        }
+
+    clip = await manager.queue(channel).play_stream(
+        text, voice_id, open_streams, output_format, interrupt
+    )
+    return await clip.started
+
+
 def register_mcp_tools(mcp_server: FastMCP, test_mode: bool = False) -> None:
     """Register MCP tools with the server."""
     global client
-    client = ElevenLabsClient(test_mode=test_mode)
+    client = ElevenLabsClient(test_mode=True) if test_mode else get_client()
 
     @mcp_server.tool("speak_text")
-    async def speak_text(text: str) -> Dict[str, Any]:
+    async def speak_text(
+        text: str,
+        stream: Optional[bool] = None,
+        output_format: Optional[str] = None,
+        interrupt: bool = False,
+        channel: Optional[str] = None,
+    ) -> Dict[str, Any]:
         """Convert text to speech using ElevenLabs.
 
         Args:
             text: The text to convert to speech
+            stream: Stream audio to listeners as it is generated and return once
+                the first chunk has been sent. Defaults to the ``use_streaming``
+                setting.
+            output_format: Audio format for listeners that did not subscribe to
+                one, e.g. "mp3_44100_128", "pcm_24000" or "opus_48000_64".
+                Defaults to the ``output_format`` setting.
+            interrupt: Stop whatever is playing or queued and speak this now.
+                Otherwise the text is spoken after the clips queued before it.
+            channel: Only listeners subscribed to this channel hear the speech,
+                e.g. a user or session name. Defaults to the default channel.
 
         Returns:
-            A dictionary with the result of the operation
+            A dictionary with the result of the operation and the ``clip_id``
         """
         try:
-            # Load current configuration
-            config = load_config()
+            # Read the in-memory configuration snapshot
+            config = config_store.snapshot()
             voice_id = config["default_voice_id"]
             model_id = config["default_model_id"]
+            settings = config.get("settings", {})
+            if stream is None:
+                stream = settings.get("use_streaming", True)
+            output_format = validate_output_format(
+                output_format or settings.get("output_format", DEFAULT_OUTPUT_FORMAT)
+            )
+            channel = validate_channel(channel)
 
             logger.info(
                 f"Converting text to speech with voice ID: {voice_id} and model ID: {model_id}"
             )
 
-            # Generate audio using our client instance
-            audio = await client.text_to_speech(text, voice_id, model_id)
-
-            # Encode audio data as base64
-            encoded_audio = base64.b64encode(audio).decode("utf-8")
-
-            # Send to all connected clients via WebSocket
-            await manager.broadcast_to_clients(
-                {
-                    "type": "audio_data",
-                    "text": text,
-                    "voice_id": voice_id,
-                    "data": encoded_audio,
+            if stream:
+                clip_id = await _start_streaming(
+                    text, voice_id, model_id, output_format, interrupt, channel
+                )
+                return {
+                    "success": True,
+                    "message": "Streaming speech to clients",
+                    "streaming": True,
+                    "clip_id": clip_id,
                 }
+
+            # Generate audio in every format the channel's listeners need and send
+            # it via WebSocket
+            clip = await manager.queue(channel).play_clip(
+                {"type": "audio_data", "seq": 0, "text": text, "voice_id": voice_id},
+                lambda fmt: tts_service.synthesize(
+                    client,
+                    text,
+                    voice_id,
+                    model_id,
+                    priority="interactive",
+                    output_format=fmt,
+                    cancellable=True,
+                ),
+                output_format,
+                interrupt,
             )
+            clip_id = await clip.started
 
             return {
                 "success": True,
                 "message": "Text converted to speech and sent to clients",
                 "streaming": False,
+                "clip_id": clip_id,
             }
         except Exception as e:
             logger.error(f"Error in speak_text: {e}")
             return {"success": False, "error": str(e)}
+
+    @mcp_server.tool("control_playback")
+    async def control_playback(
+        command: str, clip_id: Optional[str] = None, channel: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Control what listeners hear.
+
+        Args:
+            command: "skip" stops the current clip (or ``clip_id``) and moves on,
+                "clear" drops the queued clips, "interrupt" does both
+            clip_id: The clip to skip, as returned by ``speak_text``
+            channel: The channel to control. Defaults to the default channel.
+
+        Returns:
+            A dictionary with the cancelled clip ids and what is playing and queued
+        """
+        try:
+            queue = manager.queue(validate_channel(channel))
+            cancelled = await queue.command(command, clip_id)
+            return {"success": True, "cancelled": cancelled, **queue.state()}
+        except Exception as e:
+            logger.error(f"Error in control_playback: {e}")
+            return {"success": False, "error": str(e)}
+
+    @mcp_server.tool("speak_begin")
+    async def speak_begin(
+        output_format: Optional[str] = None,
+        interrupt: bool = False,
+        channel: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Start speaking text that will arrive in pieces, e.g. while it is being written.
+
+        Send the text with ``speak_append`` and finish with ``speak_end``. Audio
+        reaches listeners as soon as enough text has arrived to speak it.
+
+        Args:
+            output_format: Audio format for listeners that did not subscribe to
+                one. Defaults to the ``output_format`` setting.
+            interrupt: Stop whatever is playing or queued and speak this now
+            channel: Only listeners subscribed to this channel hear the speech
+
+        Returns:
+            A dictionary with the ``session_id`` to pass to the other tools
+        """
+        try:
+            session = await manager.speech_sessions.begin(
+                client, output_format=output_format, interrupt=interrupt, channel=channel
+            )
+            return {"success": True, "session_id": session.id, "clip_id": session.clip.id}
+        except Exception as e:
+            logger.error(f"Error in speak_begin: {e}")
+            return {"success": False, "error": str(e)}
+
+    @mcp_server.tool("speak_append")
+    async def speak_append(session_id: str, text: str, flush: bool = False) -> Dict[str, Any]:
+        """Add text to a session started with ``speak_begin``.
+
+        Args:
+            session_id: The session returned by ``speak_begin``
+            text: The next piece of text, including its leading or trailing spaces
+            flush: Speak the text sent so far now instead of waiting for more,
+                e.g. at the end of a sentence
+
+        Returns:
+            A dictionary with the result of the operation
+        """
+        try:
+            await manager.speech_sessions.append(session_id, text, flush)
+            return {"success": True, "session_id": session_id}
+        except Exception as e:
+            logger.error(f"Error in speak_append: {e}")
+            return {"success": False, "error": str(e)}
+
+    @mcp_server.tool("speak_end")
+    async def speak_end(session_id: str) -> Dict[str, Any]:
+        """Finish a session; the rest of the audio is still sent to listeners.
+
+        Args:
+            session_id: The session returned by ``speak_begin``
+
+        Returns:
+            A dictionary with the result of the operation
+        """
+        try:
+            session = await manager.speech_sessions.end(session_id)
+            return {"success": True, "session_id": session_id, "characters": session.chars}
+        except Exception as e:
+            logger.error(f"Error in speak_end: {e}")
+            return {"success": False, "error": str(e)}
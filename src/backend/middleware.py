@@ -0,0 +1,105 @@
+"""
+ASGI Middleware
+
+Path rewriting and access logging as plain ASGI middleware. Unlike
+``@app.middleware("http")`` they do not wrap every request in an extra task and
+memory stream, so streaming responses and SSE pass straight through, and they
+also see WebSocket connections.
+"""
+
+import logging
+import os
+import random
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .metrics import HTTP_REQUEST_DURATION
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Fraction of successful requests written to the access log; errors are always logged
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))
+
+
+class RootPathMiddleware:
+    """Strip the ROOT_PATH prefix from incoming paths.
+
+    Requests may arrive with the prefix once (API Gateway) or twice (API
+    Gateway in front of an ALB rule that adds it again). Both are rewritten to
+    the bare path and ``root_path`` is set so FastAPI generates prefixed URLs.
+    """
+
+    def __init__(self, app: ASGIApp, root_path: str):
+        self.app = app
+        self.root_path = root_path
+        self.double_root_path = root_path * 2
+
+    def rewrite(self, path: str) -> Optional[str]:
+        """Return the path without the prefix, or None if it has none."""
+        if not self.root_path or not path.startswith(self.root_path):
+            return None
+        if path.startswith(self.double_root_path):
+            new_path = path[len(self.double_root_path) :]
+        else:
+            new_path = path[len(self.root_path) :]
+        return new_path if new_path.startswith("/") else f"/{new_path}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            new_path = self.rewrite(scope["path"])
+            if new_path is not None:
+                # Rewrite in place so outer middleware sees the matched route
+                scope["path"] = new_path
+                scope["root_path"] = self.root_path
+        await self.app(scope, receive, send)
+
+
+class AccessLogMiddleware:
+    """Write one structured log line per request and time it for /metrics.
+
+    Durations cover the whole response, including the body of streamed
+    responses. Successful requests are sampled at ``sample_rate``.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = ACCESS_LOG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        status = 500 if scope["type"] == "http" else 101
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "websocket.close":
+                status = message.get("code", 1000)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            if scope["type"] == "http":
+                # Label by route template rather than raw path to keep cardinality bounded
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_REQUEST_DURATION.labels(scope["method"], route, str(status)).observe(duration)
+            if (scope["type"] == "http" and status >= 500) or random.random() < self.sample_rate:
+                logger.info(
+                    "access type=%s method=%s path=%s status=%s duration_ms=%.1f",
+                    scope["type"],
+                    scope.get("method", "GET"),
+                    path,
+                    status,
+                    duration * 1000,
+                )
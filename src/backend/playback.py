@@ -0,0 +1,318 @@
+"""
+Playback Queue
+
+Keeps track of what the listeners of a channel are hearing. Clips play one
+after the other instead of on top of each other, and listeners or the MCP
+client can skip the current clip, clear the queue or interrupt everything.
+Cancelling a clip stops its delivery and aborts its upstream synthesis, unless
+another request is waiting for the same audio, so abandoned speech costs
+neither characters nor bandwidth.
+"""
+
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+)
+
+from .audio_formats import DEFAULT_OUTPUT_FORMAT, estimate_duration
+from .channels import DEFAULT_CHANNEL
+
+if TYPE_CHECKING:
+    from .websocket import WebSocketManager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Play clips one after the other; false lets them overlap but keeps them cancellable
+PLAYBACK_SEQUENTIAL = os.getenv("PLAYBACK_SEQUENTIAL", "true").lower() == "true"
+# Clips waiting to play before new ones are refused
+PLAYBACK_QUEUE_MAX = int(os.getenv("PLAYBACK_QUEUE_MAX", "32"))
+
+# Commands accepted from WebSocket clients and the MCP client
+PLAYBACK_COMMANDS = ("skip", "clear", "interrupt")
+
+# Bus message kind for commands issued on another instance
+PLAYBACK_KIND = "playback"
+
+
+class PlaybackError(ValueError):
+    pass
+
+
+class ClipCancelled(RuntimeError):
+    pass
+
+
+class Clip:
+    """One utterance in the playback queue."""
+
+    def __init__(
+        self,
+        play: Callable[["Clip"], Awaitable[None]],
+        text: str = "",
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
+    ):
+        self.id = uuid.uuid4().hex
+        self.text = text
+        self.output_format = output_format
+        self.state = "queued"
+        self.audio_bytes = 0
+        self.first_audio_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._play = play
+        loop = asyncio.get_running_loop()
+        # Resolves to the clip id once audio went out, or to the reason it never did
+        self.started: asyncio.Future = loop.create_future()
+        self.started.add_done_callback(_retrieve)
+        # Resolves to the final state: done, failed or cancelled
+        self.finished: asyncio.Future = loop.create_future()
+
+    def add_audio(self, size: int) -> None:
+        """Count audio sent in the clip's own format."""
+        if self.first_audio_at is None:
+            self.first_audio_at = time.monotonic()
+        self.audio_bytes += size
+
+    @property
+    def duration(self) -> float:
+        return estimate_duration(self.output_format, self.audio_bytes)
+
+    async def wait(self) -> str:
+        """Wait until the clip has played, failed or been cancelled."""
+        return await asyncio.shield(self.finished)
+
+
+class PlaybackQueue:
+    """Orders the clips sent to a channel's listeners and cancels them on request.
+
+    A clip counts as playing until its audio has been sent and its estimated
+    duration has passed since the first chunk, i.e. until listeners have heard
+    it. Only then does the next clip start, so its synthesis does not start
+    early either.
+    """
+
+    def __init__(
+        self,
+        broadcaster: "WebSocketManager",
+        channel: str = DEFAULT_CHANNEL,
+        sequential: bool = PLAYBACK_SEQUENTIAL,
+        max_queued: int = PLAYBACK_QUEUE_MAX,
+    ):
+        self.broadcaster = broadcaster
+        self.channel = channel
+        self.sequential = sequential
+        self.max_queued = max_queued
+        self.pending: Deque[Clip] = deque()
+        self.playing: Dict[str, Clip] = {}
+        self.cancelled = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def enqueue(
+        self,
+        play: Callable[[Clip], Awaitable[None]],
+        text: str = "",
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
+        interrupt: bool = False,
+    ) -> Clip:
+        """Queue a clip; ``play`` sends its audio. ``interrupt`` stops everything else first."""
+        if interrupt:
+            await self.command("interrupt")
+        if len(self.pending) >= self.max_queued:
+            raise PlaybackError(f"Playback queue is full ({self.max_queued} clips)")
+        clip = Clip(play, text, output_format)
+        self.pending.append(clip)
+        self._idle.clear()
+        self._advance()
+        return clip
+
+    async def play_clip(
+        self,
+        header: Dict,
+        render: Callable[[str], Awaitable[bytes]],
+        output_format: str,
+        interrupt: bool = False,
+    ) -> Clip:
+        """Queue a complete clip, rendered when its turn comes (see ``broadcast_clip``)."""
+
+        async def play(clip: Clip) -> None:
+            async def render_and_count(fmt: str) -> bytes:
+                audio = await render(fmt)
+                if fmt == output_format:
+                    clip.add_audio(len(audio))
+                return audio
+
+            await self.broadcaster.broadcast_clip(
+                {**header, "clip_id": clip.id, "channel": self.channel},
+                render_and_count,
+                output_format,
+            )
+
+        return await self.enqueue(play, header.get("text", ""), output_format, interrupt)
+
+    async def play_stream(
+        self,
+        text: str,
+        voice_id: str,
+        open_streams: Callable[[], Dict[str, AsyncIterator[bytes]]],
+        output_format: str,
+        interrupt: bool = False,
+    ) -> Clip:
+        """Queue a streamed clip.
+
+        ``open_streams`` is called when the clip's turn comes and returns an
+        audio stream per output format, the speaker's format among them.
+        """
+
+        async def play(clip: Clip) -> None:
+            streams = open_streams()
+            await asyncio.gather(
+                *(
+                    self.broadcaster.stream_audio_to_clients(
+                        stream,
+                        text,
+                        voice_id,
+                        first_chunk_sent=clip.started if fmt == output_format else None,
+                        output_format=fmt,
+                        default=fmt == output_format,
+                        clip_id=clip.id,
+                        on_chunk=clip.add_audio if fmt == output_format else None,
+                        channel=self.channel,
+                    )
+                    for fmt, stream in streams.items()
+                )
+            )
+
+        return await self.enqueue(play, text, output_format, interrupt)
+
+    async def command(
+        self, command: str, clip_id: Optional[str] = None, publish: bool = True
+    ) -> List[str]:
+        """Run a playback command and return the ids of the cancelled clips.
+
+        ``skip`` cancels the given clip, or the one playing; ``clear`` drops
+        the queued clips; ``interrupt`` does both. The command is also sent to
+        other instances, which hold their own queues for the channel.
+        """
+        if command not in PLAYBACK_COMMANDS:
+            raise PlaybackError(f"Unknown playback command: {command}")
+
+        if command == "skip":
+            if clip_id is not None:
+                targets = [
+                    clip for clip in (*self.playing.values(), *self.pending) if clip.id == clip_id
+                ]
+            else:
+                targets = list(self.playing.values())[:1]
+        elif command == "clear":
+            targets = list(self.pending)
+        else:
+            targets = [*self.pending, *self.playing.values()]
+
+        for clip in targets:
+            self._cancel(clip)
+        for clip in targets:
+            await self.broadcaster.broadcast_to_clients(
+                {
+                    "type": "audio_cancel",
+                    "clip_id": clip.id,
+                    "reason": command,
+                    "channel": self.channel,
+                }
+            )
+        if publish:
+            self.broadcaster.bus.publish(
+                PLAYBACK_KIND, {"command": command, "clip_id": clip_id, "channel": self.channel}
+            )
+        if targets:
+            logger.info(f"Playback {command} cancelled {len(targets)} clip(s)")
+        return [clip.id for clip in targets]
+
+    def state(self) -> Dict[str, List[str]]:
+        return {"playing": list(self.playing), "queued": [clip.id for clip in self.pending]}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "playing": len(self.playing),
+            "queued": len(self.pending),
+            "cancelled": self.cancelled,
+        }
+
+    async def join(self) -> None:
+        """Wait until every queued clip has played."""
+        await self._idle.wait()
+
+    async def shutdown(self) -> None:
+        """Cancel every clip without notifying listeners."""
+        clips = [*self.pending, *self.playing.values()]
+        for clip in clips:
+            self._cancel(clip)
+        await asyncio.gather(*(clip.wait() for clip in clips))
+
+    def _advance(self) -> None:
+        while self.pending and not (self.sequential and self.playing):
+            clip = self.pending.popleft()
+            clip.state = "playing"
+            self.playing[clip.id] = clip
+            clip.task = asyncio.create_task(self._play(clip))
+
+    async def _play(self, clip: Clip) -> None:
+        state = "done"
+        try:
+            await clip._play(clip)
+            if not clip.started.done():
+                clip.started.set_result(clip.id)
+            if clip.first_audio_at is not None:
+                # Wait until listeners have heard the clip
+                remaining = clip.first_audio_at + clip.duration - time.monotonic()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+        except asyncio.CancelledError:
+            state = "cancelled"
+        except Exception as e:
+            logger.error(f"Error playing clip {clip.id}: {str(e)}")
+            state = "failed"
+            if not clip.started.done():
+                clip.started.set_exception(e)
+        finally:
+            self.playing.pop(clip.id, None)
+            self._finish(clip, state)
+            self._advance()
+
+    def _cancel(self, clip: Clip) -> None:
+        if clip.state == "queued":
+            self.pending.remove(clip)
+            self._finish(clip, "cancelled")
+        elif clip.state == "playing" and clip.task is not None:
+            clip.task.cancel()
+        else:
+            return
+        self.cancelled += 1
+
+    def _finish(self, clip: Clip, state: str) -> None:
+        clip.state = state
+        if not clip.started.done():
+            clip.started.set_exception(ClipCancelled(f"Clip {clip.id} was cancelled"))
+        if not clip.finished.done():
+            clip.finished.set_result(state)
+        if not self.pending and not self.playing:
+            self._idle.set()
+
+
+def _retrieve(future: asyncio.Future) -> None:
+    # Nobody may be waiting for a clip to start; do not warn about its error
+    if not future.cancelled():
+        future.exception()
@@ -0,0 +1,143 @@
+"""
+Responses
+
+Serve cached audio files without copying them into Python bytes. The file is
+memory-mapped and handed to the server in slices; servers that offer the ASGI
+zero-copy send extension get the file descriptor for ``sendfile`` instead.
+Single byte ranges are honoured so browsers can seek.
+"""
+
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Size of the slices handed to the server when the file is memory-mapped
+FILE_RESPONSE_CHUNK_SIZE = int(os.getenv("FILE_RESPONSE_CHUNK_SIZE", str(256 * 1024)))
+
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def parse_range(value: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Return the ``[start, end)`` slice requested by a Range header.
+
+    Returns None to serve the whole file, which is also what happens for
+    multi-range and malformed headers (RFC 9110 allows ignoring them). Raises
+    RangeNotSatisfiable if the range lies outside the file.
+    """
+    if not value:
+        return None
+    match = _RANGE_PATTERN.match(value.strip())
+    if match is None:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable(value)
+        return max(0, size - length), size
+
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    if start >= size or start >= end:
+        raise RangeNotSatisfiable(value)
+    return start, end
+
+
+class AudioFileResponse(Response):
+    """Stream a file from a memory map, with Range support."""
+
+    chunk_size = FILE_RESPONSE_CHUNK_SIZE
+
+    def __init__(
+        self,
+        path: Path,
+        media_type: str = "audio/mpeg",
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        self.path = path
+        self.status_code = 200
+        self.media_type = media_type
+        self.background = None
+        self.init_headers(headers)
+        self.raw_headers.append((b"accept-ranges", b"bytes"))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            await Response("Not found", status_code=404)(scope, receive, send)
+            return
+
+        with file:
+            size = os.fstat(file.fileno()).st_size
+            try:
+                byte_range = parse_range(Headers(scope=scope).get("range"), size)
+            except RangeNotSatisfiable:
+                await Response(status_code=416, headers={"content-range": f"bytes */{size}"})(
+                    scope, receive, send
+                )
+                return
+
+            start, end = byte_range or (0, size)
+            headers = list(self.raw_headers)
+            headers.append((b"content-length", str(end - start).encode("latin-1")))
+            if byte_range is not None:
+                content_range = f"bytes {start}-{end - 1}/{size}"
+                headers.append((b"content-range", content_range.encode("latin-1")))
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 206 if byte_range is not None else self.status_code,
+                    "headers": headers,
+                }
+            )
+
+            if scope.get("method") == "HEAD" or start == end:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+            elif "http.response.zerocopysend" in scope.get("extensions", {}):
+                await send(
+                    {
+                        "type": "http.response.zerocopysend",
+                        "file": file.fileno(),
+                        "offset": start,
+                        "count": end - start,
+                        "more_body": False,
+                    }
+                )
+            else:
+                await self._send_mapped(file, start, end, send)
+
+    async def _send_mapped(self, file, start: int, end: int, send: Send) -> None:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        try:
+            for offset in range(start, end, self.chunk_size):
+                stop = min(offset + self.chunk_size, end)
+                await send(
+                    {
+                        "type": "http.response.body",
+                        "body": view[offset:stop],
+                        "more_body": stop < end,
+                    }
+                )
+        finally:
+            try:
+                view.release()
+                mapped.close()
+            except BufferError:
+                # The transport still buffers a slice; the map is freed with it
+                pass
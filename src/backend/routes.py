@@ -1,38 +1,64 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
-import json
+from typing import Optional, List, Dict, Any, AsyncGenerator
 import base64
-from pathlib import Path
-from .elevenlabs_client import ElevenLabsClient
+import os
+import re
+import time
+import uuid
+from .elevenlabs_client import get_client
+from .frames import dumps
 from .websocket import manager
-from fastapi.responses import StreamingResponse
+from .audio_cache import audio_cache
+from .catalog_cache import CatalogEntry, catalog_cache
+from .single_flight import synthesis_flights
+from .config_store import config_store, thaw
+from .config_store import CONFIG_DIR  # noqa: F401 - re-exported for existing imports
+from . import tts_service
+from fastapi.responses import JSONResponse, StreamingResponse
+from .responses import AudioFileResponse
+from .audio_formats import (
+    DEFAULT_OUTPUT_FORMAT,
+    content_type,
+    file_extension,
+    validate_output_format,
+)
+from .channels import validate_channel
 
 # Use versioned API prefix to match the auth-service pattern
 router = APIRouter(prefix="/api/v1", tags=["TTS"])
-client = ElevenLabsClient()
+client = get_client()
 
-# Configuration paths
-CONFIG_DIR = Path.home() / ".config" / "elevenlabs-mcp"
-CONFIG_FILE = CONFIG_DIR / "config.json"
+# Upper bound for the number of items in one batch request
+TTS_BATCH_MAX_ITEMS = int(os.getenv("TTS_BATCH_MAX_ITEMS", "500"))
 
-# Create config directory if it doesn't exist
-CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-
-# Default configuration
-DEFAULT_CONFIG = {
-    "default_voice_id": "cgSgspJ2msm6clMCkdW9",  # Jessica's voice ID
-    "default_model_id": "eleven_flash_v2_5",
-    "settings": {
-        "auto_play": True,
-    },
-}
+# Cache keys are hex SHA-256 digests
+CACHE_KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
 
 
 class TTSRequest(BaseModel):
     text: str
     voice_id: Optional[str] = None
     model_id: Optional[str] = None
+    output_format: Optional[str] = None
+    interrupt: bool = False
+    channel: Optional[str] = None
+
+
+class BatchItem(BaseModel):
+    id: Optional[str] = None
+    text: str
+    voice_id: Optional[str] = None
+    model_id: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem]
+    concurrency: Optional[int] = None
+    return_audio: bool = False
+    broadcast: bool = False
+    output_format: Optional[str] = None
+    channel: Optional[str] = None
 
 
 class MCPRequest(BaseModel):
@@ -57,71 +83,101 @@ class Model(BaseModel):
 
 
 def load_config() -> Dict[str, Any]:
-    """Load configuration from file or return default."""
-    if CONFIG_FILE.exists():
-        try:
-            with open(CONFIG_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            return DEFAULT_CONFIG
-    else:
-        # Save default config if it doesn't exist
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG
+    """Return a mutable copy of the current configuration."""
+    return config_store.load()
 
 
 def save_config(config: Dict[str, Any]) -> None:
     """Save configuration to file."""
-    with open(CONFIG_FILE, "w") as f:
-        json.dump(config, f, indent=2)
+    config_store.save(config)
+
+
+async def _fetch_voices() -> List[Dict[str, str]]:
+    voices_data = await client.get_voices()
+    return [{"voice_id": v["voice_id"], "name": v["name"]} for v in voices_data]
+
+
+async def _fetch_models() -> List[Dict[str, str]]:
+    models_data = await client.get_models()
+    return [{"model_id": m["model_id"], "name": m["name"]} for m in models_data]
+
+
+def _catalog_response(entry: CatalogEntry, request: Request) -> Response:
+    """Return a catalog as JSON, or 304 when the browser already has it."""
+    headers = {"ETag": entry.etag, "Cache-Control": f"max-age={int(catalog_cache.ttl)}"}
+    if request.headers.get("if-none-match") == entry.etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=entry.value, headers=headers)
 
 
 @router.get("/voices", response_model=List[Voice])
-async def get_voices():
+async def get_voices(request: Request):
     """Get all available voices."""
     try:
-        voices_data = await client.get_voices()
-        return [Voice(voice_id=v["voice_id"], name=v["name"]) for v in voices_data]
+        entry = await catalog_cache.get("voices", _fetch_voices)
+        return _catalog_response(entry, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch voices: {str(e)}")
 
 
 @router.get("/models", response_model=List[Model])
-async def get_models():
+async def get_models(request: Request):
     """Get all available models."""
     try:
-        models_data = await client.get_models()
-        return [Model(model_id=m["model_id"], name=m["name"]) for m in models_data]
+        entry = await catalog_cache.get("models", _fetch_models)
+        return _catalog_response(entry, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch models: {str(e)}")
 
 
+def _channel(requested: Optional[str]) -> str:
+    """Resolve the channel a clip is sent to."""
+    try:
+        return validate_channel(requested)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _output_format(requested: Optional[str], config: Dict[str, Any]) -> str:
+    """Resolve the requested output format, falling back to the configured one."""
+    try:
+        return validate_output_format(
+            requested or config.get("settings", {}).get("output_format", DEFAULT_OUTPUT_FORMAT)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.post("/tts")
 async def text_to_speech(request: TTSRequest):
     """Convert text to speech."""
+    # Read the in-memory configuration snapshot
+    config = config_store.snapshot()
+    output_format = _output_format(request.output_format, config)
+    channel = _channel(request.channel)
     try:
-        # Load configuration
-        config = load_config()
-
         # Use provided voice_id/model_id or default from config
         voice_id = request.voice_id or config["default_voice_id"]
         model_id = request.model_id or config["default_model_id"]
 
-        # Generate audio using our client
-        audio = await client.text_to_speech(text=request.text, voice_id=voice_id, model_id=model_id)
-
-        # Send audio via WebSocket to all connected clients
-        encoded_audio = base64.b64encode(audio).decode("utf-8")
-        await manager.broadcast_to_clients(
-            {
-                "type": "audio_data",
-                "text": request.text,
-                "voice_id": voice_id,
-                "data": encoded_audio,
-            }
+        # Generate audio in every format the channel's listeners need and send it
+        # via WebSocket once the clips queued before it have played
+        clip = await manager.queue(channel).play_clip(
+            {"type": "audio_data", "seq": 0, "text": request.text, "voice_id": voice_id},
+            lambda fmt: tts_service.synthesize(
+                client,
+                text=request.text,
+                voice_id=voice_id,
+                model_id=model_id,
+                output_format=fmt,
+                cancellable=True,
+            ),
+            output_format,
+            request.interrupt,
         )
+        await clip.started
 
-        return {}
+        return {"clip_id": clip.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to convert text to speech: {str(e)}")
 
@@ -129,25 +185,56 @@ async def text_to_speech(request: TTSRequest):
 @router.post("/tts/stream")
 async def text_to_speech_stream(request: TTSRequest):
     """Stream text to speech conversion."""
+    # Read the in-memory configuration snapshot
+    config = config_store.snapshot()
+    output_format = _output_format(request.output_format, config)
+    media_type = content_type(output_format)
+    disposition = f"attachment; filename=speech.{file_extension(output_format)}"
     try:
-        # Load configuration
-        config = load_config()
-
         # Use provided voice_id/model_id or default from config
         voice_id = request.voice_id or config["default_voice_id"]
         model_id = request.model_id or config["default_model_id"]
 
+        # Serve clips already on disk straight from the file, with Range support
+        cached = tts_service.cached_file(
+            request.text, voice_id, model_id, output_format=output_format
+        )
+        if cached is not None:
+            key, path = cached
+            location = f"{router.prefix}/audio/{key}"
+            if output_format != DEFAULT_OUTPUT_FORMAT:
+                location += f"?output_format={output_format}"
+            return AudioFileResponse(
+                path,
+                media_type=media_type,
+                headers={
+                    "Content-Disposition": disposition,
+                    "Content-Location": location,
+                },
+            )
+
         # Generate audio stream using our client
-        audio_stream = client.text_to_speech_stream(
-            text=request.text, voice_id=voice_id, model_id=model_id
+        audio_stream = tts_service.synthesize_stream(
+            client,
+            text=request.text,
+            voice_id=voice_id,
+            model_id=model_id,
+            output_format=output_format,
         )
 
+        # Wait for the first chunk so upstream errors still map to an HTTP status;
+        # the response then starts as soon as audio is available.
+        try:
+            first_chunk = await audio_stream.__anext__()
+        except StopAsyncIteration:
+            first_chunk = b""
+
         # Return audio as streaming response
         return StreamingResponse(
-            audio_stream,
-            media_type="audio/mpeg",
+            _prepend_chunk(first_chunk, audio_stream),
+            media_type=media_type,
             headers={
-                "Content-Disposition": "attachment; filename=speech.mp3",
+                "Content-Disposition": disposition,
                 "Cache-Control": "no-cache",
             },
         )
@@ -155,6 +242,120 @@ async def text_to_speech_stream(request: TTSRequest):
         raise HTTPException(status_code=500, detail=f"Failed to stream text to speech: {str(e)}")
 
 
+async def _prepend_chunk(
+    first_chunk: bytes, audio_stream: AsyncGenerator[bytes, None]
+) -> AsyncGenerator[bytes, None]:
+    """Yield an already received chunk followed by the rest of the stream."""
+    if first_chunk:
+        yield first_chunk
+    async for chunk in audio_stream:
+        yield chunk
+
+
+@router.get("/audio/{key}")
+async def get_cached_audio(key: str, output_format: str = DEFAULT_OUTPUT_FORMAT):
+    """Serve a cached clip by its content address, so players can seek with Range requests.
+
+    The key already covers the format; ``output_format`` only sets the content type.
+    """
+    output_format = _output_format(output_format, {})
+    if not CACHE_KEY_PATTERN.fullmatch(key):
+        raise HTTPException(status_code=404, detail="Audio not found")
+    path = audio_cache.path(key)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Audio not found")
+    # Keys are content addresses, so a clip never changes
+    return AudioFileResponse(
+        path,
+        media_type=content_type(output_format),
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
+
+
+@router.post("/tts/batch")
+async def text_to_speech_batch(request: BatchRequest):
+    """Pre-render many texts into the audio cache.
+
+    Streams one NDJSON line per item as it finishes, with progress counters and
+    per-item errors, followed by a summary line. Audio is only included with
+    ``return_audio`` and only broadcast to listeners with ``broadcast``.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch contains no items")
+    if len(request.items) > TTS_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch contains {len(request.items)} items, the maximum is {TTS_BATCH_MAX_ITEMS}",
+        )
+
+    config = config_store.snapshot()
+    output_format = _output_format(request.output_format, config)
+    channel = _channel(request.channel)
+    items = [
+        (
+            item.text,
+            item.voice_id or config["default_voice_id"],
+            item.model_id or config["default_model_id"],
+        )
+        for item in request.items
+    ]
+    return StreamingResponse(
+        _batch_results(request, items, output_format, channel),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+async def _batch_results(
+    request: BatchRequest, items: List[tuple], output_format: str, channel: str
+) -> AsyncGenerator[str, None]:
+    started = time.monotonic()
+    completed = failed = 0
+    results = tts_service.synthesize_batch(
+        client, items, concurrency=request.concurrency, output_format=output_format
+    )
+    async for index, audio, error in results:
+        completed += 1
+        text, voice_id, _ = items[index]
+        line: Dict[str, Any] = {
+            "type": "item",
+            "index": index,
+            "id": request.items[index].id,
+            "completed": completed,
+            "total": len(items),
+        }
+        if error is not None:
+            failed += 1
+            line.update(status="error", error=getattr(error, "detail", None) or str(error))
+        else:
+            line.update(status="ok", size=len(audio))
+            if request.return_audio:
+                line["data"] = base64.b64encode(audio).decode("ascii")
+            if request.broadcast:
+                await manager.broadcast_audio(
+                    {
+                        "type": "audio_data",
+                        "clip_id": uuid.uuid4().hex,
+                        "seq": 0,
+                        "text": text,
+                        "voice_id": voice_id,
+                        "output_format": output_format,
+                        "channel": channel,
+                    },
+                    audio,
+                )
+        yield dumps(line) + "\n"
+
+    summary = {
+        "type": "summary",
+        "total": len(items),
+        "succeeded": completed - failed,
+        "failed": failed,
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+    yield dumps(summary) + "\n"
+
+
 @router.post("/mcp")
 async def handle_mcp_request(request: MCPRequest) -> Dict:
     """Handle MCP requests from the frontend."""
@@ -171,11 +372,9 @@ async def handle_mcp_request(request: MCPRequest) -> Dict:
             return {"status": "request_sent"}
 
         elif request.command == "list-voices":
-            # Get voices from ElevenLabs API
-            voices = await client.get_voices()
-            formatted_voices = [
-                {"voice_id": voice["voice_id"], "name": voice["name"]} for voice in voices
-            ]
+            # Get voices from the catalog cache
+            entry = await catalog_cache.get("voices", _fetch_voices)
+            formatted_voices = entry.value
 
             # Send voice list to MCP binary
             await manager.send_to_mcp({"type": "voice_list", "voices": formatted_voices})
@@ -184,7 +383,7 @@ async def handle_mcp_request(request: MCPRequest) -> Dict:
 
         elif request.command == "get-mcp-status":
             # Check if MCP is connected
-            return {"status": "success", "mcp_connected": manager.mcp_connection is not None}
+            return {"status": "success", "mcp_connected": manager.mcp_connected}
 
         else:
             # Forward other commands to MCP binary
@@ -197,12 +396,23 @@ async def handle_mcp_request(request: MCPRequest) -> Dict:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Get audio cache hit/miss/eviction counters and in-flight synthesis counts."""
+    return {**audio_cache.stats(), "synthesis": synthesis_flights.stats()}
+
+
+@router.get("/upstream/stats")
+async def get_upstream_stats():
+    """Get upstream scheduler queue depth, wait time and retry counters."""
+    return client.scheduler.stats()
+
+
 @router.get("/config")
 async def get_config():
     """Get current configuration."""
     try:
-        config = load_config()
-        return config
+        return thaw(config_store.snapshot())
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get configuration: {str(e)}")
 
@@ -221,11 +431,12 @@ async def update_config(request: ConfigRequest):
             current_config["default_model_id"] = request.default_model_id
 
         if request.settings is not None:
-            if "auto_play" in request.settings:
-                current_config["settings"]["auto_play"] = request.settings["auto_play"]
+            for key in ("auto_play", "use_streaming"):
+                if key in request.settings:
+                    current_config["settings"][key] = request.settings[key]
 
-        # Save updated configuration
-        save_config(current_config)
+        # Save updated configuration without blocking the event loop
+        await config_store.update(current_config)
 
         # Notify MCP about config changes
         await manager.send_to_mcp({"type": "config_update", "config": current_config})
@@ -0,0 +1,65 @@
+"""
+Text Segmenter
+
+Splits long texts into segments at sentence boundaries, falling back to clause
+boundaries and finally whitespace for sentences that are too long on their own.
+Segments can then be synthesized concurrently and played back in order.
+"""
+
+import re
+from typing import List
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|\n{2,}")
+_CLAUSE_BOUNDARY = re.compile(r"(?<=[,;:–—])\s+")
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """Split text into segments of at most ``max_chars`` characters.
+
+    Adjacent sentences are packed together as long as they fit, so short
+    sentences do not each cost a separate upstream request.
+    """
+    text = text.strip()
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text] if text else []
+
+    pieces: List[str] = []
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        for clause in _CLAUSE_BOUNDARY.split(sentence):
+            pieces.extend(_split_words(clause.strip(), max_chars))
+
+    return _pack(pieces, max_chars)
+
+
+def _split_words(text: str, max_chars: int) -> List[str]:
+    """Split an overlong piece at whitespace, or hard if a word is too long."""
+    if len(text) <= max_chars:
+        return [text] if text else []
+    words: List[str] = []
+    for word in text.split():
+        while len(word) > max_chars:
+            words.append(word[:max_chars])
+            word = word[max_chars:]
+        if word:
+            words.append(word)
+    return _pack(words, max_chars)
+
+
+def _pack(pieces: List[str], max_chars: int) -> List[str]:
+    segments: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 1 + len(piece) > max_chars:
+            segments.append(current)
+            current = piece
+        else:
+            current = f"{current} {piece}" if current else piece
+    if current:
+        segments.append(current)
+    return segments
@@ -0,0 +1,155 @@
+"""
+Single Flight
+
+Coalesces identical syntheses that are in flight at the same time. The first
+request starts the upstream call; identical requests arriving before it
+finishes attach to the same flight instead of calling ElevenLabs again.
+Subscribers that join late replay the chunks buffered so far and then follow
+the live stream. A flight whose subscribers all joined as cancellable, e.g.
+clips in the playback queue, is aborted when the last of them goes away.
+"""
+
+import asyncio
+import logging
+from typing import AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """One in-flight synthesis that any number of subscribers can follow."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+        self.subscribers = 0
+        # Set once a subscriber wants the result even if it leaves early
+        self.keep = False
+        self.on_abandon: Optional[Callable[[], None]] = None
+        self._changed = asyncio.Event()
+
+    async def subscribe(self, cancellable: bool = False) -> AsyncGenerator[bytes, None]:
+        """Replay the chunks buffered so far, then follow the live stream.
+
+        With ``cancellable`` the subscriber does not need the flight to finish
+        once it goes away.
+        """
+        if not cancellable:
+            self.keep = True
+        self.subscribers += 1
+        try:
+            index = 0
+            while True:
+                while index < len(self.chunks):
+                    yield self.chunks[index]
+                    index += 1
+                if self.error is not None:
+                    raise self.error
+                if self.done:
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            if not self.subscribers and not self.done and not self.keep and self.on_abandon:
+                self.on_abandon()
+
+    async def result(self, cancellable: bool = False) -> bytes:
+        """Wait for the flight to finish and return the complete audio."""
+        return b"".join([chunk async for chunk in self.subscribe(cancellable)])
+
+    def _append(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    def _notify(self) -> None:
+        # Wake everyone waiting on the current event and arm a fresh one
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    def join(
+        self,
+        key: str,
+        produce: Callable[[], AsyncIterator[bytes]],
+        on_complete: Optional[Callable[[bytes], Awaitable[None]]] = None,
+    ) -> Flight:
+        """Return the flight for a key, starting it with ``produce`` if needed.
+
+        The flight runs in its own task, so a subscriber that goes away does not
+        cancel it for the others. ``on_complete`` receives the complete audio
+        before the flight is removed, so a request arriving in between finds
+        the result in the cache.
+        """
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            logger.debug(f"Joined in-flight synthesis {key}")
+            return flight
+
+        flight = Flight()
+        flight.on_abandon = lambda: self._abandon(key, flight)
+        self._flights[key] = flight
+        self.started += 1
+        flight.task = asyncio.create_task(self._run(key, flight, produce, on_complete))
+        return flight
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "inflight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
+
+    def _abandon(self, key: str, flight: Flight) -> None:
+        """Abort a flight nobody is waiting for; this stops the upstream call."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        self.abandoned += 1
+        logger.debug(f"Abandoned in-flight synthesis {key}")
+        flight.task.cancel()
+
+    async def _run(
+        self,
+        key: str,
+        flight: Flight,
+        produce: Callable[[], AsyncIterator[bytes]],
+        on_complete: Optional[Callable[[bytes], Awaitable[None]]],
+    ) -> None:
+        try:
+            async for chunk in produce():
+                flight._append(chunk)
+            if on_complete is not None:
+                try:
+                    await on_complete(b"".join(flight.chunks))
+                except Exception as e:
+                    logger.error(f"Failed to store synthesis {key}: {str(e)}")
+            flight._finish()
+        except asyncio.CancelledError:
+            flight._finish(RuntimeError("Synthesis was cancelled"))
+            raise
+        except Exception as e:
+            flight._finish(e)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+
+# Create a singleton instance
+synthesis_flights = SingleFlight()
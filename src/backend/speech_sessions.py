@@ -0,0 +1,275 @@
+"""
+Speech Sessions
+
+Speak text that arrives piece by piece, e.g. while a language model is still
+writing it. A session keeps an upstream input stream open per output format;
+text is appended as it comes and the audio is relayed to listeners as soon as
+the upstream produces it, instead of waiting for the whole text. A session
+plays as one clip of the playback queue.
+"""
+
+import asyncio
+import logging
+import os
+import uuid
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional, Set
+
+from .audio_formats import DEFAULT_OUTPUT_FORMAT, align_frames, is_pcm, validate_output_format
+from .channels import DEFAULT_CHANNEL, validate_channel
+from .config_store import config_store
+from .elevenlabs_client import ElevenLabsClient
+from .input_stream import InputStream
+from .playback import Clip
+
+if TYPE_CHECKING:
+    from .websocket import WebSocketManager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds without new text before a session is ended; the upstream closes idle
+# input streams after 20 seconds, so end them cleanly before that happens
+SPEECH_SESSION_IDLE_TIMEOUT = float(os.getenv("SPEECH_SESSION_IDLE_TIMEOUT", "15"))
+# Upper bound for open sessions; each one holds an upstream connection per format
+SPEECH_SESSION_MAX = int(os.getenv("SPEECH_SESSION_MAX", "16"))
+
+# WebSocket message types handled by the session manager
+SPEECH_MESSAGE_TYPES = ("speak_begin", "speak_append", "speak_end")
+
+
+class SpeechSessionError(ValueError):
+    pass
+
+
+class SpeechSession:
+    """Input streams for one incrementally spoken text, one per output format."""
+
+    def __init__(
+        self,
+        voice_id: str,
+        model_id: str,
+        output_format: str,
+        streams: Dict[str, InputStream],
+        owner: Any = None,
+        channel: str = DEFAULT_CHANNEL,
+    ):
+        self.id = uuid.uuid4().hex
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.output_format = output_format
+        self.streams = streams
+        self.owner = owner
+        self.channel = channel
+        self.ended = False
+        self.clip: Optional[Clip] = None
+        self.relay: Optional[asyncio.Task] = None
+        self.idle_timer: Optional[asyncio.TimerHandle] = None
+        # Keeps appends in the same order on every stream
+        self.lock = asyncio.Lock()
+
+    @property
+    def chars(self) -> int:
+        return self.streams[self.output_format].chars
+
+
+class SpeechSessionManager:
+    """Opens, feeds and ends speech sessions and relays their audio."""
+
+    def __init__(
+        self,
+        broadcaster: "WebSocketManager",
+        idle_timeout: float = SPEECH_SESSION_IDLE_TIMEOUT,
+        max_sessions: int = SPEECH_SESSION_MAX,
+    ):
+        self.broadcaster = broadcaster
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, SpeechSession] = {}
+        self.expired = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def begin(
+        self,
+        client: ElevenLabsClient,
+        voice_id: Optional[str] = None,
+        model_id: Optional[str] = None,
+        output_format: Optional[str] = None,
+        owner: Any = None,
+        interrupt: bool = False,
+        channel: Optional[str] = None,
+    ) -> SpeechSession:
+        """Open a session; voice, model and format default to the configuration.
+
+        The session's audio plays to the channel's listeners once the clips
+        queued before it have played, or right away with ``interrupt``.
+        """
+        if len(self.sessions) >= self.max_sessions:
+            raise SpeechSessionError(f"Too many open speech sessions ({self.max_sessions})")
+
+        config = config_store.snapshot()
+        settings = config.get("settings", {})
+        voice_id = voice_id or config["default_voice_id"]
+        model_id = model_id or config["default_model_id"]
+        output_format = validate_output_format(
+            output_format or settings.get("output_format", DEFAULT_OUTPUT_FORMAT)
+        )
+        channel = validate_channel(channel)
+
+        streams: Dict[str, InputStream] = {}
+        try:
+            for fmt in self.broadcaster.audio_formats(output_format, channel):
+                streams[fmt] = await client.text_to_speech_input_stream(
+                    voice_id, model_id, priority="interactive", output_format=fmt
+                )
+        except BaseException:
+            await asyncio.gather(*(stream.abort() for stream in streams.values()))
+            raise
+
+        session = SpeechSession(voice_id, model_id, output_format, streams, owner, channel)
+        try:
+            session.clip = await self.broadcaster.queue(channel).play_stream(
+                "", voice_id, lambda: self._audio(session), output_format, interrupt
+            )
+        except BaseException:
+            await asyncio.gather(*(stream.abort() for stream in streams.values()))
+            raise
+        self.sessions[session.id] = session
+        session.relay = asyncio.create_task(self._relay(session))
+        self._touch(session)
+        logger.info(f"Speech session {session.id} started in {', '.join(streams)}")
+        return session
+
+    def get(self, session_id: str) -> SpeechSession:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise SpeechSessionError(f"Unknown speech session: {session_id}")
+        return session
+
+    async def append(self, session_id: str, text: str, flush: bool = False) -> SpeechSession:
+        """Send more text; ``flush`` speaks what was sent so far without waiting for more."""
+        session = self.get(session_id)
+        if session.ended:
+            raise SpeechSessionError(f"Speech session {session_id} has ended")
+        async with session.lock:
+            for stream in session.streams.values():
+                await stream.send(text, flush)
+        self._touch(session)
+        return session
+
+    async def end(self, session_id: str) -> SpeechSession:
+        """End the text; the remaining audio is still relayed before the session closes."""
+        session = self.get(session_id)
+        await self._end(session)
+        return session
+
+    def end_owned(self, owner: Any) -> None:
+        """End the sessions opened by an owner, e.g. a WebSocket that disconnected."""
+        for session in list(self.sessions.values()):
+            if session.owner is owner and not session.ended:
+                self._spawn(self._end(session))
+
+    async def handle_message(
+        self, client: ElevenLabsClient, message: Dict[str, Any], owner: Any = None
+    ) -> Dict[str, Any]:
+        """Handle a speak_* message from a WebSocket client and return the reply.
+
+        Sessions play to the client's own channel unless the message names one.
+        """
+        message_type = message.get("type")
+        try:
+            if message_type == "speak_begin":
+                session = await self.begin(
+                    client,
+                    message.get("voice_id"),
+                    message.get("model_id"),
+                    message.get("output_format"),
+                    owner=owner,
+                    interrupt=bool(message.get("interrupt", False)),
+                    channel=message.get("channel") or self.broadcaster.channel_of(owner),
+                )
+            elif message_type == "speak_append":
+                session = await self.append(
+                    message.get("session_id", ""),
+                    message.get("text", ""),
+                    bool(message.get("flush", False)),
+                )
+            elif message_type == "speak_end":
+                session = await self.end(message.get("session_id", ""))
+            else:
+                raise SpeechSessionError(f"Unknown speech message type: {message_type}")
+        except Exception as e:
+            logger.warning(f"Speech session request failed: {str(e)}")
+            return {"type": "error", "request": message_type, "message": str(e)}
+        return {
+            "type": "speak_session",
+            "session_id": session.id,
+            "output_format": session.output_format,
+            "channel": session.channel,
+            "ended": session.ended,
+        }
+
+    async def shutdown(self) -> None:
+        """Drop every open session without waiting for its audio."""
+        for session in list(self.sessions.values()):
+            if session.idle_timer is not None:
+                session.idle_timer.cancel()
+            await asyncio.gather(*(stream.abort() for stream in session.streams.values()))
+        relays = [session.relay for session in self.sessions.values() if session.relay]
+        await asyncio.gather(*relays, *self._tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        sessions = list(self.sessions.values())
+        return {
+            "sessions": len(sessions),
+            "streams": sum(len(session.streams) for session in sessions),
+            "expired": self.expired,
+        }
+
+    def _audio(self, session: SpeechSession) -> Dict[str, AsyncIterator[bytes]]:
+        streams: Dict[str, AsyncIterator[bytes]] = {}
+        for fmt, stream in session.streams.items():
+            streams[fmt] = align_frames(stream.audio()) if is_pcm(fmt) else stream.audio()
+        return streams
+
+    async def _relay(self, session: SpeechSession) -> None:
+        try:
+            state = await session.clip.wait()
+            if state != "done":
+                # Skipped or interrupted: close the upstream connections now
+                session.ended = True
+                await asyncio.gather(*(stream.abort() for stream in session.streams.values()))
+        finally:
+            if session.idle_timer is not None:
+                session.idle_timer.cancel()
+            self.sessions.pop(session.id, None)
+            logger.info(f"Speech session {session.id} finished after {session.chars} characters")
+
+    async def _end(self, session: SpeechSession) -> None:
+        if session.ended:
+            return
+        session.ended = True
+        if session.idle_timer is not None:
+            session.idle_timer.cancel()
+        async with session.lock:
+            await asyncio.gather(*(stream.close() for stream in session.streams.values()))
+
+    def _touch(self, session: SpeechSession) -> None:
+        if session.idle_timer is not None:
+            session.idle_timer.cancel()
+        if self.idle_timeout > 0:
+            session.idle_timer = asyncio.get_running_loop().call_later(
+                self.idle_timeout, self._expire, session
+            )
+
+    def _expire(self, session: SpeechSession) -> None:
+        if session.ended:
+            return
+        logger.info(f"Speech session {session.id} was idle, ending it")
+        self.expired += 1
+        self._spawn(self._end(session))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
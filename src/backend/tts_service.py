@@ -0,0 +1,244 @@
+"""
+TTS Service
+
+Synthesis entry points shared by the REST routes and the MCP tools. Every request
+goes through the audio cache before it reaches the ElevenLabs API, and identical
+concurrent misses share one upstream call. Long texts are split into segments
+that are synthesized concurrently and delivered in order.
+"""
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import AsyncGenerator, List, Optional, Tuple
+
+from .audio_cache import AudioCache, audio_cache, make_cache_key
+from .audio_formats import DEFAULT_OUTPUT_FORMAT, align_frames, is_pcm
+from .elevenlabs_client import DEFAULT_MODEL_ID, ElevenLabsClient
+from .segmenter import split_text
+from .single_flight import synthesis_flights
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Size of the chunks yielded when a cached clip is streamed
+CACHE_STREAM_CHUNK_SIZE = int(os.getenv("AUDIO_CACHE_STREAM_CHUNK_SIZE", str(32 * 1024)))
+
+# Texts longer than this are split into segments (0 disables segmentation)
+TTS_SEGMENT_MAX_CHARS = int(os.getenv("TTS_SEGMENT_MAX_CHARS", "400"))
+# Maximum number of segments of one text synthesized at the same time
+TTS_SEGMENT_CONCURRENCY = int(os.getenv("TTS_SEGMENT_CONCURRENCY", "3"))
+# Items of one batch synthesized at the same time
+TTS_BATCH_CONCURRENCY = int(os.getenv("TTS_BATCH_CONCURRENCY", "4"))
+
+
+async def synthesize(
+    client: ElevenLabsClient,
+    text: str,
+    voice_id: str,
+    model_id: Optional[str] = None,
+    cache: Optional[AudioCache] = None,
+    priority: str = "default",
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    cancellable: bool = False,
+) -> bytes:
+    """Return the audio for a text, from the cache when possible.
+
+    ``priority`` is the upstream scheduler class used on a cache miss. With
+    ``cancellable``, cancelling the call also aborts the upstream synthesis
+    unless another request is waiting for it.
+    """
+    cache = cache if cache is not None else audio_cache
+    segments = split_text(text, TTS_SEGMENT_MAX_CHARS)
+    if len(segments) <= 1:
+        return await _synthesize_segment(
+            client, text, voice_id, model_id, cache, priority, output_format, cancellable
+        )
+
+    semaphore = asyncio.Semaphore(TTS_SEGMENT_CONCURRENCY)
+
+    async def render(segment: str) -> bytes:
+        async with semaphore:
+            return await _synthesize_segment(
+                client, segment, voice_id, model_id, cache, priority, output_format, cancellable
+            )
+
+    return b"".join(await asyncio.gather(*(render(segment) for segment in segments)))
+
+
+async def synthesize_stream(
+    client: ElevenLabsClient,
+    text: str,
+    voice_id: str,
+    model_id: Optional[str] = None,
+    cache: Optional[AudioCache] = None,
+    priority: str = "default",
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+    cancellable: bool = False,
+) -> AsyncGenerator[bytes, None]:
+    """Stream the audio for a text, from the cache when possible.
+
+    On a miss the upstream chunks are relayed as they arrive and the complete
+    clip is cached once the stream finishes. A request that joins an identical
+    stream already in flight first replays the chunks received so far. Long texts stream their first
+    segment while the following segments render in the background. PCM chunks
+    always hold whole samples. ``cancellable`` works as for ``synthesize``.
+    """
+    cache = cache if cache is not None else audio_cache
+    segments = split_text(text, TTS_SEGMENT_MAX_CHARS)
+    if len(segments) <= 1:
+        stream = _stream_segment(
+            client, text, voice_id, model_id, cache, priority, output_format, cancellable
+        )
+    else:
+        stream = _stream_segments(
+            client, segments, voice_id, model_id, cache, priority, output_format, cancellable
+        )
+    if is_pcm(output_format):
+        stream = align_frames(stream)
+    async for chunk in stream:
+        yield chunk
+
+
+def cached_file(
+    text: str,
+    voice_id: str,
+    model_id: Optional[str] = None,
+    cache: Optional[AudioCache] = None,
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+) -> Optional[Tuple[str, Path]]:
+    """Return the cache key and file of a clip stored on disk, or None.
+
+    Only texts synthesized as a single segment are stored as one clip.
+    """
+    cache = cache if cache is not None else audio_cache
+    if len(split_text(text, TTS_SEGMENT_MAX_CHARS)) > 1:
+        return None
+    key = make_cache_key(text, voice_id, model_id or DEFAULT_MODEL_ID, output_format)
+    path = cache.path(key)
+    return (key, path) if path is not None else None
+
+
+async def synthesize_batch(
+    client: ElevenLabsClient,
+    items: List[Tuple[str, str, Optional[str]]],
+    concurrency: Optional[int] = None,
+    cache: Optional[AudioCache] = None,
+    priority: str = "batch",
+    output_format: str = DEFAULT_OUTPUT_FORMAT,
+) -> AsyncGenerator[Tuple[int, Optional[bytes], Optional[Exception]], None]:
+    """Synthesize ``(text, voice_id, model_id)`` items with bounded concurrency.
+
+    Yields ``(index, audio, error)`` in completion order. A failing item yields
+    its exception instead of aborting the rest of the batch. Every clip ends up
+    in the audio cache.
+    """
+    results: asyncio.Queue = asyncio.Queue()
+    pending = iter(enumerate(items))
+
+    async def worker() -> None:
+        # Workers share one iterator, so each item is taken exactly once
+        for index, (text, voice_id, model_id) in pending:
+            try:
+                audio = await synthesize(
+                    client, text, voice_id, model_id, cache, priority, output_format
+                )
+                results.put_nowait((index, audio, None))
+            except Exception as e:
+                results.put_nowait((index, None, e))
+
+    workers = [
+        asyncio.create_task(worker())
+        for _ in range(min(concurrency or TTS_BATCH_CONCURRENCY, len(items)))
+    ]
+    try:
+        for _ in range(len(items)):
+            yield await results.get()
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def _stream_segments(
+    client: ElevenLabsClient,
+    segments: List[str],
+    voice_id: str,
+    model_id: Optional[str],
+    cache: AudioCache,
+    priority: str,
+    output_format: str,
+    cancellable: bool = False,
+) -> AsyncGenerator[bytes, None]:
+    semaphore = asyncio.Semaphore(TTS_SEGMENT_CONCURRENCY)
+
+    async def render(segment: str) -> bytes:
+        async with semaphore:
+            return await _synthesize_segment(
+                client, segment, voice_id, model_id, cache, priority, output_format, cancellable
+            )
+
+    # The first segment takes a slot before the background renders start
+    tasks = [asyncio.create_task(render(segment)) for segment in segments[1:]]
+    try:
+        async with semaphore:
+            async for chunk in _stream_segment(
+                client, segments[0], voice_id, model_id, cache, priority, output_format, cancellable
+            ):
+                yield chunk
+        for task in tasks:
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _synthesize_segment(
+    client: ElevenLabsClient,
+    text: str,
+    voice_id: str,
+    model_id: Optional[str],
+    cache: AudioCache,
+    priority: str,
+    output_format: str,
+    cancellable: bool = False,
+) -> bytes:
+    key = make_cache_key(text, voice_id, model_id or DEFAULT_MODEL_ID, output_format)
+    audio = await cache.get(key)
+    if audio is not None:
+        return audio
+
+    async def produce() -> AsyncGenerator[bytes, None]:
+        yield await client.text_to_speech(text, voice_id, model_id, priority, output_format)
+
+    flight = synthesis_flights.join(key, produce, lambda audio: cache.put(key, audio))
+    return await flight.result(cancellable)
+
+
+async def _stream_segment(
+    client: ElevenLabsClient,
+    text: str,
+    voice_id: str,
+    model_id: Optional[str],
+    cache: AudioCache,
+    priority: str,
+    output_format: str,
+    cancellable: bool = False,
+) -> AsyncGenerator[bytes, None]:
+    key = make_cache_key(text, voice_id, model_id or DEFAULT_MODEL_ID, output_format)
+    audio = await cache.get(key)
+    if audio is not None:
+        for i in range(0, len(audio), CACHE_STREAM_CHUNK_SIZE):
+            yield audio[i : i + CACHE_STREAM_CHUNK_SIZE]
+        return
+
+    flight = synthesis_flights.join(
+        key,
+        lambda: client.text_to_speech_stream(text, voice_id, model_id, priority, output_format),
+        lambda audio: cache.put(key, audio),
+    )
+    async for chunk in flight.subscribe(cancellable):
+        yield chunk
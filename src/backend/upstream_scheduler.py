@@ -0,0 +1,195 @@
+"""
+Upstream Scheduler
+
+Admission control for calls to the ElevenLabs API. Requests wait in a priority
+queue for one of a fixed number of concurrency slots, synthesis requests are
+charged against a token bucket of characters, and rate-limited or failed calls
+are retried with exponential backoff and jitter that honours ``Retry-After``.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .metrics import UPSTREAM_QUEUE_WAIT
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Concurrent upstream calls allowed for the API key
+UPSTREAM_MAX_CONCURRENCY = int(os.getenv("UPSTREAM_MAX_CONCURRENCY", "4"))
+# Character budget refilled per second and its burst size (0 disables budgeting)
+UPSTREAM_CHARS_PER_SECOND = float(os.getenv("UPSTREAM_CHARS_PER_SECOND", "0"))
+UPSTREAM_CHAR_BURST = int(os.getenv("UPSTREAM_CHAR_BURST", "5000"))
+# Retries for 429 and 5xx responses
+UPSTREAM_MAX_RETRIES = int(os.getenv("UPSTREAM_MAX_RETRIES", "3"))
+UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+UPSTREAM_BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "20"))
+
+# Lower values are served first
+PRIORITIES = {"interactive": 0, "default": 1, "batch": 2, "catalog": 3}
+
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return the delay in seconds from a Retry-After header, if there is one."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(
+    attempt: int,
+    retry_after: Optional[float] = None,
+    base: float = UPSTREAM_BACKOFF_BASE,
+    cap: float = UPSTREAM_BACKOFF_MAX,
+) -> Optional[float]:
+    """Return how long to wait before retry number ``attempt`` (starting at 0).
+
+    Uses full jitter on an exponential backoff. A ``Retry-After`` from the
+    upstream takes precedence; if it asks for longer than ``cap`` there is no
+    point in retrying and None is returned.
+    """
+    if retry_after is not None:
+        if retry_after > cap:
+            return None
+        return retry_after + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+class UpstreamScheduler:
+    def __init__(
+        self,
+        max_concurrency: int = UPSTREAM_MAX_CONCURRENCY,
+        chars_per_second: float = UPSTREAM_CHARS_PER_SECOND,
+        char_burst: int = UPSTREAM_CHAR_BURST,
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_concurrency: Upstream calls allowed at the same time
+            chars_per_second: Rate at which the character budget refills (0 = unlimited)
+            char_burst: Maximum character budget that can accumulate
+        """
+        self.max_concurrency = max_concurrency
+        self.chars_per_second = chars_per_second
+        self.char_burst = char_burst
+
+        self._heap: List[Tuple[int, int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._active = 0
+        self._tokens = float(char_burst)
+        self._refilled_at = time.monotonic()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+        self.granted: Dict[str, int] = {name: 0 for name in PRIORITIES}
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.retries = 0
+
+    @asynccontextmanager
+    async def slot(self, priority: str = "default", chars: int = 0) -> AsyncIterator[None]:
+        """Hold one upstream slot, charging ``chars`` against the budget."""
+        await self.acquire(priority, chars)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def acquire(self, priority: str = "default", chars: int = 0) -> None:
+        rank = PRIORITIES.get(priority, PRIORITIES["default"])
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (rank, next(self._order), chars, future))
+        queued_at = time.monotonic()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted as the waiter was cancelled
+                self.release()
+            raise
+
+        waited = time.monotonic() - queued_at
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        priority = priority if priority in PRIORITIES else "default"
+        self.granted[priority] += 1
+        UPSTREAM_QUEUE_WAIT.labels(priority).observe(waited)
+
+    def release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def stats(self) -> Dict:
+        queued: Dict[str, int] = {name: 0 for name in PRIORITIES}
+        names = {rank: name for name, rank in PRIORITIES.items()}
+        for rank, _, _, future in self._heap:
+            if not future.done():
+                queued[names[rank]] += 1
+        granted = sum(self.granted.values())
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "queued": queued,
+            "granted": dict(self.granted),
+            "wait_seconds_total": self.wait_seconds_total,
+            "wait_seconds_avg": self.wait_seconds_total / granted if granted else 0.0,
+            "wait_seconds_max": self.wait_seconds_max,
+            "retries": self.retries,
+            "char_budget": self._refill() if self.chars_per_second > 0 else None,
+        }
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.char_burst),
+            self._tokens + (now - self._refilled_at) * self.chars_per_second,
+        )
+        self._refilled_at = now
+        return self._tokens
+
+    def _dispatch(self) -> None:
+        while self._heap and self._active < self.max_concurrency:
+            _, _, chars, future = self._heap[0]
+            if future.done():
+                heapq.heappop(self._heap)
+                continue
+
+            if self.chars_per_second > 0 and chars:
+                # Texts longer than the burst only need a full bucket
+                needed = min(chars, self.char_burst)
+                available = self._refill()
+                if available < needed:
+                    self._schedule_wakeup((needed - available) / self.chars_per_second)
+                    return
+                self._tokens -= chars
+
+            heapq.heappop(self._heap)
+            self._active += 1
+            future.set_result(None)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._on_wakeup)
+
+    def _on_wakeup(self) -> None:
+        self._wakeup = None
+        self._dispatch()
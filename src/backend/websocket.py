@@ -1,11 +1,20 @@
 import asyncio
 import json
 import logging
-import base64
-from typing import Dict, Optional, Set, AsyncGenerator
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional, AsyncGenerator, Set
 import os
 from fastapi import WebSocket, WebSocketDisconnect
 from dotenv import load_dotenv
+from .audio_formats import OUTPUT_FORMATS
+from .broadcast_bus import BroadcastBus, BusMessage, create_bus
+from .channels import DEFAULT_CHANNEL, validate_channel
+from .elevenlabs_client import get_client
+from .frames import Frame, encode_audio_binary, encode_audio_json
+from .metrics import BROADCAST_FANOUT, WEBSOCKET_SENT_BYTES
+from .playback import PLAYBACK_COMMANDS, PLAYBACK_KIND, PlaybackQueue
+from .speech_sessions import SPEECH_MESSAGE_TYPES, SpeechSessionManager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,46 +26,471 @@ WS_HOST = os.getenv("WS_HOST", "127.0.0.1")
 PORT = int(os.getenv("PORT", "9020"))
 
 
+# Outbound queue per connection and what to do when a client cannot keep up
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "64"))
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "drop")
+WS_MAX_DROPPED_MESSAGES = int(os.getenv("WS_MAX_DROPPED_MESSAGES", "0"))
+
+SLOW_CONSUMER_POLICIES = ("drop", "coalesce", "disconnect")
+
+# Metric children resolved once so the hot paths skip the label lookup
+_SENT_TEXT_BYTES = WEBSOCKET_SENT_BYTES.labels("text")
+_SENT_BINARY_BYTES = WEBSOCKET_SENT_BYTES.labels("binary")
+_FANOUT_MESSAGE = BROADCAST_FANOUT.labels("message")
+_FANOUT_AUDIO = BROADCAST_FANOUT.labels("audio")
+
+# Wire protocols a client can negotiate with a "hello" message or ?protocol=
+PROTOCOLS = ("json", "binary")
+
+
+class ClientConnection:
+    """A WebSocket with its own bounded outbound queue and writer task.
+
+    Broadcasting only enqueues, so one slow or half-dead client never delays
+    the others. When the queue is full the slow-consumer policy decides:
+    ``drop`` discards the new message, ``coalesce`` discards the oldest queued
+    message to make room, and ``disconnect`` closes the connection. With
+    ``max_dropped`` set, a client that has lost that many messages is
+    disconnected as well.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_close: Callable[[WebSocket], None],
+        queue_size: int = WS_SEND_QUEUE_SIZE,
+        policy: str = WS_SLOW_CONSUMER_POLICY,
+        max_dropped: int = WS_MAX_DROPPED_MESSAGES,
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+        self.websocket = websocket
+        self.protocol = "json"
+        self.channel = DEFAULT_CHANNEL
+        # Audio format the client subscribed to, or None for whatever the speaker chose
+        self.output_format: Optional[str] = None
+        self.policy = policy
+        self.max_dropped = max_dropped
+        self.dropped = 0
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._on_close = on_close
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def stop(self) -> None:
+        if self._writer is not None:
+            self._writer.cancel()
+
+    async def wait_closed(self) -> None:
+        """Wait for the writer task to finish after stop()."""
+        if self._writer is not None:
+            await asyncio.gather(self._writer, return_exceptions=True)
+
+    def enqueue(self, *frames: Frame) -> bool:
+        """Queue frames for this client, applying the slow-consumer policy.
+
+        Frames passed together are queued, dropped and sent as one unit, so an
+        audio header is never separated from its binary payload.
+        """
+        try:
+            self.queue.put_nowait(frames)
+            return True
+        except asyncio.QueueFull:
+            pass
+
+        if self.policy == "disconnect":
+            logger.warning(f"Disconnecting slow WebSocket client: {self.websocket}")
+            self._close()
+            return False
+
+        if self.policy == "coalesce":
+            self.queue.get_nowait()
+            self.queue.put_nowait(frames)
+
+        self.dropped += 1
+        if self.max_dropped and self.dropped >= self.max_dropped:
+            logger.warning(
+                f"Disconnecting WebSocket client after {self.dropped} dropped messages: "
+                f"{self.websocket}"
+            )
+            self._close()
+        return self.policy == "coalesce"
+
+    async def _write_loop(self) -> None:
+        try:
+            while True:
+                frames = await self.queue.get()
+                for frame in frames:
+                    if frame.binary:
+                        await self.websocket.send_bytes(frame.data)
+                        _SENT_BINARY_BYTES.inc(len(frame.data))
+                    else:
+                        await self.websocket.send_text(frame.data)
+                        _SENT_TEXT_BYTES.inc(len(frame.data))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket send failed, dropping client: {str(e)}")
+            self._on_close(self.websocket)
+
+    def _close(self) -> None:
+        self._on_close(self.websocket)
+        asyncio.create_task(self._close_socket())
+
+    async def _close_socket(self) -> None:
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+
 class WebSocketManager:
-    def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
+    """Tracks the sockets of this instance and fans messages out to them.
+
+    Broadcasts and MCP messages are also published on the broadcast bus so that
+    other instances behind the same load balancer deliver them to their own
+    sockets. Messages received from the bus are only delivered locally.
+    Messages with a ``channel`` only go to the clients subscribed to it, found
+    through a channel index, so their cost does not grow with other channels.
+    """
+
+    def __init__(self, bus: Optional[BroadcastBus] = None):
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        # Channel -> its client connections, excluding the MCP connection
+        self.channels: Dict[str, Dict[WebSocket, ClientConnection]] = {}
         self.mcp_connection: Optional[WebSocket] = None
+        # Instances that reported an MCP connection over the bus
+        self.remote_mcp_nodes: Set[str] = set()
+        # Audio formats subscribed to by clients of other instances, per channel
+        self.remote_formats: Dict[str, Dict[str, Set[str]]] = {}
+        self._published_formats: Dict[str, List[str]] = {}
+        self.bus = bus if bus is not None else create_bus()
+        self._bus_handlers: Dict[str, Callable[[BusMessage], Awaitable[None]]] = {}
+        # What each channel hears, in order; clips can be skipped or interrupted
+        self.playback_queues: Dict[str, PlaybackQueue] = {}
+        self.add_bus_handler(PLAYBACK_KIND, self._deliver_playback)
+        # Incremental text sessions; their audio goes out through the playback queue
+        self.speech_sessions = SpeechSessionManager(self)
         logger.info(f"WebSocket manager initialized on {WS_HOST}:{PORT}")
 
-    async def connect(self, websocket: WebSocket):
+    async def start(self):
+        """Start receiving messages from other instances."""
+        await self.bus.start(self._deliver_remote)
+
+    @property
+    def mcp_connected(self) -> bool:
+        """Whether an MCP binary is connected to this or any other instance."""
+        return self.mcp_connection is not None or bool(self.remote_mcp_nodes)
+
+    def add_bus_handler(self, kind: str, handler: Callable[[BusMessage], Awaitable[None]]) -> None:
+        """Handle bus messages of another kind, e.g. for other shared state."""
+        self._bus_handlers[kind] = handler
+
+    @property
+    def playback(self) -> PlaybackQueue:
+        """Playback queue of the default channel."""
+        return self.queue(DEFAULT_CHANNEL)
+
+    def queue(self, channel: Optional[str] = None) -> PlaybackQueue:
+        """Playback queue of a channel, created on first use."""
+        channel = channel or DEFAULT_CHANNEL
+        queue = self.playback_queues.get(channel)
+        if queue is None:
+            queue = self.playback_queues[channel] = PlaybackQueue(self, channel)
+        return queue
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        protocol: str = "json",
+        output_format: Optional[str] = None,
+        channel: Optional[str] = None,
+    ):
         await websocket.accept()
-        self.active_connections.add(websocket)
+        connection = ClientConnection(websocket, self.disconnect)
+        self.active_connections[websocket] = connection
+        self.channels.setdefault(connection.channel, {})[websocket] = connection
+        self.set_protocol(websocket, protocol)
+        self.set_channel(websocket, channel)
+        self.set_output_format(websocket, output_format)
+        connection.start()
         logger.info(f"New WebSocket connection: {websocket}")
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.discard(websocket)
+        connection = self.active_connections.pop(websocket, None)
+        if connection is not None:
+            connection.stop()
+            self._unindex(connection)
+            if connection.output_format is not None:
+                self._publish_formats()
+            self.speech_sessions.end_owned(websocket)
         if self.mcp_connection == websocket:
             self.mcp_connection = None
             logger.info("MCP connection disconnected")
+            status = {"type": "mcp_status", "connected": False}
+            self._broadcast_local(status)
+            self.bus.publish("broadcast", status)
         logger.info(f"WebSocket disconnected: {websocket}")
 
+    def set_protocol(self, websocket: WebSocket, protocol: str) -> str:
+        """Switch a client between the JSON and binary audio protocols."""
+        connection = self.active_connections.get(websocket)
+        if connection is not None and protocol in PROTOCOLS:
+            connection.protocol = protocol
+        return connection.protocol if connection is not None else "json"
+
+    def set_channel(self, websocket: WebSocket, channel: Optional[str]) -> str:
+        """Move a client to another channel; malformed names are ignored."""
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            return DEFAULT_CHANNEL
+        try:
+            channel = validate_channel(channel) if channel else connection.channel
+        except ValueError:
+            channel = connection.channel
+        if channel != connection.channel:
+            self._unindex(connection)
+            connection.channel = channel
+            if websocket != self.mcp_connection:
+                self.channels.setdefault(channel, {})[websocket] = connection
+            if connection.output_format is not None:
+                self._publish_formats()
+        return connection.channel
+
+    def channel_of(self, websocket: WebSocket) -> str:
+        connection = self.active_connections.get(websocket)
+        return connection.channel if connection is not None else DEFAULT_CHANNEL
+
+    def _unindex(self, connection: ClientConnection) -> None:
+        members = self.channels.get(connection.channel)
+        if members is not None:
+            members.pop(connection.websocket, None)
+            if not members:
+                del self.channels[connection.channel]
+
+    def set_output_format(
+        self, websocket: WebSocket, output_format: Optional[str]
+    ) -> Optional[str]:
+        """Subscribe a client to audio in one output format; unknown formats are ignored."""
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            return None
+        if output_format in OUTPUT_FORMATS and output_format != connection.output_format:
+            connection.output_format = output_format
+            self._publish_formats()
+        return connection.output_format
+
+    def listener_formats(self, channel: Optional[str] = None) -> Set[str]:
+        """Output formats clients of any instance subscribed to, in one channel or all."""
+        formats = {
+            connection.output_format
+            for connection in self._channel_connections(channel)
+            if connection.output_format is not None
+        }
+        for remote in self.remote_formats.values():
+            if channel is None:
+                for channel_formats in remote.values():
+                    formats |= channel_formats
+            else:
+                formats |= remote.get(channel, set())
+        return formats
+
+    def audio_formats(self, output_format: str, channel: Optional[str] = None) -> List[str]:
+        """Formats to render a clip in: the speaker's format first, then any other subscribed."""
+        return [output_format] + sorted(self.listener_formats(channel) - {output_format})
+
+    def _publish_formats(self) -> None:
+        if not self.bus.distributed:
+            return
+        formats: Dict[str, Set[str]] = {}
+        for connection in self._client_connections():
+            if connection.output_format is not None:
+                formats.setdefault(connection.channel, set()).add(connection.output_format)
+        published = {channel: sorted(values) for channel, values in formats.items()}
+        if published != self._published_formats:
+            self._published_formats = published
+            self.bus.publish("formats", {"formats": published})
+
+    async def shutdown(self):
+        """Stop every writer task, e.g. when the application shuts down."""
+        connections = list(self.active_connections.values())
+        for connection in connections:
+            self.disconnect(connection.websocket)
+        await asyncio.gather(*(queue.shutdown() for queue in self.playback_queues.values()))
+        await self.speech_sessions.shutdown()
+        await asyncio.gather(*(connection.wait_closed() for connection in connections))
+        await self.bus.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Connection count and outbound queue depth for this instance."""
+        connections = list(self.active_connections.values())
+        return {
+            "connections": len(connections),
+            "mcp_connected": int(self.mcp_connected),
+            "queued_messages": sum(connection.queue.qsize() for connection in connections),
+            "dropped_messages": sum(connection.dropped for connection in connections),
+            "channels": len(self.channels),
+        }
+
     async def register_mcp(self, websocket: WebSocket):
         """Register a connection as the MCP binary connection"""
         self.mcp_connection = websocket
+        connection = self.active_connections.get(websocket)
+        if connection is not None:
+            # The MCP connection is not a listener
+            self._unindex(connection)
         logger.info(f"MCP binary registered: {websocket}")
         await self.broadcast_to_clients({"type": "mcp_status", "connected": True})
 
+    async def send_to_client(self, websocket: WebSocket, message: Dict):
+        """Send a message to a single client through its outbound queue"""
+        connection = self.active_connections.get(websocket)
+        if connection:
+            connection.enqueue(Frame.encode(message))
+
     async def send_to_mcp(self, message: Dict):
-        """Send a message to the MCP binary"""
-        if self.mcp_connection:
-            await self.mcp_connection.send_text(json.dumps(message))
-            logger.debug(f"Message sent to MCP: {message}")
+        """Send a message to the MCP binary, which may be connected to another instance"""
+        if self._send_to_local_mcp(message):
+            return
+        if self.bus.distributed:
+            self.bus.publish("mcp", message)
+            logger.debug("No local MCP connection, published message to other instances")
         else:
             logger.warning("Attempted to send message to MCP, but no MCP connection is available")
 
+    def _send_to_local_mcp(self, message: Dict) -> bool:
+        connection = self.active_connections.get(self.mcp_connection)
+        if connection is None:
+            return False
+        connection.enqueue(Frame.encode(message))
+        logger.debug(f"Message sent to MCP: {message}")
+        return True
+
+    def _client_connections(self) -> List[ClientConnection]:
+        # Snapshot the connections; enqueueing may disconnect slow clients
+        return [
+            connection
+            for websocket, connection in list(self.active_connections.items())
+            if websocket != self.mcp_connection
+        ]
+
+    def _channel_connections(self, channel: Optional[str]) -> List[ClientConnection]:
+        if channel is None:
+            return self._client_connections()
+        return list(self.channels.get(channel, {}).values())
+
+    def _recipients(self, message: Dict) -> List[ClientConnection]:
+        """Clients a message is meant for.
+
+        A message with a ``channel`` only goes to that channel's clients.
+        Messages about a clip carry its ``output_format``. Clients subscribed to
+        a format only receive clips in that format; the others receive the
+        clips marked ``default``, i.e. in the format the speaker chose.
+        """
+        connections = self._channel_connections(message.get("channel"))
+        output_format = message.get("output_format")
+        if output_format is None:
+            return connections
+        default = message.get("default", True)
+        return [
+            connection
+            for connection in connections
+            if connection.output_format == output_format
+            or (connection.output_format is None and default)
+        ]
+
     async def broadcast_to_clients(self, message: Dict):
         """Broadcast a message to all connected clients except MCP"""
-        for connection in self.active_connections:
-            if connection != self.mcp_connection:
-                await connection.send_text(json.dumps(message))
-        logger.debug(
-            f"Broadcast message to {len(self.active_connections) - (1 if self.mcp_connection else 0)} clients"
-        )
+        self._broadcast_local(message)
+        self.bus.publish("broadcast", message)
+
+    def _broadcast_local(self, message: Dict) -> None:
+        started = time.perf_counter()
+        # Encode once and share the same immutable frame with every recipient
+        frame = Frame.encode(message)
+        recipients = self._recipients(message)
+        for connection in recipients:
+            connection.enqueue(frame)
+        _FANOUT_MESSAGE.observe(time.perf_counter() - started)
+        logger.debug(f"Broadcast message to {len(recipients)} clients")
+
+    async def broadcast_audio(self, header: Dict, audio: bytes):
+        """Broadcast audio to all clients in the protocol each one negotiated.
+
+        Each encoding is produced at most once per broadcast and only if some
+        recipient uses it.
+        """
+        self._broadcast_audio_local(header, audio)
+        self.bus.publish("audio", header, audio)
+
+    async def broadcast_clip(
+        self, header: Dict, render: Callable[[str], Awaitable[bytes]], output_format: str
+    ):
+        """Broadcast a complete clip in the speaker's format and every subscribed one.
+
+        ``render`` returns the audio for a format; the formats render concurrently.
+        """
+        formats = self.audio_formats(output_format, header.get("channel"))
+        clips = await asyncio.gather(*(render(fmt) for fmt in formats))
+        for fmt, audio in zip(formats, clips):
+            await self.broadcast_audio(
+                {**header, "output_format": fmt, "default": fmt == output_format}, audio
+            )
+
+    def _broadcast_audio_local(self, header: Dict, audio: bytes) -> None:
+        started = time.perf_counter()
+        encoded: Dict[str, tuple] = {}
+        recipients = self._recipients(header)
+        for connection in recipients:
+            frames = encoded.get(connection.protocol)
+            if frames is None:
+                if connection.protocol == "binary":
+                    frames = encode_audio_binary(header, audio)
+                else:
+                    frames = encode_audio_json(header, audio)
+                encoded[connection.protocol] = frames
+            connection.enqueue(*frames)
+        _FANOUT_AUDIO.observe(time.perf_counter() - started)
+        logger.debug(f"Broadcast {len(audio)} audio bytes to {len(recipients)} clients")
+
+    async def _deliver_remote(self, bus_message: BusMessage) -> None:
+        """Deliver a message published by another instance to local sockets only."""
+        handler = self._bus_handlers.get(bus_message.kind)
+        if handler is not None:
+            await handler(bus_message)
+        elif bus_message.kind == "broadcast":
+            if bus_message.message.get("type") == "mcp_status":
+                if bus_message.message.get("connected"):
+                    self.remote_mcp_nodes.add(bus_message.origin)
+                else:
+                    self.remote_mcp_nodes.discard(bus_message.origin)
+            self._broadcast_local(bus_message.message)
+        elif bus_message.kind == "audio" and bus_message.audio is not None:
+            self._broadcast_audio_local(bus_message.message, bus_message.audio)
+        elif bus_message.kind == "mcp":
+            self._send_to_local_mcp(bus_message.message)
+        elif bus_message.kind == "formats":
+            formats = bus_message.message.get("formats", {})
+            if formats:
+                self.remote_formats[bus_message.origin] = {
+                    channel: set(values) for channel, values in formats.items()
+                }
+            else:
+                self.remote_formats.pop(bus_message.origin, None)
+        else:
+            logger.warning(f"Unknown broadcast bus message kind: {bus_message.kind}")
+
+    async def _deliver_playback(self, bus_message: BusMessage) -> None:
+        """Apply a playback command issued on another instance to the local queue."""
+        channel = bus_message.message.get("channel") or DEFAULT_CHANNEL
+        if channel in self.playback_queues:
+            await self.playback_queues[channel].command(
+                bus_message.message.get("command", ""),
+                bus_message.message.get("clip_id"),
+                publish=False,
+            )
 
     async def handle_mcp_message(self, message: Dict):
         """Handle a message from the MCP binary"""
@@ -81,39 +515,95 @@ class WebSocketManager:
             logger.warning(f"Unknown message type from MCP: {message_type}")
 
     async def stream_audio_to_clients(
-        self, audio_stream: AsyncGenerator[bytes, None], text: str, voice_id: str
+        self,
+        audio_stream: AsyncGenerator[bytes, None],
+        text: str,
+        voice_id: str,
+        first_chunk_sent: Optional[asyncio.Future] = None,
+        output_format: Optional[str] = None,
+        default: bool = True,
+        clip_id: Optional[str] = None,
+        on_chunk: Optional[Callable[[int], None]] = None,
+        channel: Optional[str] = None,
     ):
-        """Stream audio chunks to all connected clients."""
+        """Stream audio chunks to all connected clients.
+
+        If ``first_chunk_sent`` is given it resolves to the clip id once the first
+        chunk has been broadcast, or to the error if the stream fails before that.
+        With ``output_format`` set, only clients that take that format receive
+        the clip (see ``_recipients``), and with ``channel`` set only that
+        channel's clients. ``on_chunk`` receives the size of every chunk sent.
+        The stream is closed when streaming ends or is cancelled.
+        """
+        clip_id = clip_id or uuid.uuid4().hex
+        # Routing fields carried by every message about this clip
+        route: Dict = {"output_format": output_format, "default": default} if output_format else {}
+        if channel is not None:
+            route["channel"] = channel
         try:
             # Send start message
             await self.broadcast_to_clients(
-                {"type": "audio_start", "text": text, "voice_id": voice_id}
+                {
+                    "type": "audio_start",
+                    "clip_id": clip_id,
+                    "text": text,
+                    "voice_id": voice_id,
+                    **route,
+                }
             )
 
             # Stream audio chunks
             chunk_count = 0
             async for chunk in audio_stream:
                 chunk_count += 1
-                # Encode chunk as base64 for JSON transmission
-                encoded_chunk = base64.b64encode(chunk).decode("utf-8")
 
                 # Send chunk to all clients
-                await self.broadcast_to_clients(
-                    {"type": "audio_chunk", "chunk_index": chunk_count, "data": encoded_chunk}
+                await self.broadcast_audio(
+                    {
+                        "type": "audio_chunk",
+                        "clip_id": clip_id,
+                        "seq": chunk_count,
+                        "chunk_index": chunk_count,
+                        **route,
+                    },
+                    chunk,
                 )
-
-                # Small delay to avoid overwhelming clients
-                await asyncio.sleep(0.01)
+                if on_chunk is not None:
+                    on_chunk(len(chunk))
+                if first_chunk_sent is not None and not first_chunk_sent.done():
+                    first_chunk_sent.set_result(clip_id)
 
             # Send completion message
-            await self.broadcast_to_clients({"type": "audio_complete", "total_chunks": chunk_count})
+            await self.broadcast_to_clients(
+                {
+                    "type": "audio_complete",
+                    "clip_id": clip_id,
+                    "total_chunks": chunk_count,
+                    **route,
+                }
+            )
+
+            if first_chunk_sent is not None and not first_chunk_sent.done():
+                first_chunk_sent.set_result(clip_id)
 
             logger.info(f"Successfully streamed {chunk_count} audio chunks to clients")
         except Exception as e:
             logger.error(f"Error streaming audio to clients: {str(e)}")
+            if first_chunk_sent is not None and not first_chunk_sent.done():
+                first_chunk_sent.set_exception(e)
             await self.broadcast_to_clients(
-                {"type": "error", "message": f"Audio streaming error: {str(e)}"}
+                {
+                    "type": "error",
+                    "clip_id": clip_id,
+                    "message": f"Audio streaming error: {str(e)}",
+                    **route,
+                }
             )
+        finally:
+            # Close the chain of generators now so an abandoned stream stops upstream
+            aclose = getattr(audio_stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
 
 
 # Create a singleton instance
@@ -121,12 +611,58 @@ manager = WebSocketManager()
 
 
 async def websocket_endpoint(websocket: WebSocket):
-    await manager.connect(websocket)
+    await manager.connect(
+        websocket,
+        websocket.query_params.get("protocol", "json"),
+        websocket.query_params.get("output_format"),
+        websocket.query_params.get("channel"),
+    )
     try:
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
 
+            # Protocol negotiation; clients that never say hello stay on JSON
+            if message.get("type") == "hello":
+                protocol = manager.set_protocol(websocket, message.get("protocol", "json"))
+                channel = manager.set_channel(websocket, message.get("channel"))
+                output_format = manager.set_output_format(websocket, message.get("output_format"))
+                await manager.send_to_client(
+                    websocket,
+                    {
+                        "type": "hello",
+                        "protocol": protocol,
+                        "output_format": output_format,
+                        "channel": channel,
+                    },
+                )
+                continue
+
+            # Incremental text: speak_begin, speak_append and speak_end
+            if message.get("type") in SPEECH_MESSAGE_TYPES:
+                reply = await manager.speech_sessions.handle_message(
+                    get_client(), message, owner=websocket
+                )
+                await manager.send_to_client(websocket, reply)
+                continue
+
+            # Playback control of the client's channel: skip, clear and interrupt
+            if message.get("type") in PLAYBACK_COMMANDS:
+                command = message["type"]
+                queue = manager.queue(manager.channel_of(websocket))
+                cancelled = await queue.command(command, message.get("clip_id"))
+                await manager.send_to_client(
+                    websocket,
+                    {
+                        "type": "playback",
+                        "command": command,
+                        "channel": queue.channel,
+                        "cancelled": cancelled,
+                        **queue.state(),
+                    },
+                )
+                continue
+
             # Check if this is an MCP registration message
             if message.get("type") == "register" and message.get("client") == "mcp":
                 await manager.register_mcp(websocket)
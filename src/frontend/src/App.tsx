@@ -32,7 +32,8 @@ import {
   Save as SaveIcon,
   GraphicEq as WaveIcon,
 } from '@mui/icons-material'
-import apiService, { Voice, Model, Config, connectWebSocket } from './services/api'
+import apiService, { Voice, Model, Config, AudioHeader, connectWebSocket } from './services/api'
+import { ClipPlayer, PcmClipPlayer, StreamingClipPlayer, pcmSampleRate } from './services/streamPlayer'
 import { TabContext, TabList, TabPanel } from '@mui/lab'
 
 // Create wave animation keyframes
@@ -42,6 +43,14 @@ const waveAnimation = keyframes`
   100% { transform: scaleY(0.5); }
 `
 
+// Raw PCM can be scheduled chunk by chunk without decoding fragments
+const STREAM_OUTPUT_FORMAT = 'pcm_24000'
+
+// Decode base64 audio sent by servers that do not speak the binary protocol
+const base64ToArrayBuffer = (data: string): ArrayBuffer => {
+  return Uint8Array.from(atob(data), (c) => c.charCodeAt(0)).buffer
+}
+
 // Create a custom theme
 const theme = createTheme({
   palette: {
@@ -107,6 +116,10 @@ function App() {
   const [snackbarMessage, setSnackbarMessage] = useState<string>('')
   const wsRef = useRef<WebSocket | null>(null)
   const audioContextRef = useRef<AudioContext | null>(null)
+  const pendingHeaderRef = useRef<AudioHeader | null>(null)
+  const streamsRef = useRef<Map<string, ClipPlayer>>(new Map())
+  // Complete clips that were decoded and are playing, by clip id
+  const sourcesRef = useRef<Map<string, AudioBufferSourceNode>>(new Map())
   const [isAudioInitialized, setIsAudioInitialized] = useState(false)
 
   // Update ensureAudioContext to set initialized state
@@ -122,6 +135,110 @@ function App() {
     return audioContextRef.current
   }
 
+  const playAudioData = async (arrayBuffer: ArrayBuffer, outputFormat?: unknown, clipId?: string) => {
+    try {
+      const audioContext = await ensureAudioContext()
+      const sampleRate = pcmSampleRate(outputFormat)
+      if (sampleRate) {
+        const player = new PcmClipPlayer({
+          context: audioContext,
+          sampleRate,
+          onPlaying: () => setIsPlaying(true),
+          onEnded: () => {
+            setIsPlaying(false)
+            if (clipId) streamsRef.current.delete(clipId)
+          },
+        })
+        if (clipId) streamsRef.current.set(clipId, player)
+        player.append(arrayBuffer)
+        player.end()
+        return
+      }
+      audioContext.decodeAudioData(arrayBuffer, (buffer) => {
+        const source = audioContext.createBufferSource()
+        source.buffer = buffer
+        source.connect(audioContext.destination)
+        source.start(0)
+        setIsPlaying(true)
+        if (clipId) sourcesRef.current.set(clipId, source)
+        source.onended = () => {
+          setIsPlaying(false)
+          if (clipId) sourcesRef.current.delete(clipId)
+        }
+      }, (err) => {
+        console.error('Error decoding audio data:', err)
+        setError('Error playing audio stream')
+      })
+    } catch (err) {
+      console.error('Error processing audio data:', err)
+      setError('Error initializing audio playback')
+    }
+  }
+
+  // Start a streamed clip; chunks are played as they arrive
+  const startClip = (clipId: string, outputFormat?: unknown) => {
+    streamsRef.current.get(clipId)?.stop()
+    const sampleRate = pcmSampleRate(outputFormat)
+    if (sampleRate && audioContextRef.current) {
+      streamsRef.current.set(clipId, new PcmClipPlayer({
+        context: audioContextRef.current,
+        sampleRate,
+        onPlaying: () => setIsPlaying(true),
+        onEnded: () => {
+          setIsPlaying(false)
+          streamsRef.current.delete(clipId)
+        },
+      }))
+      return
+    }
+    streamsRef.current.set(clipId, new StreamingClipPlayer({
+      onPlaying: () => setIsPlaying(true),
+      onEnded: () => {
+        setIsPlaying(false)
+        streamsRef.current.delete(clipId)
+      },
+      playComplete: (audio) => {
+        streamsRef.current.delete(clipId)
+        playAudioData(audio, undefined, clipId)
+      },
+    }))
+  }
+
+  // Stop a clip the server skipped or interrupted
+  const stopClip = (clipId: string) => {
+    streamsRef.current.get(clipId)?.stop()
+    streamsRef.current.delete(clipId)
+    const source = sourcesRef.current.get(clipId)
+    if (source) {
+      source.onended = null
+      source.stop()
+      sourcesRef.current.delete(clipId)
+    }
+    if (streamsRef.current.size === 0 && sourcesRef.current.size === 0) {
+      setIsPlaying(false)
+    }
+  }
+
+  const handleAudioMessage = async (
+    header: AudioHeader | { type: string; clip_id?: string; output_format?: string },
+    audio: ArrayBuffer
+  ) => {
+    switch (header.type) {
+      case 'audio_data':
+        await playAudioData(audio, header.output_format, header.clip_id)
+        break
+
+      case 'audio_chunk':
+        if (header.clip_id) {
+          streamsRef.current.get(header.clip_id)?.append(audio)
+        }
+        break
+
+      default:
+        console.log('Unhandled audio message type:', header.type)
+    }
+  }
+
   // Update WebSocket message handler to remove debug logs
   useEffect(() => {
     const fetchData = async () => {
@@ -152,37 +269,44 @@ function App() {
           wsRef.current = connectWebSocket(
             async (event: MessageEvent) => {
               try {
+                // Binary frames carry the audio announced by the preceding header
+                if (event.data instanceof ArrayBuffer) {
+                  const header = pendingHeaderRef.current
+                  pendingHeaderRef.current = null
+                  if (header) {
+                    await handleAudioMessage(header, event.data)
+                  }
+                  return
+                }
+
                 const message = JSON.parse(event.data)
                 console.log('WebSocket message received:', message.type);
+
+                if (message.size !== undefined && message.data === undefined) {
+                  pendingHeaderRef.current = message
+                  return
+                }
                 
                 switch (message.type) {
                   case 'audio_data':
-                    try {
-                      const audioContext = await ensureAudioContext()
-                      const audioData = atob(message.data)
-                      const arrayBuffer = new ArrayBuffer(audioData.length)
-                      const view = new Uint8Array(arrayBuffer)
-                      for (let i = 0; i < audioData.length; i++) {
-                        view[i] = audioData.charCodeAt(i)
-                      }
-                      
-                      audioContext.decodeAudioData(arrayBuffer, (buffer) => {
-                        const source = audioContext.createBufferSource()
-                        source.buffer = buffer
-                        source.connect(audioContext.destination)
-                        source.start(0)
-                        setIsPlaying(true)
-                        source.onended = () => {
-                          setIsPlaying(false)
-                        }
-                      }, (err) => {
-                        console.error('Error decoding audio data:', err)
-                        setError('Error playing audio stream')
-                      })
-                    } catch (err) {
-                      console.error('Error processing audio data:', err)
-                      setError('Error initializing audio playback')
-                    }
+                  case 'audio_chunk':
+                    await handleAudioMessage(message, base64ToArrayBuffer(message.data))
+                    break
+
+                  case 'audio_start':
+                    await ensureAudioContext()
+                    startClip(message.clip_id, message.output_format)
+                    break
+
+                  case 'audio_complete':
+                    streamsRef.current.get(message.clip_id)?.end()
+                    break
+
+                  case 'audio_cancel':
+                    stopClip(message.clip_id)
+                    break
+
+                  case 'playback':
                     break
                     
                   case 'error':
@@ -210,7 +334,8 @@ function App() {
               console.error('WebSocket connection error')
               setError('WebSocket connection error')
               wsRef.current = null
-            }
+            },
+            STREAM_OUTPUT_FORMAT
           )
         }
       } catch (err) {
@@ -249,12 +374,21 @@ function App() {
     audio.play()
   }
 
+  // Stop playback here and ask the server to stop speaking and drop the queue
   const stopAudio = () => {
+    wsRef.current?.send(JSON.stringify({ type: 'interrupt' }))
     const audioElements = document.querySelectorAll('audio')
     audioElements.forEach(audio => {
       audio.pause()
       audio.currentTime = 0
     })
+    streamsRef.current.forEach((player) => player.stop())
+    streamsRef.current.clear()
+    sourcesRef.current.forEach((source) => {
+      source.onended = null
+      source.stop()
+    })
+    sourcesRef.current.clear()
     setIsPlaying(false)
   }
 
@@ -372,6 +506,17 @@ function App() {
               >
                 {isLoading ? 'Converting...' : 'Convert to Speech'}
               </Button>
+              <Button
+                variant="outlined"
+                color="secondary"
+                startIcon={<StopIcon />}
+                onClick={stopAudio}
+                disabled={!isPlaying}
+                fullWidth
+                sx={{ mt: 1 }}
+              >
+                Stop Speaking
+              </Button>
             </TabPanel>
             
             <TabPanel value="1">
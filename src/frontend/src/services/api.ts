@@ -24,6 +24,7 @@ export interface Config {
   default_model_id: string;
   settings: {
     auto_play: boolean;
+    use_streaming?: boolean;
   };
 }
 
@@ -69,21 +70,38 @@ export const apiService = {
 };
 
 /**
- * Connect to the WebSocket server for streaming audio
+ * Control header sent before a binary audio frame
+ */
+export interface AudioHeader {
+  type: string;
+  clip_id: string;
+  seq: number;
+  size: number;
+  [key: string]: unknown;
+}
+
+/**
+ * Connect to the WebSocket server for streaming audio.
+ *
+ * The connection negotiates the binary protocol: audio arrives as a JSON
+ * control header followed by the raw bytes in a binary frame.
  */
 export const connectWebSocket = (
   onMessage: (event: MessageEvent) => void,
   onOpen?: () => void,
   onClose?: () => void,
-  onError?: (event: Event) => void
+  onError?: (event: Event) => void,
+  outputFormat?: string
 ): WebSocket => {
   const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
   const wsUrl = `${wsProtocol}//${window.location.hostname}:9020/ws`;
   
   const ws = new WebSocket(wsUrl);
+  ws.binaryType = 'arraybuffer';
   
   ws.onopen = () => {
     console.log('WebSocket connection established');
+    ws.send(JSON.stringify({ type: 'hello', protocol: 'binary', output_format: outputFormat }));
     if (onOpen) onOpen();
   };
   
@@ -0,0 +1,179 @@
+/**
+ * Plays a clip that arrives as a sequence of audio chunks.
+ *
+ * Chunks are appended to a MediaSource so playback starts with the first
+ * chunk. Browsers without MediaSource support for the clip's format fall
+ * back to collecting the chunks and playing the complete clip at the end.
+ */
+export class StreamingClipPlayer {
+  private readonly mimeType: string
+  private readonly onPlaying?: () => void
+  private readonly onEnded?: () => void
+  private readonly playComplete: (audio: ArrayBuffer) => void
+  private mediaSource: MediaSource | null = null
+  private sourceBuffer: SourceBuffer | null = null
+  private audio: HTMLAudioElement | null = null
+  private pending: ArrayBuffer[] = []
+  private chunks: ArrayBuffer[] = []
+  private ended = false
+  private started = false
+
+  constructor(options: {
+    mimeType?: string
+    onPlaying?: () => void
+    onEnded?: () => void
+    playComplete: (audio: ArrayBuffer) => void
+  }) {
+    this.mimeType = options.mimeType ?? 'audio/mpeg'
+    this.onPlaying = options.onPlaying
+    this.onEnded = options.onEnded
+    this.playComplete = options.playComplete
+
+    if (window.MediaSource && MediaSource.isTypeSupported(this.mimeType)) {
+      this.mediaSource = new MediaSource()
+      this.audio = new Audio(URL.createObjectURL(this.mediaSource))
+      this.audio.onplaying = () => this.onPlaying?.()
+      this.audio.onended = () => this.onEnded?.()
+      this.mediaSource.addEventListener('sourceopen', () => {
+        this.sourceBuffer = this.mediaSource!.addSourceBuffer(this.mimeType)
+        this.sourceBuffer.addEventListener('updateend', () => this.flush())
+        this.flush()
+      })
+    }
+  }
+
+  append(chunk: ArrayBuffer) {
+    if (!this.mediaSource) {
+      this.chunks.push(chunk)
+      return
+    }
+    this.pending.push(chunk)
+    this.flush()
+    if (!this.started) {
+      this.started = true
+      this.audio!.play().catch((err) => console.error('Error starting playback:', err))
+    }
+  }
+
+  end() {
+    this.ended = true
+    if (!this.mediaSource) {
+      const total = this.chunks.reduce((size, chunk) => size + chunk.byteLength, 0)
+      const audio = new Uint8Array(total)
+      let offset = 0
+      for (const chunk of this.chunks) {
+        audio.set(new Uint8Array(chunk), offset)
+        offset += chunk.byteLength
+      }
+      this.chunks = []
+      this.playComplete(audio.buffer)
+      return
+    }
+    this.flush()
+  }
+
+  stop() {
+    this.pending = []
+    this.chunks = []
+    if (this.audio) {
+      this.audio.pause()
+      URL.revokeObjectURL(this.audio.src)
+    }
+  }
+
+  private flush() {
+    if (!this.sourceBuffer || this.sourceBuffer.updating) {
+      return
+    }
+    const next = this.pending.shift()
+    if (next) {
+      this.sourceBuffer.appendBuffer(next)
+    } else if (this.ended && this.mediaSource?.readyState === 'open') {
+      this.mediaSource.endOfStream()
+    }
+  }
+}
+
+/**
+ * Plays a clip that arrives as raw 16-bit little-endian mono PCM.
+ *
+ * Each chunk is copied into an AudioBuffer and scheduled right after the
+ * previous one. Nothing has to be decoded, so playback starts with the first
+ * chunk and small fragments play without gaps.
+ */
+export class PcmClipPlayer {
+  private readonly context: AudioContext
+  private readonly sampleRate: number
+  private readonly onPlaying?: () => void
+  private readonly onEnded?: () => void
+  private sources: AudioBufferSourceNode[] = []
+  private nextTime = 0
+  private ended = false
+
+  constructor(options: {
+    context: AudioContext
+    sampleRate: number
+    onPlaying?: () => void
+    onEnded?: () => void
+  }) {
+    this.context = options.context
+    this.sampleRate = options.sampleRate
+    this.onPlaying = options.onPlaying
+    this.onEnded = options.onEnded
+  }
+
+  append(chunk: ArrayBuffer) {
+    const samples = new Int16Array(chunk, 0, Math.floor(chunk.byteLength / 2))
+    if (samples.length === 0) {
+      return
+    }
+    const buffer = this.context.createBuffer(1, samples.length, this.sampleRate)
+    const channel = buffer.getChannelData(0)
+    for (let i = 0; i < samples.length; i++) {
+      channel[i] = samples[i] / 32768
+    }
+
+    const source = this.context.createBufferSource()
+    source.buffer = buffer
+    source.connect(this.context.destination)
+    // A short lead keeps the first chunk from being scheduled in the past
+    const startAt = Math.max(this.nextTime, this.context.currentTime + 0.05)
+    source.start(startAt)
+    this.nextTime = startAt + buffer.duration
+
+    if (this.sources.length === 0) {
+      this.onPlaying?.()
+    }
+    this.sources.push(source)
+    source.onended = () => {
+      this.sources = this.sources.filter((s) => s !== source)
+      if (this.ended && this.sources.length === 0) {
+        this.onEnded?.()
+      }
+    }
+  }
+
+  end() {
+    this.ended = true
+    if (this.sources.length === 0) {
+      this.onEnded?.()
+    }
+  }
+
+  stop() {
+    this.ended = true
+    for (const source of this.sources) {
+      source.onended = null
+      source.stop()
+    }
+    this.sources = []
+  }
+}
+
+export type ClipPlayer = StreamingClipPlayer | PcmClipPlayer
+
+/** Sample rate of a `pcm_*` output format, or null for encoded formats. */
+export const pcmSampleRate = (outputFormat?: unknown): number | null => {
+  const match = typeof outputFormat === 'string' ? /^pcm_(\d+)$/.exec(outputFormat) : null
+  return match ? Number(match[1]) : null
+}
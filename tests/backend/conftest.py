@@ -3,11 +3,14 @@ Pytest configuration and fixtures.
 """
 
 import pytest
+import pytest_asyncio
 from unittest.mock import MagicMock, patch
 from pathlib import Path
 import tempfile
 import shutil
 import json
+from src.backend.broker import PubSubBroker
+from .fake_upstream import FakeElevenLabs
 
 
 @pytest.fixture
@@ -65,3 +68,21 @@ def mock_subprocess():
     with patch("subprocess.Popen") as mock_popen:
         mock_popen.return_value = MagicMock()
         yield mock_popen
+
+
+@pytest_asyncio.fixture
+async def fake_upstream():
+    """Run a local fake ElevenLabs API for the duration of a test."""
+    upstream = FakeElevenLabs()
+    await upstream.start()
+    yield upstream
+    await upstream.stop()
+
+
+@pytest_asyncio.fixture
+async def pubsub_broker():
+    """Run a local pub/sub broker for the duration of a test."""
+    broker = PubSubBroker()
+    await broker.start()
+    yield broker
+    await broker.stop()
@@ -0,0 +1,170 @@
+"""
+Local fake of the ElevenLabs REST API for tests.
+
+Serves just enough of the upstream surface (synthesis, input streaming,
+voices, models) over a real socket so the client can be exercised end to end without network access.
+"""
+
+import asyncio
+import base64
+import random
+from typing import Dict, List, Optional, Set, Tuple
+
+from aiohttp import web
+
+
+class FakeElevenLabs:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        chunk_size: int = 4,
+        chunk_delay: float = 0.0,
+        error_rate: float = 0.0,
+        audio_size: int = 0,
+    ):
+        """Initialize the fake upstream.
+
+        Args:
+            latency: Seconds to wait before answering each synthesis request
+            chunk_size: Size of each chunk sent by the streaming endpoint
+            chunk_delay: Seconds to wait between streamed chunks
+            error_rate: Fraction of synthesis requests answered with a 503
+            audio_size: Pad every clip to this many bytes (0 keeps clips minimal)
+        """
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.audio_size = audio_size
+        self._random = random.Random(0)
+        self.requests: List[dict] = []
+        # Messages received by the input-streaming endpoint, per connection
+        self.input_streams: List[List[dict]] = []
+        # Responses (status, headers) returned instead of audio, in order
+        self.failures: List[Tuple[int, Dict[str, str]]] = []
+        self.active = 0
+        self.max_active = 0
+        self.connections: Set[tuple] = set()
+        self.base_url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_post("/v1/text-to-speech/{voice_id}", self._synthesize)
+        self.app.router.add_post("/v1/text-to-speech/{voice_id}/stream", self._stream)
+        self.app.router.add_get("/v1/text-to-speech/{voice_id}/stream-input", self._stream_input)
+        self.app.router.add_get("/v1/voices", self._voices)
+        self.app.router.add_get("/v1/models", self._models)
+
+    @staticmethod
+    def audio_for(text: str, output_format: str = "mp3_44100_128") -> bytes:
+        """Return the deterministic fake audio for a text in an output format."""
+        if output_format == "mp3_44100_128":
+            return f"AUDIO:{text}".encode()
+        return f"AUDIO[{output_format}]:{text}".encode()
+
+    async def start(self) -> str:
+        """Start listening on a free local port and return the base URL."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+
+    def _record_connection(self, request: web.Request) -> None:
+        self.connections.add(request.transport.get_extra_info("peername"))
+
+    def _audio(self, request: web.Request, text: str) -> bytes:
+        output_format = request.query.get("output_format", "mp3_44100_128")
+        return self.audio_for(text, output_format).ljust(self.audio_size, b"\0")
+
+    def _failure(self) -> Optional[web.Response]:
+        if self.failures:
+            status, headers = self.failures.pop(0)
+            return web.Response(status=status, headers=headers, text="rate limited")
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.Response(status=503, text="service unavailable")
+        return None
+
+    async def _synthesize(self, request: web.Request) -> web.Response:
+        self._record_connection(request)
+        payload = await request.json()
+        self.requests.append(
+            {
+                "voice_id": request.match_info["voice_id"],
+                "output_format": request.query.get("output_format"),
+                **payload,
+            }
+        )
+        failure = self._failure()
+        if failure is not None:
+            return failure
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+        finally:
+            self.active -= 1
+        return web.Response(body=self._audio(request, payload["text"]), content_type="audio/mpeg")
+
+    async def _stream(self, request: web.Request) -> web.StreamResponse:
+        self._record_connection(request)
+        payload = await request.json()
+        self.requests.append(
+            {
+                "voice_id": request.match_info["voice_id"],
+                "output_format": request.query.get("output_format"),
+                **payload,
+            }
+        )
+        failure = self._failure()
+        if failure is not None:
+            return failure
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        response = web.StreamResponse(headers={"Content-Type": "audio/mpeg"})
+        await response.prepare(request)
+        audio = self._audio(request, payload["text"])
+        for i in range(0, len(audio), self.chunk_size):
+            await response.write(audio[i : i + self.chunk_size])
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+        await response.write_eof()
+        return response
+
+    async def _stream_input(self, request: web.Request) -> web.WebSocketResponse:
+        """Speak every text message as it arrives, like the upstream with flushing."""
+        self._record_connection(request)
+        messages: List[dict] = []
+        self.input_streams.append(messages)
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        async for raw in socket:
+            message = raw.json()
+            messages.append(message)
+            text = message.get("text", "")
+            if text == "":
+                await socket.send_json({"audio": None, "isFinal": True})
+                break
+            if text.strip():
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                audio = self._audio(request, text)
+                await socket.send_json({"audio": base64.b64encode(audio).decode("ascii")})
+        await socket.close()
+        return socket
+
+    async def _voices(self, request: web.Request) -> web.Response:
+        self._record_connection(request)
+        return web.json_response({"voices": [{"voice_id": "voice1", "name": "Voice 1"}]})
+
+    async def _models(self, request: web.Request) -> web.Response:
+        self._record_connection(request)
+        return web.json_response([{"model_id": "model1", "name": "Model 1"}])
@@ -0,0 +1,138 @@
+"""
+Unit tests for the audio cache and the cached synthesis paths.
+"""
+
+import pytest
+from src.backend import tts_service
+from src.backend.audio_cache import AudioCache, make_cache_key
+from src.backend.elevenlabs_client import ElevenLabsClient
+
+
+class TestAudioCache:
+    def test_key_normalizes_whitespace(self):
+        """Test that whitespace differences map to the same key."""
+        assert make_cache_key("Tests  passed\n", "v", "m", "mp3") == make_cache_key(
+            "Tests passed", "v", "m", "mp3"
+        )
+        assert make_cache_key("Done.", "v", "m", "mp3") != make_cache_key(
+            "Done.", "v", "m", "pcm_16000"
+        )
+
+    @pytest.mark.asyncio
+    async def test_memory_tier_is_bounded_by_bytes(self):
+        """Test that the least recently used clip is evicted first."""
+        cache = AudioCache(max_memory_bytes=10)
+        await cache.put("a", b"aaaa")
+        await cache.put("b", b"bbbb")
+        assert await cache.get("a") == b"aaaa"
+
+        await cache.put("c", b"cccc")
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == b"aaaa"
+        stats = cache.stats()
+        assert stats["memory_evictions"] == 1
+        assert stats["memory_bytes"] == 8
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_memory_eviction(self, tmp_path):
+        """Test that clips evicted from memory are served from disk."""
+        cache = AudioCache(max_memory_bytes=4, disk_dir=tmp_path, max_disk_bytes=100)
+        await cache.put("a", b"aaaa")
+        await cache.put("b", b"bbbb")
+
+        assert await cache.get("a") == b"aaaa"
+        # A new cache instance picks up the clips already on disk
+        assert AudioCache(disk_dir=tmp_path).stats()["disk_entries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_is_bounded_by_bytes(self, tmp_path):
+        """Test that the oldest clips are removed from disk when over budget."""
+        cache = AudioCache(max_memory_bytes=0, disk_dir=tmp_path, max_disk_bytes=8)
+        for key in ("a", "b", "c"):
+            await cache.put(key, key.encode() * 4)
+
+        assert await cache.get("a") is None
+        assert await cache.get("c") == b"cccc"
+        assert cache.stats()["disk_evictions"] == 1
+        assert len(list(tmp_path.glob("*.audio"))) == 2
+
+
+class TestDiskStore:
+    @pytest.mark.asyncio
+    async def test_index_keeps_lru_order_across_restarts(self, tmp_path):
+        """Test that the eviction order is restored from the index."""
+        cache = AudioCache(max_memory_bytes=0, disk_dir=tmp_path, max_disk_bytes=12)
+        for key in ("a", "b", "c"):
+            await cache.put(key, key.encode() * 4)
+        assert cache.path("a") is not None
+        await cache.flush()
+
+        restarted = AudioCache(max_memory_bytes=0, disk_dir=tmp_path, max_disk_bytes=12)
+        await restarted.put("d", b"dddd")
+
+        assert restarted.path("b") is None
+        assert restarted.path("a") is not None
+        await restarted.flush()
+
+    @pytest.mark.asyncio
+    async def test_corrupt_clips_are_removed_on_startup(self, tmp_path):
+        """Test that clips that no longer match the index are dropped."""
+        cache = AudioCache(disk_dir=tmp_path)
+        await cache.put("a", b"aaaa")
+        await cache.put("b", b"bbbb")
+        await cache.flush()
+        (tmp_path / "a.audio").write_bytes(b"aaa")
+        (tmp_path / "b.audio").write_bytes(b"xxxx")
+
+        assert AudioCache(disk_dir=tmp_path).stats()["disk_entries"] == 1
+        restarted = AudioCache(disk_dir=tmp_path, verify="hash")
+        assert restarted.stats()["disk_entries"] == 0
+        assert restarted.stats()["disk_corrupt"] == 1
+        assert not list(tmp_path.glob("*.audio"))
+
+    def test_unindexed_clips_are_adopted(self, tmp_path):
+        """Test that clips copied into the directory, e.g. in an image, are picked up."""
+        (tmp_path / "a.audio").write_bytes(b"aaaa")
+        (tmp_path / "b.1.tmp").write_bytes(b"partial")
+
+        cache = AudioCache(disk_dir=tmp_path, verify="hash")
+
+        assert cache.path("a") == tmp_path / "a.audio"
+        assert not list(tmp_path.glob("*.tmp"))
+        assert AudioCache(disk_dir=tmp_path, verify="hash").stats()["disk_corrupt"] == 0
+
+
+class TestCachedSynthesis:
+    @pytest.mark.asyncio
+    async def test_repeated_phrase_hits_cache(self, fake_upstream, monkeypatch):
+        """Test that a repeated phrase is only synthesized upstream once."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+        cache = AudioCache()
+
+        first = await tts_service.synthesize(client, "Done.", "voice1", cache=cache)
+        second = await tts_service.synthesize(client, "Done. ", "voice1", cache=cache)
+
+        assert first == second == fake_upstream.audio_for("Done.")
+        assert len(fake_upstream.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_stream_fills_and_uses_cache(self, fake_upstream, monkeypatch):
+        """Test that a streamed clip is cached and later streamed from the cache."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+        cache = AudioCache()
+
+        streamed = [
+            c async for c in tts_service.synthesize_stream(client, "Hi", "voice1", cache=cache)
+        ]
+        cached = [
+            c async for c in tts_service.synthesize_stream(client, "Hi", "voice1", cache=cache)
+        ]
+
+        assert b"".join(streamed) == b"".join(cached) == fake_upstream.audio_for("Hi")
+        assert len(fake_upstream.requests) == 1
+        assert cache.stats()["hits"] == 1
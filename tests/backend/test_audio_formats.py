@@ -0,0 +1,130 @@
+"""
+Unit tests for selectable output formats.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from src.backend import routes, tts_service
+from src.backend.audio_cache import AudioCache
+from src.backend.audio_formats import align_frames, validate_output_format
+from src.backend.elevenlabs_client import ElevenLabsClient
+from src.backend.websocket import WebSocketManager
+
+from .test_websocket import FakeWebSocket
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+@pytest_asyncio.fixture
+async def manager():
+    manager = WebSocketManager()
+    yield manager
+    await manager.shutdown()
+
+
+class TestFormats:
+    def test_validate(self):
+        """Test that formats default to MP3 and unknown ones are rejected."""
+        assert validate_output_format(None) == "mp3_44100_128"
+        assert validate_output_format("pcm_16000") == "pcm_16000"
+        with pytest.raises(ValueError):
+            validate_output_format("wav")
+
+    @pytest.mark.asyncio
+    async def test_align_frames(self):
+        """Test that PCM chunks are cut on sample boundaries."""
+        aligned = [c async for c in align_frames(chunks(b"abc", b"d", b"efg", b"h"))]
+        assert aligned == [b"ab", b"cd", b"ef", b"gh"]
+
+
+class TestFormatSynthesis:
+    @pytest.mark.asyncio
+    async def test_formats_are_cached_separately(self, fake_upstream, monkeypatch):
+        """Test that the format is sent upstream and is part of the cache key."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.chunk_size = 3
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+        cache = AudioCache()
+
+        mp3 = await tts_service.synthesize(client, "Hi", "voice1", cache=cache)
+        pcm = [
+            c
+            async for c in tts_service.synthesize_stream(
+                client, "Hi", "voice1", cache=cache, output_format="pcm_16000"
+            )
+        ]
+
+        assert mp3 == fake_upstream.audio_for("Hi")
+        assert b"".join(pcm) == fake_upstream.audio_for("Hi", "pcm_16000")
+        assert all(len(c) % 2 == 0 for c in pcm[:-1])
+        assert [r["output_format"] for r in fake_upstream.requests] == [
+            "mp3_44100_128",
+            "pcm_16000",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_stream_route_content_type(self, fake_upstream, monkeypatch):
+        """Test that the response content type follows the format."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        monkeypatch.setattr(routes, "client", ElevenLabsClient(base_url=fake_upstream.base_url))
+        monkeypatch.setattr(tts_service, "audio_cache", AudioCache())
+        app = FastAPI()
+        app.include_router(routes.router)
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as http:
+            pcm = await http.post(
+                "/api/v1/tts/stream",
+                json={"text": "Hi", "voice_id": "voice1", "output_format": "pcm_24000"},
+            )
+            invalid = await http.post(
+                "/api/v1/tts/stream",
+                json={"text": "Hi", "voice_id": "voice1", "output_format": "wav"},
+            )
+
+        assert pcm.headers["content-type"] == "audio/pcm;rate=24000"
+        assert pcm.content == fake_upstream.audio_for("Hi", "pcm_24000")
+        assert invalid.status_code == 400
+
+
+class TestFormatSubscriptions:
+    @pytest.mark.asyncio
+    async def test_clients_receive_their_format(self, manager):
+        """Test that subscribed clients only get clips in their format."""
+        default, pcm = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(default)
+        await manager.connect(pcm, output_format="pcm_16000")
+        assert manager.audio_formats("mp3_44100_128") == ["mp3_44100_128", "pcm_16000"]
+
+        rendered = []
+
+        async def render(fmt):
+            rendered.append(fmt)
+            return fmt.encode()
+
+        await manager.broadcast_clip(
+            {"type": "audio_data", "clip_id": "c"}, render, "mp3_44100_128"
+        )
+        await asyncio.sleep(0.01)
+
+        assert rendered == ["mp3_44100_128", "pcm_16000"]
+        assert [m["output_format"] for m in default.sent] == ["mp3_44100_128"]
+        assert [m["output_format"] for m in pcm.sent] == ["pcm_16000"]
+
+    @pytest.mark.asyncio
+    async def test_unknown_format_is_ignored(self, manager):
+        """Test that an unsupported subscription leaves the client on the default."""
+        websocket = FakeWebSocket()
+        await manager.connect(websocket)
+
+        assert manager.set_output_format(websocket, "wav") is None
+        assert manager.set_output_format(websocket, "opus_48000_64") == "opus_48000_64"
+        assert manager.listener_formats() == {"opus_48000_64"}
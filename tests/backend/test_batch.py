@@ -0,0 +1,116 @@
+"""
+Unit tests for batch pre-rendering.
+"""
+
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from src.backend import routes, tts_service
+from src.backend.audio_cache import AudioCache, make_cache_key
+from src.backend.elevenlabs_client import DEFAULT_OUTPUT_FORMAT, ElevenLabsClient
+
+
+@pytest.fixture
+def batch_app(fake_upstream, monkeypatch):
+    """The API routes talking to the fake upstream with an empty cache."""
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+    cache = AudioCache()
+    monkeypatch.setattr(routes, "client", ElevenLabsClient(base_url=fake_upstream.base_url))
+    monkeypatch.setattr(tts_service, "audio_cache", cache)
+    app = FastAPI()
+    app.include_router(routes.router)
+    return app, cache
+
+
+async def post_batch(app, body):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        response = await http.post("/api/v1/tts/batch", json=body)
+    return response, [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestSynthesizeBatch:
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, fake_upstream, monkeypatch):
+        """Test that no more than the requested number of items render at once."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.latency = 0.02
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+        items = [(f"Prompt {i}", "voice1", None) for i in range(8)]
+
+        results = [
+            result
+            async for result in tts_service.synthesize_batch(
+                client, items, concurrency=2, cache=AudioCache()
+            )
+        ]
+
+        assert sorted(index for index, _, _ in results) == list(range(8))
+        assert fake_upstream.max_active == 2
+
+
+class TestBatchEndpoint:
+    @pytest.mark.asyncio
+    async def test_items_are_cached_with_progress(self, batch_app, fake_upstream):
+        """Test that results stream as NDJSON and land in the cache."""
+        app, cache = batch_app
+        response, lines = await post_batch(
+            app,
+            {"items": [{"id": "a", "text": "Welcome."}, {"id": "b", "text": "Goodbye."}]},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        items, summary = lines[:-1], lines[-1]
+        assert {item["id"] for item in items} == {"a", "b"}
+        assert [item["completed"] for item in items] == [1, 2]
+        assert all(item["status"] == "ok" and "data" not in item for item in items)
+        assert summary["succeeded"] == 2 and summary["failed"] == 0
+
+        config = routes.config_store.snapshot()
+        key = make_cache_key(
+            "Welcome.",
+            config["default_voice_id"],
+            config["default_model_id"],
+            DEFAULT_OUTPUT_FORMAT,
+        )
+        assert await cache.get(key) == fake_upstream.audio_for("Welcome.")
+
+    @pytest.mark.asyncio
+    async def test_item_errors_do_not_abort_batch(self, batch_app, fake_upstream, monkeypatch):
+        """Test that a failing item is reported while the others succeed."""
+        monkeypatch.setattr("src.backend.elevenlabs_client.UPSTREAM_MAX_RETRIES", 0)
+        fake_upstream.failures = [(400, {})]
+        app, _ = batch_app
+
+        _, lines = await post_batch(
+            app, {"items": [{"text": "One."}, {"text": "Two."}], "concurrency": 1}
+        )
+
+        statuses = sorted(line["status"] for line in lines[:-1])
+        assert statuses == ["error", "ok"]
+        assert lines[-1]["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_audio_returned_only_when_asked(self, batch_app, fake_upstream, monkeypatch):
+        """Test that return_audio includes the clip and nothing is broadcast by default."""
+        broadcasts = []
+
+        async def record(header, audio):
+            broadcasts.append(header)
+
+        monkeypatch.setattr(routes.manager, "broadcast_audio", record)
+        app, _ = batch_app
+
+        _, lines = await post_batch(app, {"items": [{"text": "Hi."}], "return_audio": True})
+
+        assert lines[0]["data"]
+        assert broadcasts == []
+
+    @pytest.mark.asyncio
+    async def test_empty_batch_is_rejected(self, batch_app):
+        app, _ = batch_app
+        response, _ = await post_batch(app, {"items": []})
+        assert response.status_code == 400
@@ -0,0 +1,199 @@
+"""
+Unit tests for the cross-instance broadcast bus.
+"""
+
+import asyncio
+from uuid import uuid4
+
+import anyio
+import httpx
+import pytest
+import pytest_asyncio
+from src.backend.broadcast_bus import (
+    RedisBroadcastBus,
+    create_bus,
+    decode_bus_message,
+    encode_bus_message,
+)
+from mcp.server.sse import SseServerTransport
+from src.backend.mcp_sessions import McpMessageRouter
+from src.backend.websocket import WebSocketManager
+
+from .test_websocket import FakeWebSocket
+
+
+@pytest_asyncio.fixture
+async def instances(pubsub_broker):
+    """Two managers sharing one broker, as two ECS tasks would."""
+    managers = [
+        WebSocketManager(bus=RedisBroadcastBus(pubsub_broker.url, reconnect_delay=0.05))
+        for _ in range(2)
+    ]
+    for manager in managers:
+        await manager.start()
+        await asyncio.wait_for(manager.bus.wait_subscribed(), timeout=1.0)
+    yield managers
+    for manager in managers:
+        await manager.shutdown()
+
+
+async def wait_for(condition, timeout: float = 1.0):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout=timeout)
+
+
+class TestBusMessages:
+    def test_round_trip_with_audio(self):
+        """Test that audio survives encoding, including newlines in the payload."""
+        payload = encode_bus_message("node", "audio", {"type": "audio_chunk"}, b"a\nb\x00")
+        message = decode_bus_message(payload)
+        assert message.origin == "node"
+        assert message.kind == "audio"
+        assert message.message == {"type": "audio_chunk"}
+        assert message.audio == b"a\nb\x00"
+
+    def test_round_trip_without_audio(self):
+        """Test that plain messages carry no audio."""
+        message = decode_bus_message(encode_bus_message("node", "broadcast", {"a": 1}, None))
+        assert message.audio is None
+
+    def test_default_backend_is_in_process(self):
+        """Test that the local backend is used unless a broker is configured."""
+        assert not create_bus("local").distributed
+        assert not create_bus("unknown").distributed
+
+
+class TestCrossInstanceBroadcast:
+    @pytest.mark.asyncio
+    async def test_broadcast_reaches_other_instance(self, instances):
+        """Test that a broadcast on one instance reaches sockets on another."""
+        a, b = instances
+        local, remote = FakeWebSocket(), FakeWebSocket()
+        await a.connect(local)
+        await b.connect(remote)
+
+        await a.broadcast_to_clients({"type": "tts_result"})
+        await wait_for(lambda: remote.sent)
+        await asyncio.sleep(0.05)
+
+        assert local.sent == [{"type": "tts_result"}]
+        assert remote.sent == [{"type": "tts_result"}]
+
+    @pytest.mark.asyncio
+    async def test_audio_uses_remote_client_protocol(self, instances):
+        """Test that remote instances encode audio for their own clients."""
+        a, b = instances
+        remote = FakeWebSocket()
+        await b.connect(remote, protocol="binary")
+
+        await a.broadcast_audio({"type": "audio_data", "clip_id": "c"}, b"\x00audio\n")
+        await wait_for(lambda: len(remote.sent) == 2)
+
+        assert remote.sent[0]["size"] == 7
+        assert remote.sent[1] == b"\x00audio\n"
+
+    @pytest.mark.asyncio
+    async def test_mcp_message_reaches_mcp_on_other_instance(self, instances):
+        """Test that MCP messages are routed to the instance holding the MCP connection."""
+        a, b = instances
+        mcp = FakeWebSocket()
+        await b.connect(mcp)
+        b.mcp_connection = mcp
+
+        await a.send_to_mcp({"type": "tts_request", "text": "hi"})
+        await wait_for(lambda: mcp.sent)
+
+        assert mcp.sent == [{"type": "tts_request", "text": "hi"}]
+
+    @pytest.mark.asyncio
+    async def test_broadcast_does_not_wait_for_broker(self):
+        """Test that publishing returns immediately when the broker is unreachable."""
+        bus = RedisBroadcastBus("redis://127.0.0.1:1/0", queue_size=2, reconnect_delay=0.05)
+        manager = WebSocketManager(bus=bus)
+        await manager.start()
+        client = FakeWebSocket()
+        await manager.connect(client)
+
+        for _ in range(3):
+            await asyncio.wait_for(manager.broadcast_to_clients({"type": "ping"}), timeout=0.1)
+        await asyncio.sleep(0.01)
+
+        assert len(client.sent) == 3
+        assert bus.dropped >= 1
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_subscribed_formats_are_shared(self, instances):
+        """Test that formats chosen by remote clients are rendered locally too."""
+        a, b = instances
+        remote = FakeWebSocket()
+        await b.connect(remote, output_format="pcm_16000")
+        await wait_for(lambda: a.listener_formats() == {"pcm_16000"})
+
+        b.disconnect(remote)
+        await wait_for(lambda: not a.listener_formats())
+
+    @pytest.mark.asyncio
+    async def test_remote_formats_keep_their_channel(self, instances):
+        """Test that a remote client's format is only rendered for its channel."""
+        a, b = instances
+        await b.connect(FakeWebSocket(), output_format="pcm_16000", channel="alice")
+        await wait_for(lambda: a.listener_formats("alice") == {"pcm_16000"})
+
+        assert a.listener_formats("bob") == set()
+
+    @pytest.mark.asyncio
+    async def test_playback_commands_reach_other_instances(self, instances):
+        """Test that interrupting on one instance cancels the clips playing on another."""
+        a, b = instances
+
+        async def play(clip):
+            await asyncio.sleep(10)
+
+        clip = await b.playback.enqueue(play)
+        await a.playback.command("interrupt")
+
+        assert await asyncio.wait_for(clip.wait(), timeout=1.0) == "cancelled"
+
+
+class TestCrossInstanceMcp:
+    @pytest.mark.asyncio
+    async def test_mcp_status_is_shared(self, instances):
+        """Test that every instance reports an MCP connected to another one."""
+        a, b = instances
+        mcp = FakeWebSocket()
+        await b.connect(mcp)
+        await b.register_mcp(mcp)
+        await wait_for(lambda: a.mcp_connected)
+
+        b.disconnect(mcp)
+        await wait_for(lambda: not a.mcp_connected)
+        assert not b.mcp_connected
+
+    @pytest.mark.asyncio
+    async def test_sse_post_reaches_session_on_other_instance(self, instances):
+        """Test that an MCP post is forwarded to the instance holding the SSE session."""
+        a, b = instances
+        router_a = McpMessageRouter(SseServerTransport("/messages/"), a)
+        router_b = McpMessageRouter(SseServerTransport("/messages/"), b)
+        session_id = uuid4()
+        writer, reader = anyio.create_memory_object_stream(1)
+        router_b.transport._read_stream_writers[session_id] = writer
+
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=router_a), base_url="http://test"
+        ) as client:
+            response = await client.post(
+                f"/?session_id={session_id.hex}",
+                json={"jsonrpc": "2.0", "id": 1, "method": "ping"},
+            )
+
+        assert response.status_code == 202
+        with anyio.fail_after(1.0):
+            message = await reader.receive()
+        assert message.root.method == "ping"
+        assert router_a.forwarded == 1
+        assert router_b.received == 1
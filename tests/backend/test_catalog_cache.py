@@ -0,0 +1,81 @@
+"""
+Unit tests for the voice/model catalog cache.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.backend import routes
+from src.backend.catalog_cache import CatalogCache
+from src.backend.elevenlabs_client import ElevenLabsClient
+
+
+class TestCatalogCache:
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_fetch(self):
+        """Test that a burst of reads triggers a single upstream fetch."""
+        cache = CatalogCache(ttl=60)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return ["voice1"]
+
+        entries = await asyncio.gather(*(cache.get("voices", fetch) for _ in range(20)))
+
+        assert calls == 1
+        assert all(entry.value == ["voice1"] for entry in entries)
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_while_refreshing(self):
+        """Test that an expired entry is returned immediately and refreshed behind it."""
+        cache = CatalogCache(ttl=0, stale_ttl=60)
+        versions = iter(["old", "new"])
+
+        async def fetch():
+            return next(versions)
+
+        assert (await cache.get("models", fetch)).value == "old"
+        assert (await cache.get("models", fetch)).value == "old"
+        await asyncio.sleep(0)
+        assert (await cache.get("models", fetch)).value == "new"
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_entry(self):
+        """Test that a failing background refresh does not drop the cached value."""
+        cache = CatalogCache(ttl=0, stale_ttl=60)
+        results = iter([["voice1"], RuntimeError("upstream down")])
+
+        async def fetch():
+            result = next(results)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        await cache.get("voices", fetch)
+        assert (await cache.get("voices", fetch)).value == ["voice1"]
+        await asyncio.sleep(0)
+        assert (await cache.get("voices", fetch)).value == ["voice1"]
+
+
+class TestCatalogRoutes:
+    def test_etag_revalidation(self, monkeypatch):
+        """Test that a matching If-None-Match returns 304 without a body."""
+        monkeypatch.setattr(routes, "client", ElevenLabsClient(test_mode=True))
+        monkeypatch.setattr(routes, "catalog_cache", CatalogCache())
+        app = FastAPI()
+        app.include_router(routes.router)
+        http = TestClient(app)
+
+        response = http.get("/api/v1/voices")
+        assert response.status_code == 200
+        assert response.json()[0] == {"voice_id": "mock_voice_1", "name": "Mock Voice 1"}
+
+        etag = response.headers["etag"]
+        response = http.get("/api/v1/voices", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
@@ -0,0 +1,78 @@
+"""
+Unit tests for the in-memory config store.
+"""
+
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from src.backend.config_store import ConfigStore
+
+
+@pytest.fixture
+def store(temp_config_dir):
+    return ConfigStore(temp_config_dir / "config.json", {"default_voice_id": "default"})
+
+
+class TestConfigStore:
+    def test_snapshot_is_immutable(self, store):
+        """Test that snapshots cannot be modified by readers."""
+        snapshot = store.snapshot()
+
+        assert snapshot["default_voice_id"] == "voice1"
+        with pytest.raises(TypeError):
+            snapshot["default_voice_id"] = "voice2"
+        with pytest.raises(TypeError):
+            snapshot["settings"]["auto_play"] = False
+
+    def test_reads_are_served_from_memory(self, store):
+        """Test that repeated reads do not reopen the file."""
+        store.snapshot()
+
+        with patch("builtins.open") as mock_open:
+            for _ in range(100):
+                store.snapshot()
+
+        mock_open.assert_not_called()
+
+    def test_external_edit_is_picked_up(self, store, temp_config_dir):
+        """Test that an edit made by another process is reloaded via mtime."""
+        store.check_interval = 0
+        store.snapshot()
+
+        config_file = temp_config_dir / "config.json"
+        config = json.loads(config_file.read_text())
+        config["default_voice_id"] = "voice2"
+        config_file.write_text(json.dumps(config))
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert store.snapshot()["default_voice_id"] == "voice2"
+
+    def test_missing_file_is_created_with_default(self, tmp_path):
+        """Test that the default configuration is written on first read."""
+        store = ConfigStore(tmp_path / "config.json", {"default_voice_id": "default"})
+
+        assert store.snapshot()["default_voice_id"] == "default"
+        assert json.loads((tmp_path / "config.json").read_text()) == {"default_voice_id": "default"}
+
+    @pytest.mark.asyncio
+    async def test_update_writes_atomically(self, store, temp_config_dir):
+        """Test that updates replace the file and the snapshot together."""
+        config = store.load()
+        config["default_voice_id"] = "voice3"
+
+        snapshot = await store.update(config)
+
+        assert snapshot["default_voice_id"] == "voice3"
+        assert store.snapshot()["default_voice_id"] == "voice3"
+        assert json.loads((temp_config_dir / "config.json").read_text()) == config
+        assert [p.name for p in temp_config_dir.iterdir()] == ["config.json"]
+
+    def test_yaml_store_without_file_uses_default(self, tmp_path):
+        """Test that the app config falls back to its default without creating a file."""
+        store = ConfigStore(tmp_path / "config.yaml", {"voices": {}}, fmt="yaml", create=False)
+
+        assert dict(store.snapshot()) == {"voices": {}}
+        assert not (tmp_path / "config.yaml").exists()
@@ -0,0 +1,130 @@
+"""
+Unit tests for the ElevenLabs client against a local fake upstream.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from src.backend.elevenlabs_client import ElevenLabsClient, get_client
+
+
+class TestTextToSpeech:
+    @pytest.mark.asyncio
+    async def test_returns_upstream_audio(self, fake_upstream, monkeypatch):
+        """Test that synthesis posts the text and returns the audio body."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+
+        audio = await client.text_to_speech("Hello", "voice1", "model1")
+
+        assert audio == fake_upstream.audio_for("Hello")
+        assert fake_upstream.requests == [
+            {
+                "voice_id": "voice1",
+                "output_format": "mp3_44100_128",
+                "text": "Hello",
+                "model_id": "model1",
+            }
+        ]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_overlap(self, fake_upstream, monkeypatch):
+        """Test that concurrent syntheses overlap and the loop stays responsive."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.latency = 0.2
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+
+        # Measure the largest gap between ticks while synthesis is in flight
+        max_gap = 0.0
+        running = True
+
+        async def ticker():
+            nonlocal max_gap
+            last = time.perf_counter()
+            while running:
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                max_gap = max(max_gap, now - last)
+                last = now
+
+        ticker_task = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(client.text_to_speech(f"Phrase {i}", "voice1") for i in range(10))
+        )
+        elapsed = time.perf_counter() - started
+        running = False
+        await ticker_task
+
+        assert results == [fake_upstream.audio_for(f"Phrase {i}") for i in range(10)]
+        # Serial execution would take 10 * 0.2s
+        assert elapsed < 1.0
+        assert max_gap < 0.1
+
+
+class TestTextToSpeechStream:
+    @pytest.mark.asyncio
+    async def test_streams_all_chunks(self, fake_upstream, monkeypatch):
+        """Test that every upstream chunk is relayed in order."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+
+        chunks = [chunk async for chunk in client.text_to_speech_stream("Hello world", "voice1")]
+
+        assert b"".join(chunks) == fake_upstream.audio_for("Hello world")
+
+    @pytest.mark.asyncio
+    async def test_first_chunk_arrives_before_upstream_finishes(self, fake_upstream, monkeypatch):
+        """Test that chunks are yielded as they arrive instead of after the full clip."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.chunk_delay = 0.05
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+
+        started = time.perf_counter()
+        audio_stream = client.text_to_speech_stream("A much longer sentence", "voice1")
+        await audio_stream.__anext__()
+        time_to_first_chunk = time.perf_counter() - started
+        rest = [chunk async for chunk in audio_stream]
+        total = time.perf_counter() - started
+
+        assert rest
+        assert time_to_first_chunk < total / 2
+
+    @pytest.mark.asyncio
+    async def test_upstream_error_is_raised(self, fake_upstream, monkeypatch):
+        """Test that a failing upstream surfaces as an HTTPException."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        client = ElevenLabsClient(base_url=fake_upstream.base_url + "/missing")
+
+        with pytest.raises(HTTPException) as exc_info:
+            async for _ in client.text_to_speech_stream("Hello", "voice1"):
+                pass
+        assert exc_info.value.status_code == 404
+
+
+class TestConnectionPool:
+    @pytest.mark.asyncio
+    async def test_calls_share_one_connection(self, fake_upstream, monkeypatch):
+        """Test that sequential upstream calls reuse a kept-alive connection."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+        await client.start()
+
+        await client.get_voices()
+        await client.get_models()
+        await client.text_to_speech("Hello", "voice1")
+        async for _ in client.text_to_speech_stream("Hello", "voice1"):
+            pass
+        await client.aclose()
+
+        assert len(fake_upstream.connections) == 1
+
+    def test_get_client_is_shared(self, monkeypatch):
+        """Test that the routes and MCP tools use the same client."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        from src.backend import routes
+
+        assert get_client() is get_client()
+        assert routes.client is get_client()
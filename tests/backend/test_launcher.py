@@ -0,0 +1,62 @@
+"""
+Unit tests for the production launcher.
+"""
+
+import os
+
+import pytest
+from src.backend.__main__ import prepare_workers, server_options
+
+
+@pytest.fixture
+def env(monkeypatch):
+    for name in (
+        "WORKERS",
+        "RELOAD",
+        "BROADCAST_BACKEND",
+        "BROADCAST_URL",
+        "UPSTREAM_MAX_CONCURRENCY",
+        "UPSTREAM_CHARS_PER_SECOND",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    return monkeypatch
+
+
+class TestServerOptions:
+    def test_reload_forces_single_worker(self, env):
+        """Test that development reload never starts several workers."""
+        env.setenv("WORKERS", "4")
+        options = server_options()
+        assert options["reload"] is True
+        assert options["workers"] == 1
+
+    def test_production_workers(self, env):
+        """Test that the worker count is used when reload is off."""
+        env.setenv("WORKERS", "4")
+        env.setenv("RELOAD", "false")
+        options = server_options()
+        assert options["reload"] is False
+        assert options["workers"] == 4
+
+
+class TestPrepareWorkers:
+    def test_single_worker_keeps_environment(self, env):
+        """Test that a single worker needs no broker."""
+        prepare_workers(1)
+        assert "BROADCAST_URL" not in os.environ
+
+    def test_workers_share_local_broker_and_limits(self, env):
+        """Test that workers get a broker and a share of the upstream limits."""
+        prepare_workers(2)
+        assert os.environ["BROADCAST_BACKEND"] == "redis"
+        assert os.environ["BROADCAST_URL"].startswith("redis://127.0.0.1:")
+        assert os.environ["UPSTREAM_MAX_CONCURRENCY"] == "2"
+        assert "UPSTREAM_CHARS_PER_SECOND" not in os.environ
+
+    def test_configured_broker_is_kept(self, env):
+        """Test that an external broker is not replaced."""
+        env.setenv("BROADCAST_BACKEND", "redis")
+        env.setenv("BROADCAST_URL", "redis://broker:6379/0")
+        prepare_workers(3)
+        assert os.environ["BROADCAST_URL"] == "redis://broker:6379/0"
+        assert os.environ["UPSTREAM_MAX_CONCURRENCY"] == "1"
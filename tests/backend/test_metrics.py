@@ -0,0 +1,64 @@
+"""
+Unit tests for the metrics registry and the /metrics endpoint.
+"""
+
+import httpx
+import pytest
+from src.backend.metrics import MetricsRegistry, gauge
+
+
+class TestRegistry:
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that observations land in every bucket at or above their value."""
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        child = latency.labels("/tts")
+        for value in (0.05, 0.1, 0.5, 3.0):
+            child.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{route="/tts",le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{route="/tts",le="1"} 3' in text
+        assert 'latency_seconds_bucket{route="/tts",le="+Inf"} 4' in text
+        assert 'latency_seconds_count{route="/tts"} 4' in text
+        assert 'latency_seconds_sum{route="/tts"} 3.65' in text
+
+    def test_counter_and_collector_format(self):
+        """Test the exposition format of counters and scrape-time collectors."""
+        registry = MetricsRegistry()
+        registry.counter("sent_bytes", "Bytes sent").inc(10)
+        registry.collector("connections", "Open connections", "gauge", lambda: [gauge(3)])
+
+        text = registry.render()
+
+        assert "# TYPE sent_bytes counter\nsent_bytes_total 10" in text
+        assert "# TYPE connections gauge\nconnections 3" in text
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("errors", "Errors", ("message",)).labels('say "hi"\n').inc()
+        assert 'errors_total{message="say \\"hi\\"\\n"} 1' in registry.render()
+
+    def test_wrong_label_count_is_rejected(self):
+        registry = MetricsRegistry()
+        with pytest.raises(ValueError):
+            registry.counter("errors", "Errors", ("code",)).labels()
+
+
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_requests_are_timed_by_route(self):
+        """Test that /metrics reports request latency labelled by route template."""
+        from src.backend.app import app
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            await http.get("/health")
+            response = await http.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'route="/health",status="200"' in response.text
+        assert "jessica_websocket_connections" in response.text
+        assert 'jessica_audio_cache_lookups_total{result="hit"}' in response.text
@@ -0,0 +1,95 @@
+"""
+Unit tests for the ASGI path rewriting and access log middleware.
+"""
+
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from src.backend.middleware import AccessLogMiddleware, RootPathMiddleware
+
+
+def build_app(root_path: str = "/jessica-service", sample_rate: float = 1.0) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/echo")
+    async def echo():
+        return {"ok": True}
+
+    @app.get("/api/v1/fail")
+    async def fail():
+        raise RuntimeError("boom")
+
+    @app.get("/api/v1/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk{i}".encode()
+
+        return StreamingResponse(chunks())
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket):
+        await websocket.accept()
+        await websocket.send_text("hello")
+        await websocket.close()
+
+    app.add_middleware(RootPathMiddleware, root_path=root_path)
+    app.add_middleware(AccessLogMiddleware, sample_rate=sample_rate)
+    return app
+
+
+class TestRootPathMiddleware:
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/api/v1/echo",
+            "/jessica-service/api/v1/echo",
+            "/jessica-service/jessica-service/api/v1/echo",
+        ],
+    )
+    def test_prefixes_are_stripped(self, path):
+        """Test that direct, prefixed and double-prefixed paths reach the route."""
+        client = TestClient(build_app())
+        assert client.get(path).json() == {"ok": True}
+
+    def test_rewrite_without_root_path_is_noop(self):
+        assert RootPathMiddleware(None, "").rewrite("/api/v1/echo") is None
+
+    def test_websocket_paths_are_rewritten(self):
+        """Test that WebSocket connections are rewritten too."""
+        client = TestClient(build_app())
+        with client.websocket_connect("/jessica-service/ws") as websocket:
+            assert websocket.receive_text() == "hello"
+
+
+class TestAccessLogMiddleware:
+    def test_one_structured_line_per_request(self, caplog):
+        client = TestClient(build_app())
+        with caplog.at_level(logging.INFO, logger="src.backend.middleware"):
+            client.get("/jessica-service/api/v1/echo")
+
+        lines = [r.getMessage() for r in caplog.records if r.name == "src.backend.middleware"]
+        assert len(lines) == 1
+        assert "path=/jessica-service/api/v1/echo status=200" in lines[0]
+
+    def test_sampling_skips_successes_but_not_errors(self, caplog):
+        """Test that sampled-out requests are not logged while server errors always are."""
+        client = TestClient(build_app(sample_rate=0.0), raise_server_exceptions=False)
+        with caplog.at_level(logging.INFO, logger="src.backend.middleware"):
+            client.get("/api/v1/echo")
+            client.get("/api/v1/fail")
+
+        lines = [r.getMessage() for r in caplog.records if r.name == "src.backend.middleware"]
+        assert len(lines) == 1
+        assert "status=500" in lines[0]
+
+    @pytest.mark.asyncio
+    async def test_streaming_response_passes_through(self):
+        transport = httpx.ASGITransport(app=build_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            response = await http.get("/api/v1/stream")
+        assert response.content == b"chunk0chunk1chunk2"
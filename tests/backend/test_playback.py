@@ -0,0 +1,182 @@
+"""
+Unit tests for the playback queue.
+"""
+
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from src.backend import tts_service
+from src.backend.audio_cache import AudioCache
+from src.backend.elevenlabs_client import ElevenLabsClient
+from src.backend.playback import ClipCancelled, PlaybackError
+from src.backend.single_flight import synthesis_flights
+from src.backend.websocket import WebSocketManager
+
+from .test_websocket import FakeWebSocket
+
+FORMAT = "mp3_44100_128"
+
+
+@pytest_asyncio.fixture
+async def manager():
+    manager = WebSocketManager()
+    yield manager
+    await manager.shutdown()
+
+
+@pytest.fixture
+def client(fake_upstream, monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+    monkeypatch.setattr("src.backend.tts_service.audio_cache", AudioCache())
+    return ElevenLabsClient(base_url=fake_upstream.base_url)
+
+
+async def speak(manager, client, text, interrupt=False):
+    return await manager.playback.play_stream(
+        text,
+        "voice1",
+        lambda: {
+            FORMAT: tts_service.synthesize_stream(
+                client, text, "voice1", output_format=FORMAT, cancellable=True
+            )
+        },
+        FORMAT,
+        interrupt,
+    )
+
+
+def _messages(listener, message_type):
+    return [m for m in listener.sent if isinstance(m, dict) and m["type"] == message_type]
+
+
+class TestPlaybackOrder:
+    @pytest.mark.asyncio
+    async def test_clips_play_one_after_the_other(self, manager, client, fake_upstream):
+        """Test that a clip starts only after the previous one has been sent."""
+        fake_upstream.chunk_delay = 0.01
+        listener = FakeWebSocket()
+        await manager.connect(listener)
+
+        first = await speak(manager, client, "First clip.")
+        second = await speak(manager, client, "Second clip.")
+        assert manager.playback.state() == {"playing": [first.id], "queued": [second.id]}
+        await manager.playback.join()
+
+        events = [
+            (m["type"], m["clip_id"])
+            for m in listener.sent
+            if m["type"] in ("audio_start", "audio_complete")
+        ]
+        assert events == [
+            ("audio_start", first.id),
+            ("audio_complete", first.id),
+            ("audio_start", second.id),
+            ("audio_complete", second.id),
+        ]
+        assert await first.wait() == await second.wait() == "done"
+
+    @pytest.mark.asyncio
+    async def test_next_clip_waits_for_playback_time(self, manager):
+        """Test that a clip stays current until its audio has had time to play."""
+        started = []
+
+        async def play(clip):
+            started.append(time.monotonic())
+            # 0.1 seconds of 16 kHz PCM
+            clip.add_audio(3200)
+
+        await manager.playback.enqueue(play, output_format="pcm_16000")
+        await manager.playback.enqueue(play, output_format="pcm_16000")
+        await manager.playback.join()
+
+        assert started[1] - started[0] >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_full_queue_refuses_clips(self, manager):
+        """Test that clips beyond the queue limit are refused."""
+        manager.playback.max_queued = 1
+
+        async def play(clip):
+            await asyncio.sleep(0.05)
+
+        await manager.playback.enqueue(play)
+        await manager.playback.enqueue(play)
+        with pytest.raises(PlaybackError):
+            await manager.playback.enqueue(play)
+
+
+class TestPlaybackCommands:
+    @pytest.mark.asyncio
+    async def test_skip_aborts_upstream_synthesis(self, manager, client, fake_upstream):
+        """Test that skipping the playing clip stops its stream and its upstream call."""
+        fake_upstream.chunk_delay = 0.05
+        listener = FakeWebSocket()
+        await manager.connect(listener, protocol="binary")
+        abandoned = synthesis_flights.stats()["abandoned"]
+
+        clip = await speak(manager, client, "A long clip that nobody wants to hear.")
+        await clip.started
+        cancelled = await manager.playback.command("skip")
+        await asyncio.sleep(0.1)
+
+        assert cancelled == [clip.id]
+        assert await clip.wait() == "cancelled"
+        assert _messages(listener, "audio_cancel") == [
+            {"type": "audio_cancel", "clip_id": clip.id, "reason": "skip", "channel": "default"}
+        ]
+        assert _messages(listener, "audio_complete") == []
+        assert synthesis_flights.stats()["abandoned"] == abandoned + 1
+        assert client.scheduler.stats()["active"] == 0
+
+    @pytest.mark.asyncio
+    async def test_clear_drops_queued_clips(self, manager, client, fake_upstream):
+        """Test that cleared clips never reach the upstream and the current one finishes."""
+        fake_upstream.chunk_delay = 0.01
+        first = await speak(manager, client, "Playing.")
+        second = await speak(manager, client, "Queued.")
+
+        assert await manager.playback.command("clear") == [second.id]
+        with pytest.raises(ClipCancelled):
+            await second.started
+        await manager.playback.join()
+
+        assert await first.wait() == "done"
+        assert [request["text"] for request in fake_upstream.requests] == ["Playing."]
+
+    @pytest.mark.asyncio
+    async def test_interrupt_replaces_everything(self, manager, client, fake_upstream):
+        """Test that an interrupting clip cancels the current and queued clips."""
+        fake_upstream.chunk_delay = 0.05
+        first = await speak(manager, client, "First, rather long clip.")
+        second = await speak(manager, client, "Second.")
+        await first.started
+
+        third = await speak(manager, client, "Urgent.", interrupt=True)
+        await manager.playback.join()
+
+        assert await first.wait() == "cancelled"
+        assert await second.wait() == "cancelled"
+        assert await third.wait() == "done"
+
+    @pytest.mark.asyncio
+    async def test_channels_have_their_own_queue(self, manager):
+        """Test that a clip in one channel neither waits for nor is cancelled with another's."""
+
+        async def play(clip):
+            await asyncio.sleep(10)
+
+        alice = await manager.queue("alice").enqueue(play)
+        bob = await manager.queue("bob").enqueue(play)
+        assert bob.state == "playing"
+
+        assert await manager.queue("alice").command("interrupt") == [alice.id]
+        assert bob.state == "playing"
+        assert manager.queue("bob").state() == {"playing": [bob.id], "queued": []}
+
+    @pytest.mark.asyncio
+    async def test_unknown_command(self, manager):
+        """Test that unknown commands are rejected."""
+        with pytest.raises(PlaybackError):
+            await manager.playback.command("rewind")
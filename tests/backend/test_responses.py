@@ -0,0 +1,123 @@
+"""
+Unit tests for serving cached audio files.
+"""
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from src.backend import routes, tts_service
+from src.backend.audio_cache import AudioCache, make_cache_key
+from src.backend.elevenlabs_client import DEFAULT_OUTPUT_FORMAT
+from src.backend.responses import AudioFileResponse, RangeNotSatisfiable, parse_range
+
+AUDIO = bytes(range(256)) * 4
+
+
+@pytest_asyncio.fixture
+async def disk_cache(tmp_path, monkeypatch):
+    """The API routes with a disk-backed cache holding one clip for "Hi"."""
+    cache = AudioCache(max_memory_bytes=0, disk_dir=tmp_path)
+    monkeypatch.setattr(tts_service, "audio_cache", cache)
+    monkeypatch.setattr(routes, "audio_cache", cache)
+    app = FastAPI()
+    app.include_router(routes.router)
+    yield app, cache, make_cache_key("Hi", "voice1", "model1", DEFAULT_OUTPUT_FORMAT)
+    await cache.flush()
+
+
+async def request(app, method, url, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        return await http.request(method, url, **kwargs)
+
+
+class TestParseRange:
+    def test_ranges(self):
+        """Test bounded, open and suffix ranges."""
+        assert parse_range("bytes=0-9", 100) == (0, 10)
+        assert parse_range("bytes=90-", 100) == (90, 100)
+        assert parse_range("bytes=-10", 100) == (90, 100)
+        assert parse_range("bytes=50-500", 100) == (50, 100)
+
+    def test_ignored_headers(self):
+        """Test that missing, malformed and multi-range headers serve the whole file."""
+        assert parse_range(None, 100) is None
+        assert parse_range("items=0-1", 100) is None
+        assert parse_range("bytes=0-1,5-6", 100) is None
+
+    def test_unsatisfiable(self):
+        """Test that ranges outside the file are rejected."""
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=100-", 100)
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range("bytes=5-2", 100)
+
+
+class TestAudioFileResponse:
+    @pytest.mark.asyncio
+    async def test_serves_whole_file_in_slices(self, tmp_path, monkeypatch):
+        """Test that a file larger than one slice arrives intact."""
+        path = tmp_path / "clip.audio"
+        path.write_bytes(AUDIO)
+        monkeypatch.setattr(AudioFileResponse, "chunk_size", 100)
+        app = FastAPI()
+        app.get("/clip")(lambda: AudioFileResponse(path))
+
+        response = await request(app, "GET", "/clip")
+
+        assert response.status_code == 200
+        assert response.content == AUDIO
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-length"] == str(len(AUDIO))
+
+    @pytest.mark.asyncio
+    async def test_range_request(self, tmp_path):
+        """Test that a byte range is served as partial content."""
+        path = tmp_path / "clip.audio"
+        path.write_bytes(AUDIO)
+        app = FastAPI()
+        app.get("/clip")(lambda: AudioFileResponse(path))
+
+        partial = await request(app, "GET", "/clip", headers={"Range": "bytes=10-19"})
+        invalid = await request(app, "GET", "/clip", headers={"Range": "bytes=5000-"})
+
+        assert partial.status_code == 206
+        assert partial.content == AUDIO[10:20]
+        assert partial.headers["content-range"] == f"bytes 10-19/{len(AUDIO)}"
+        assert invalid.status_code == 416
+        assert invalid.headers["content-range"] == f"bytes */{len(AUDIO)}"
+
+
+class TestCachedAudioRoutes:
+    @pytest.mark.asyncio
+    async def test_stream_serves_cached_file(self, disk_cache):
+        """Test that a clip on disk is served from the file with its address."""
+        app, cache, key = disk_cache
+        await cache.put(key, AUDIO)
+
+        response = await request(
+            app,
+            "POST",
+            "/api/v1/tts/stream",
+            json={"text": "Hi", "voice_id": "voice1", "model_id": "model1"},
+        )
+
+        assert response.status_code == 200
+        assert response.content == AUDIO
+        assert response.headers["content-location"] == f"/api/v1/audio/{key}"
+        assert cache.stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_audio_by_key_supports_seeking(self, disk_cache):
+        """Test that cached clips can be fetched by key with a Range header."""
+        app, cache, key = disk_cache
+        await cache.put(key, AUDIO)
+
+        response = await request(app, "GET", f"/api/v1/audio/{key}", headers={"Range": "bytes=-4"})
+        missing = await request(app, "GET", f"/api/v1/audio/{'0' * 64}")
+
+        assert response.status_code == 206
+        assert response.content == AUDIO[-4:]
+        assert "immutable" in response.headers["cache-control"]
+        assert missing.status_code == 404
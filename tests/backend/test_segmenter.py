@@ -0,0 +1,81 @@
+"""
+Unit tests for text segmentation and segmented synthesis.
+"""
+
+import time
+
+import pytest
+from src.backend import tts_service
+from src.backend.audio_cache import AudioCache
+from src.backend.elevenlabs_client import ElevenLabsClient
+from src.backend.segmenter import split_text
+
+PARAGRAPH = (
+    "The review found three issues. First, the parser drops trailing comments! "
+    "Second, the cache key ignores the model. Third, tests are missing?"
+)
+
+
+class TestSplitText:
+    def test_short_text_is_one_segment(self):
+        assert split_text("Tests passed.", 100) == ["Tests passed."]
+
+    def test_splits_at_sentence_boundaries(self):
+        segments = split_text(PARAGRAPH, 50)
+
+        assert segments == [
+            "The review found three issues.",
+            "First, the parser drops trailing comments!",
+            "Second, the cache key ignores the model.",
+            "Third, tests are missing?",
+        ]
+
+    def test_packs_short_sentences_together(self):
+        assert split_text("One. Two. Three. Four.", 10) == ["One. Two.", "Three.", "Four."]
+
+    def test_long_sentence_splits_at_clauses_then_words(self):
+        segments = split_text("alpha beta gamma, delta epsilon zeta eta theta", 12)
+
+        assert all(len(segment) <= 12 for segment in segments)
+        assert " ".join(segments) == "alpha beta gamma, delta epsilon zeta eta theta"
+
+    def test_zero_disables_segmentation(self):
+        assert split_text(PARAGRAPH, 0) == [PARAGRAPH]
+
+
+class TestSegmentedSynthesis:
+    @pytest.mark.asyncio
+    async def test_segments_render_concurrently_in_order(self, fake_upstream, monkeypatch):
+        """Test that segments overlap upstream and are joined in order."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        monkeypatch.setattr(tts_service, "TTS_SEGMENT_MAX_CHARS", 50)
+        monkeypatch.setattr(tts_service, "TTS_SEGMENT_CONCURRENCY", 4)
+        fake_upstream.latency = 0.2
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+
+        started = time.perf_counter()
+        audio = await tts_service.synthesize(client, PARAGRAPH, "voice1", cache=AudioCache())
+        elapsed = time.perf_counter() - started
+
+        expected = b"".join(fake_upstream.audio_for(s) for s in split_text(PARAGRAPH, 50))
+        assert audio == expected
+        assert len(fake_upstream.requests) == 4
+        assert elapsed < 0.6
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_first_segment_early(self, fake_upstream, monkeypatch):
+        """Test that the first segment plays while later ones are still rendering."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        monkeypatch.setattr(tts_service, "TTS_SEGMENT_MAX_CHARS", 50)
+        monkeypatch.setattr(tts_service, "TTS_SEGMENT_CONCURRENCY", 2)
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+
+        chunks = [
+            chunk
+            async for chunk in tts_service.synthesize_stream(
+                client, PARAGRAPH, "voice1", cache=AudioCache()
+            )
+        ]
+
+        expected = b"".join(fake_upstream.audio_for(s) for s in split_text(PARAGRAPH, 50))
+        assert b"".join(chunks) == expected
@@ -0,0 +1,131 @@
+"""
+Unit tests for coalescing identical in-flight syntheses.
+"""
+
+import asyncio
+
+import pytest
+from src.backend import tts_service
+from src.backend.audio_cache import AudioCache
+from src.backend.elevenlabs_client import ElevenLabsClient
+from src.backend.single_flight import SingleFlight
+
+
+async def collect(stream):
+    return b"".join([chunk async for chunk in stream])
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_error_reaches_every_subscriber(self):
+        """Test that a failed flight fails all attached requests and is forgotten."""
+        flights = SingleFlight()
+
+        async def produce():
+            yield b"partial"
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        first = flights.join("key", produce)
+        second = flights.join("key", produce)
+
+        assert first is second
+        for result in await asyncio.gather(first.result(), second.result(), return_exceptions=True):
+            assert isinstance(result, ValueError)
+        assert flights.stats() == {"inflight": 0, "started": 1, "coalesced": 1, "abandoned": 0}
+
+    @pytest.mark.asyncio
+    async def test_cancellable_subscribers_abandon_flight(self):
+        """Test that a flight is aborted when its last cancellable subscriber leaves."""
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def produce():
+            try:
+                yield b"partial"
+                await asyncio.sleep(10)
+            finally:
+                cancelled.set()
+
+        flight = flights.join("key", produce)
+        stream = flight.subscribe(cancellable=True)
+        await stream.__anext__()
+        await stream.aclose()
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert flights.stats()["abandoned"] == 1
+        assert flights.stats()["inflight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_plain_subscriber_keeps_flight(self):
+        """Test that a flight some request needs in full survives cancellable subscribers."""
+        flights = SingleFlight()
+
+        async def produce():
+            yield b"a"
+            await asyncio.sleep(0.01)
+            yield b"b"
+
+        flight = flights.join("key", produce)
+        result = asyncio.create_task(flight.result())
+        stream = flight.subscribe(cancellable=True)
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert await result == b"ab"
+        assert flights.stats()["abandoned"] == 0
+
+
+class TestCoalescedSynthesis:
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_upstream_call(self, fake_upstream, monkeypatch):
+        """Test that identical concurrent misses make a single upstream request."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.latency = 0.1
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+        cache = AudioCache()
+
+        results = await asyncio.gather(
+            *(
+                tts_service.synthesize(client, "Build finished.", "voice1", cache=cache)
+                for _ in range(5)
+            )
+        )
+
+        assert set(results) == {fake_upstream.audio_for("Build finished.")}
+        assert len(fake_upstream.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_late_stream_subscriber_replays_buffered_chunks(self, fake_upstream, monkeypatch):
+        """Test that a stream joining late gets the chunks it missed, then the rest."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.chunk_delay = 0.02
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+        cache = AudioCache()
+        text = "Deployment completed successfully."
+
+        first = tts_service.synthesize_stream(client, text, "voice1", cache=cache)
+        head = [await first.__anext__(), await first.__anext__()]
+        late = await collect(tts_service.synthesize_stream(client, text, "voice1", cache=cache))
+        rest = await collect(first)
+
+        assert b"".join(head) + rest == fake_upstream.audio_for(text)
+        assert late == fake_upstream.audio_for(text)
+        assert len(fake_upstream.requests) == 1
+
+    @pytest.mark.asyncio
+    async def test_leaving_subscriber_does_not_cancel_flight(self, fake_upstream, monkeypatch):
+        """Test that the flight keeps going when the request that started it goes away."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.chunk_delay = 0.02
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+        cache = AudioCache()
+        text = "Tests are running."
+
+        first = tts_service.synthesize_stream(client, text, "voice1", cache=cache)
+        await first.__anext__()
+        await first.aclose()
+        audio = await tts_service.synthesize(client, text, "voice1", cache=cache)
+
+        assert audio == fake_upstream.audio_for(text)
+        assert len(fake_upstream.requests) == 1
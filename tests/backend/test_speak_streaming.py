@@ -0,0 +1,81 @@
+"""
+Unit tests for the streaming mode of the speak_text MCP tool.
+"""
+
+import asyncio
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+from src.backend import mcp_tools
+from src.backend.audio_cache import AudioCache
+from src.backend.elevenlabs_client import ElevenLabsClient
+from src.backend.websocket import manager
+
+from .test_websocket import FakeWebSocket
+
+
+class TestStreamingSpeakText:
+    @pytest.mark.asyncio
+    async def test_returns_after_first_chunk(self, fake_upstream, monkeypatch):
+        """Test that the tool returns once the first chunk is out, before the clip ends."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        monkeypatch.setattr("src.backend.tts_service.audio_cache", AudioCache())
+        register = FastMCP()
+        mcp_tools.register_mcp_tools(register, test_mode=True)
+        monkeypatch.setattr(mcp_tools, "client", ElevenLabsClient(base_url=fake_upstream.base_url))
+        fake_upstream.chunk_delay = 0.05
+        listener = FakeWebSocket()
+        await manager.connect(listener, protocol="binary")
+
+        try:
+            clip_id = await mcp_tools._start_streaming("A longer paragraph", "voice1", "m")
+            await asyncio.sleep(0.01)
+
+            types = [m["type"] for m in listener.sent if isinstance(m, dict)]
+            assert types[:2] == ["audio_start", "audio_chunk"]
+            assert "audio_complete" not in types
+            assert listener.sent[0]["clip_id"] == clip_id
+
+            await manager.playback.join()
+            await asyncio.sleep(0.01)
+            audio = b"".join(m for m in listener.sent if isinstance(m, bytes))
+            assert audio == fake_upstream.audio_for("A longer paragraph")
+            assert listener.sent[-1]["type"] == "audio_complete"
+        finally:
+            await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_channel_scopes_delivery(self, fake_upstream, monkeypatch):
+        """Test that speech for a channel only reaches that channel's listeners."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        monkeypatch.setattr("src.backend.tts_service.audio_cache", AudioCache())
+        mcp_tools.register_mcp_tools(FastMCP(), test_mode=True)
+        monkeypatch.setattr(mcp_tools, "client", ElevenLabsClient(base_url=fake_upstream.base_url))
+        alice, bob = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(alice, protocol="binary", channel="alice")
+        await manager.connect(bob, protocol="binary", channel="bob")
+
+        try:
+            await mcp_tools._start_streaming("Hello", "voice1", "m", channel="alice")
+            await manager.queue("alice").join()
+            await asyncio.sleep(0.01)
+
+            audio = b"".join(m for m in alice.sent if isinstance(m, bytes))
+            assert audio == fake_upstream.audio_for("Hello")
+            assert all(m["channel"] == "alice" for m in alice.sent if isinstance(m, dict))
+            assert bob.sent == []
+        finally:
+            await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_error_before_first_chunk_is_raised(self, fake_upstream, monkeypatch):
+        """Test that an upstream failure is reported to the caller."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        monkeypatch.setattr("src.backend.tts_service.audio_cache", AudioCache())
+        mcp_tools.register_mcp_tools(FastMCP(), test_mode=True)
+        monkeypatch.setattr(
+            mcp_tools, "client", ElevenLabsClient(base_url=fake_upstream.base_url + "/missing")
+        )
+
+        with pytest.raises(Exception):
+            await mcp_tools._start_streaming("Hello", "voice1", "m")
@@ -0,0 +1,240 @@
+"""
+Unit tests for incremental text speech sessions.
+"""
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from mcp.server.fastmcp import FastMCP
+from src.backend import mcp_tools
+from src.backend.elevenlabs_client import ElevenLabsClient
+from src.backend.speech_sessions import SpeechSessionError, SpeechSessionManager
+from src.backend.websocket import WebSocketManager
+
+from .test_websocket import FakeWebSocket
+
+
+@pytest_asyncio.fixture
+async def manager():
+    manager = WebSocketManager()
+    yield manager
+    await manager.shutdown()
+
+
+@pytest.fixture
+def client(fake_upstream, monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+    return ElevenLabsClient(base_url=fake_upstream.base_url)
+
+
+def _audio(listener):
+    return b"".join(m for m in listener.sent if isinstance(m, bytes))
+
+
+async def _wait_for(condition, timeout=1.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+class TestSpeechSession:
+    @pytest.mark.asyncio
+    async def test_audio_reaches_listeners_before_end(self, manager, client, fake_upstream):
+        """Test that audio for appended text is relayed while the session is open."""
+        listener = FakeWebSocket()
+        await manager.connect(listener, protocol="binary")
+        sessions = manager.speech_sessions
+
+        session = await sessions.begin(client, "voice1", "model1")
+        await sessions.append(session.id, "Hello ", flush=True)
+        await _wait_for(lambda: _audio(listener) == fake_upstream.audio_for("Hello "))
+
+        types = [m["type"] for m in listener.sent if isinstance(m, dict)]
+        assert types == ["audio_start", "audio_chunk"]
+        assert session.id in sessions.sessions
+
+        await sessions.append(session.id, "world.")
+        await sessions.end(session.id)
+        await session.relay
+
+        assert _audio(listener) == fake_upstream.audio_for("Hello ") + fake_upstream.audio_for(
+            "world."
+        )
+        assert listener.sent[-1]["type"] == "audio_complete"
+        assert sessions.sessions == {}
+
+    @pytest.mark.asyncio
+    async def test_text_is_forwarded_in_order(self, manager, client, fake_upstream):
+        """Test the messages sent to the upstream input-streaming endpoint."""
+        sessions = manager.speech_sessions
+        session = await sessions.begin(client, "voice1", "model1")
+        for piece in ("One ", "two ", "three."):
+            await sessions.append(session.id, piece)
+        await sessions.end(session.id)
+        await session.relay
+
+        [messages] = fake_upstream.input_streams
+        assert [m["text"] for m in messages] == [" ", "One ", "two ", "three.", ""]
+        assert all(m.get("try_trigger_generation") for m in messages[1:-1])
+
+    @pytest.mark.asyncio
+    async def test_subscribed_formats_get_their_own_stream(self, manager, client, fake_upstream):
+        """Test that a listener subscribed to PCM receives the session in PCM."""
+        listener = FakeWebSocket()
+        await manager.connect(listener, protocol="binary", output_format="pcm_24000")
+        sessions = manager.speech_sessions
+
+        session = await sessions.begin(client, "voice1", "model1", "mp3_44100_128")
+        await sessions.append(session.id, "Hi")
+        await sessions.end(session.id)
+        await session.relay
+
+        assert len(fake_upstream.input_streams) == 2
+        assert _audio(listener) == fake_upstream.audio_for("Hi", "pcm_24000")
+
+    @pytest.mark.asyncio
+    async def test_append_after_end_is_rejected(self, manager, client):
+        """Test that an ended or unknown session refuses more text."""
+        sessions = manager.speech_sessions
+        session = await sessions.begin(client, "voice1", "model1")
+        await sessions.end(session.id)
+
+        with pytest.raises(SpeechSessionError):
+            await sessions.append(session.id, "late")
+        with pytest.raises(SpeechSessionError):
+            await sessions.append("missing", "text")
+        await session.relay
+
+    @pytest.mark.asyncio
+    async def test_idle_session_is_ended(self, manager, client, fake_upstream):
+        """Test that a session without new text is ended after the idle timeout."""
+        sessions = SpeechSessionManager(manager, idle_timeout=0.05)
+        session = await sessions.begin(client, "voice1", "model1")
+        await sessions.append(session.id, "Hello")
+
+        await asyncio.wait_for(session.relay, timeout=1)
+
+        assert session.ended
+        assert sessions.expired == 1
+        assert fake_upstream.input_streams[0][-1] == {"text": ""}
+
+    @pytest.mark.asyncio
+    async def test_session_limit(self, manager, client):
+        """Test that sessions beyond the limit are refused."""
+        sessions = SpeechSessionManager(manager, max_sessions=1)
+        session = await sessions.begin(client, "voice1", "model1")
+
+        with pytest.raises(SpeechSessionError):
+            await sessions.begin(client, "voice1", "model1")
+        await sessions.end(session.id)
+        await session.relay
+
+
+class TestSpeechMessages:
+    @pytest.mark.asyncio
+    async def test_websocket_message_set(self, manager, client, fake_upstream):
+        """Test speak_begin, speak_append and speak_end sent by a WebSocket client."""
+        speaker = FakeWebSocket()
+        await manager.connect(speaker)
+        sessions = manager.speech_sessions
+
+        reply = await sessions.handle_message(
+            client, {"type": "speak_begin", "voice_id": "voice1"}, owner=speaker
+        )
+        assert reply["type"] == "speak_session"
+        session_id = reply["session_id"]
+
+        reply = await sessions.handle_message(
+            client, {"type": "speak_append", "session_id": session_id, "text": "Hi"}
+        )
+        assert reply == {
+            "type": "speak_session",
+            "session_id": session_id,
+            "output_format": "mp3_44100_128",
+            "channel": "default",
+            "ended": False,
+        }
+        reply = await sessions.handle_message(
+            client, {"type": "speak_end", "session_id": session_id}
+        )
+        assert reply["ended"] is True
+
+        reply = await sessions.handle_message(
+            client, {"type": "speak_append", "session_id": session_id, "text": "again"}
+        )
+        assert reply["type"] == "error"
+        assert reply["request"] == "speak_append"
+
+    @pytest.mark.asyncio
+    async def test_session_plays_to_owner_channel(self, manager, client, fake_upstream):
+        """Test that a client's session is heard in its own channel only."""
+        speaker, teammate, stranger = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await manager.connect(speaker, channel="team")
+        await manager.connect(teammate, protocol="binary", channel="team")
+        await manager.connect(stranger, protocol="binary")
+        sessions = manager.speech_sessions
+
+        reply = await sessions.handle_message(client, {"type": "speak_begin"}, owner=speaker)
+        assert reply["channel"] == "team"
+        session = sessions.get(reply["session_id"])
+        await sessions.append(session.id, "Hi")
+        await sessions.end(session.id)
+        await session.relay
+        await asyncio.sleep(0.01)
+
+        assert _audio(teammate) == fake_upstream.audio_for("Hi")
+        assert stranger.sent == []
+
+    @pytest.mark.asyncio
+    async def test_disconnect_ends_owned_sessions(self, manager, client, fake_upstream):
+        """Test that a client's sessions end when its socket closes."""
+        speaker = FakeWebSocket()
+        await manager.connect(speaker)
+        sessions = manager.speech_sessions
+        reply = await sessions.handle_message(client, {"type": "speak_begin"}, owner=speaker)
+        session = sessions.get(reply["session_id"])
+
+        manager.disconnect(speaker)
+        await asyncio.wait_for(session.relay, timeout=1)
+
+        assert session.ended
+
+
+class TestSpeechTools:
+    @pytest.mark.asyncio
+    async def test_tool_pair(self, client, fake_upstream, monkeypatch):
+        """Test the speak_begin, speak_append and speak_end MCP tools."""
+        server = FastMCP()
+        mcp_tools.register_mcp_tools(server, test_mode=True)
+        monkeypatch.setattr(mcp_tools, "client", client)
+        listener = FakeWebSocket()
+        await mcp_tools.manager.connect(listener, protocol="binary")
+
+        try:
+            result = await server.call_tool("speak_begin", {})
+            begin = _tool_result(result)
+            assert begin["success"] is True
+            session_id = begin["session_id"]
+
+            append = _tool_result(
+                await server.call_tool("speak_append", {"session_id": session_id, "text": "Hi"})
+            )
+            assert append["success"] is True
+            end = _tool_result(await server.call_tool("speak_end", {"session_id": session_id}))
+            assert end == {"success": True, "session_id": session_id, "characters": 2}
+
+            missing = _tool_result(await server.call_tool("speak_end", {"session_id": "nope"}))
+            assert missing["success"] is False
+
+            await _wait_for(lambda: listener.sent and listener.sent[-1]["type"] == "audio_complete")
+            assert _audio(listener) == fake_upstream.audio_for("Hi")
+        finally:
+            await mcp_tools.manager.shutdown()
+
+
+def _tool_result(result):
+    return json.loads(result[0].text)
@@ -0,0 +1,136 @@
+"""
+Unit tests for the upstream scheduler and client retries.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from src.backend import elevenlabs_client
+from src.backend.elevenlabs_client import ElevenLabsClient
+from src.backend.upstream_scheduler import UpstreamScheduler, parse_retry_after, retry_delay
+
+
+class TestRetryDelay:
+    def test_retry_after_seconds_and_dates(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+    def test_backoff_is_jittered_and_capped(self):
+        delays = [retry_delay(5, base=0.5, cap=2.0) for _ in range(50)]
+        assert all(0 <= delay <= 2.0 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_retry_after_is_honoured(self):
+        assert retry_delay(0, retry_after=1.0, base=0.1, cap=5.0) >= 1.0
+        assert retry_delay(0, retry_after=60.0, base=0.1, cap=5.0) is None
+
+
+class TestScheduler:
+    @pytest.mark.asyncio
+    async def test_interactive_requests_go_first(self):
+        """Test that queued interactive requests are admitted before batch ones."""
+        scheduler = UpstreamScheduler(max_concurrency=1)
+        order = []
+
+        async def request(priority):
+            async with scheduler.slot(priority):
+                order.append(priority)
+
+        await scheduler.acquire("default")
+        tasks = [asyncio.create_task(request(p)) for p in ("catalog", "batch", "interactive")]
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["queued"] == {
+            "interactive": 1,
+            "default": 0,
+            "batch": 1,
+            "catalog": 1,
+        }
+
+        scheduler.release()
+        await asyncio.gather(*tasks)
+
+        assert order == ["interactive", "batch", "catalog"]
+
+    @pytest.mark.asyncio
+    async def test_character_budget_delays_requests(self):
+        """Test that a request waits until the character bucket has refilled."""
+        scheduler = UpstreamScheduler(max_concurrency=4, chars_per_second=1000, char_burst=100)
+
+        async with scheduler.slot(chars=100):
+            pass
+        started = time.perf_counter()
+        async with scheduler.slot(chars=100):
+            pass
+
+        assert time.perf_counter() - started >= 0.08
+        assert scheduler.stats()["wait_seconds_max"] >= 0.08
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_nothing(self):
+        """Test that a waiter cancelled in the queue does not leak a slot."""
+        scheduler = UpstreamScheduler(max_concurrency=1)
+        await scheduler.acquire()
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        scheduler.release()
+
+        await asyncio.wait_for(scheduler.acquire(), timeout=0.1)
+        assert scheduler.stats()["active"] == 1
+
+
+class TestClientRetries:
+    @pytest.mark.asyncio
+    async def test_rate_limited_request_is_retried(self, fake_upstream, monkeypatch):
+        """Test that a 429 with Retry-After is retried instead of failing."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.failures = [(429, {"Retry-After": "0"}), (503, {})]
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+
+        audio = await client.text_to_speech("Hello", "voice1")
+
+        assert audio == fake_upstream.audio_for("Hello")
+        assert len(fake_upstream.requests) == 3
+        assert client.scheduler.stats()["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_is_retried_before_first_chunk(self, fake_upstream, monkeypatch):
+        """Test that a rate-limited stream is retried transparently."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.failures = [(429, {"Retry-After": "0"})]
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+
+        chunks = [chunk async for chunk in client.text_to_speech_stream("Hello", "voice1")]
+
+        assert b"".join(chunks) == fake_upstream.audio_for("Hello")
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, fake_upstream, monkeypatch):
+        """Test that the upstream status is reported once retries are exhausted."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        monkeypatch.setattr(elevenlabs_client, "UPSTREAM_MAX_RETRIES", 1)
+        fake_upstream.failures = [(503, {"Retry-After": "0"})] * 2
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await client.text_to_speech("Hello", "voice1")
+
+        assert exc_info.value.status_code == 503
+        assert len(fake_upstream.requests) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_capped(self, fake_upstream, monkeypatch):
+        """Test that no more than max_concurrency calls reach the upstream at once."""
+        monkeypatch.setenv("ELEVENLABS_API_KEY", "fake_key")
+        fake_upstream.latency = 0.05
+        client = ElevenLabsClient(base_url=fake_upstream.base_url)
+        client.scheduler = UpstreamScheduler(max_concurrency=2)
+
+        await asyncio.gather(*(client.text_to_speech(f"Clip {i}", "voice1") for i in range(6)))
+
+        assert fake_upstream.max_active == 2
@@ -0,0 +1,234 @@
+"""
+Unit tests for the WebSocket broadcaster.
+"""
+
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from src.backend.frames import Frame
+from src.backend.websocket import ClientConnection, WebSocketManager
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket."""
+
+    def __init__(self, send_delay: float = 0.0):
+        self.send_delay = send_delay
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data: str):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.sent.append(json.loads(data))
+
+    async def send_bytes(self, data: bytes):
+        self.sent.append(data)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest_asyncio.fixture
+async def manager():
+    manager = WebSocketManager()
+    yield manager
+    await manager.shutdown()
+
+
+class TestBroadcast:
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_delay_others(self, manager):
+        """Test that broadcasting returns without waiting on a slow client."""
+        fast, slow = FakeWebSocket(), FakeWebSocket(send_delay=1.0)
+        await manager.connect(fast)
+        await manager.connect(slow)
+
+        await asyncio.wait_for(manager.broadcast_to_clients({"type": "ping"}), timeout=0.1)
+        await asyncio.sleep(0.01)
+
+        assert fast.sent == [{"type": "ping"}]
+        assert slow.sent == []
+
+    @pytest.mark.asyncio
+    async def test_mcp_connection_is_excluded(self, manager):
+        """Test that broadcasts skip the MCP connection."""
+        client, mcp = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(client)
+        await manager.connect(mcp)
+        manager.mcp_connection = mcp
+
+        await manager.broadcast_to_clients({"type": "audio_data"})
+        await asyncio.sleep(0.01)
+
+        assert client.sent == [{"type": "audio_data"}]
+        assert mcp.sent == []
+
+    @pytest.mark.asyncio
+    async def test_message_is_encoded_once(self, manager):
+        """Test that every recipient is handed the same encoded frame."""
+        for _ in range(3):
+            await manager.connect(FakeWebSocket())
+        queued = []
+        for connection in manager.active_connections.values():
+            connection.stop()
+            queued.append(connection.queue)
+
+        await manager.broadcast_to_clients({"type": "audio_data", "data": "x" * 1024})
+
+        frames = [queue.get_nowait()[0] for queue in queued]
+        assert all(frame is frames[0] for frame in frames)
+
+    @pytest.mark.asyncio
+    async def test_failed_send_disconnects_client(self, manager):
+        """Test that a client whose send fails is removed."""
+        websocket = FakeWebSocket()
+
+        async def broken_send(data):
+            raise RuntimeError("connection reset")
+
+        websocket.send_text = broken_send
+        await manager.connect(websocket)
+
+        await manager.broadcast_to_clients({"type": "ping"})
+        await asyncio.sleep(0.01)
+
+        assert websocket not in manager.active_connections
+
+
+class TestAudioProtocols:
+    @pytest.mark.asyncio
+    async def test_binary_clients_get_header_and_raw_bytes(self, manager):
+        """Test that binary clients receive a control header followed by raw audio."""
+        websocket = FakeWebSocket()
+        await manager.connect(websocket, protocol="binary")
+
+        await manager.broadcast_audio(
+            {"type": "audio_data", "clip_id": "c1", "seq": 0}, b"\x00\xff"
+        )
+        await asyncio.sleep(0.01)
+
+        assert websocket.sent == [
+            {"type": "audio_data", "clip_id": "c1", "seq": 0, "size": 2},
+            b"\x00\xff",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_json_clients_get_base64(self, manager):
+        """Test that clients that did not negotiate binary keep the JSON format."""
+        websocket = FakeWebSocket()
+        await manager.connect(websocket)
+
+        await manager.broadcast_audio(
+            {"type": "audio_data", "clip_id": "c1", "seq": 0}, b"\x00\xff"
+        )
+        await asyncio.sleep(0.01)
+
+        assert websocket.sent == [{"type": "audio_data", "clip_id": "c1", "seq": 0, "data": "AP8="}]
+
+    @pytest.mark.asyncio
+    async def test_hello_switches_protocol(self, manager):
+        """Test that a hello message negotiates the binary protocol."""
+        websocket = FakeWebSocket()
+        await manager.connect(websocket)
+
+        assert manager.set_protocol(websocket, "binary") == "binary"
+        assert manager.set_protocol(websocket, "unknown") == "binary"
+
+
+class TestChannels:
+    @pytest.mark.asyncio
+    async def test_channel_messages_reach_subscribers_only(self, manager):
+        """Test that a message for a channel skips clients of other channels."""
+        alice, bob, anyone = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await manager.connect(alice, channel="alice")
+        await manager.connect(bob, channel="bob")
+        await manager.connect(anyone)
+
+        await manager.broadcast_to_clients({"type": "audio_data", "channel": "alice"})
+        await manager.broadcast_to_clients({"type": "audio_data", "channel": "default"})
+        await manager.broadcast_to_clients({"type": "mcp_status"})
+        await asyncio.sleep(0.01)
+
+        assert [m["type"] for m in alice.sent] == ["audio_data", "mcp_status"]
+        assert [m["type"] for m in bob.sent] == ["mcp_status"]
+        assert [m["type"] for m in anyone.sent] == ["audio_data", "mcp_status"]
+
+    @pytest.mark.asyncio
+    async def test_set_channel_moves_connection(self, manager):
+        """Test that switching channels updates the index and ignores malformed names."""
+        websocket = FakeWebSocket()
+        await manager.connect(websocket)
+
+        assert manager.set_channel(websocket, "room:1") == "room:1"
+        assert manager.set_channel(websocket, "no spaces") == "room:1"
+        assert list(manager.channels) == ["room:1"]
+
+        manager.disconnect(websocket)
+        assert manager.channels == {}
+
+    @pytest.mark.asyncio
+    async def test_formats_are_tracked_per_channel(self, manager):
+        """Test that a channel only renders the formats its own listeners chose."""
+        await manager.connect(FakeWebSocket(), output_format="pcm_16000", channel="alice")
+
+        assert manager.audio_formats("mp3_44100_128", "alice") == ["mp3_44100_128", "pcm_16000"]
+        assert manager.audio_formats("mp3_44100_128", "bob") == ["mp3_44100_128"]
+
+
+class TestSlowConsumerPolicy:
+    def _connection(self, policy, closed, max_dropped=0):
+        return ClientConnection(
+            FakeWebSocket(), closed.append, queue_size=2, policy=policy, max_dropped=max_dropped
+        )
+
+    @pytest.mark.asyncio
+    async def test_drop_discards_new_messages(self):
+        closed = []
+        connection = self._connection("drop", closed)
+        for i in range(4):
+            connection.enqueue(Frame.encode({"seq": i}))
+
+        assert [json.loads(connection.queue.get_nowait()[0].data)["seq"] for _ in range(2)] == [
+            0,
+            1,
+        ]
+        assert connection.dropped == 2
+        assert closed == []
+
+    @pytest.mark.asyncio
+    async def test_coalesce_keeps_latest_messages(self):
+        closed = []
+        connection = self._connection("coalesce", closed)
+        for i in range(4):
+            connection.enqueue(Frame.encode({"seq": i}))
+
+        assert [json.loads(connection.queue.get_nowait()[0].data)["seq"] for _ in range(2)] == [
+            2,
+            3,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_disconnect_closes_slow_client(self):
+        closed = []
+        connection = self._connection("disconnect", closed)
+        for i in range(3):
+            connection.enqueue(Frame.encode({"seq": i}))
+        await asyncio.sleep(0)
+
+        assert closed == [connection.websocket]
+        assert connection.websocket.closed
+
+    @pytest.mark.asyncio
+    async def test_drop_limit_disconnects(self):
+        closed = []
+        connection = self._connection("drop", closed, max_dropped=2)
+        for i in range(4):
+            connection.enqueue(Frame.encode({"seq": i}))
+
+        assert closed == [connection.websocket]